@@ -0,0 +1,179 @@
+"""
+HTTP load generator used to compare deployments (see the loadtest command).
+
+Opens a fixed number of keep-alive HTTP/1.1 connections with asyncio and has
+each of them send GET requests back to back for a given duration, cycling
+through the paths. Only the standard library is used, so it runs against any
+server (runserver, gunicorn, uvicorn...) without extra dependencies.
+"""
+import asyncio
+import json
+import statistics
+from collections import Counter
+from http.cookies import SimpleCookie
+from time import perf_counter
+from urllib.parse import urlsplit
+
+
+REQUEST_TIMEOUT = 30
+
+
+async def read_response(reader):
+    """
+    Read one HTTP/1.1 response, returning (status, headers, body).
+    Header names are lowercased and map to the list of their values.
+    """
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('Connection closed by the server')
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers.setdefault(name.strip().lower(), []).append(value.strip())
+
+    if 'chunked' in headers.get('transfer-encoding', [''])[-1].lower():
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            if size == 0:
+                # Skip the trailers
+                while await reader.readline() not in (b'\r\n', b'\n', b''):
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b''.join(chunks)
+    elif 'content-length' in headers:
+        body = await reader.readexactly(int(headers['content-length'][-1]))
+    elif status in (204, 304) or status < 200:
+        body = b''
+    else:
+        body = await reader.read()
+    return status, headers, body
+
+
+class Connection:
+    """
+    A keep-alive HTTP/1.1 connection to base_url, reopened when the server closes it.
+    """
+
+    def __init__(self, base_url, headers=()):
+        url = urlsplit(base_url)
+        if url.scheme != 'http':
+            raise ValueError(f'Only http:// URLs are supported, got {base_url!r}')
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.prefix = url.path.rstrip('/')
+        self.headers = [f'Host: {url.netloc}', *headers]
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=b'', headers=()):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f'{method} {self.prefix}{path} HTTP/1.1', *self.headers, *headers]
+        if body:
+            lines.append(f'Content-Length: {len(body)}')
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await self.writer.drain()
+        status, response_headers, response_body = await read_response(self.reader)
+        if 'close' in response_headers.get('connection', [''])[-1].lower():
+            await self.close()
+        return status, response_headers, response_body
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.reader = self.writer = None
+
+
+async def login(base_url, username, password):
+    """
+    Log in through /session/login/ and return the Cookie header of the session.
+    """
+    connection = Connection(base_url)
+    try:
+        status, headers, body = await connection.request(
+            'POST', '/session/login/', json.dumps({'username': username, 'password': password}).encode(),
+            headers=['Content-Type: application/json'],
+        )
+    finally:
+        await connection.close()
+    if status != 200:
+        raise ValueError(f'Login as {username!r} failed with status {status}: {body[:200]!r}')
+    cookies = SimpleCookie()
+    for value in headers.get('set-cookie', []):
+        cookies.load(value)
+    return 'Cookie: ' + '; '.join(f'{name}={morsel.value}' for name, morsel in cookies.items())
+
+
+async def fetch_json(base_url, path, headers=()):
+    connection = Connection(base_url, headers)
+    try:
+        status, _, body = await connection.request('GET', path)
+    finally:
+        await connection.close()
+    return status, json.loads(body) if body else None
+
+
+async def run_load(base_url, paths, connections=500, duration=10.0, headers=()):
+    """
+    Keep `connections` connections busy for `duration` seconds and summarize
+    the throughput and latency of the requests completed.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration
+    latencies = []
+    statuses = Counter()
+    errors = Counter()
+
+    async def worker(index):
+        connection = Connection(base_url, headers)
+        try:
+            while loop.time() < deadline:
+                path = paths[index % len(paths)]
+                index += 1
+                start = perf_counter()
+                try:
+                    status, _, _ = await asyncio.wait_for(connection.request('GET', path), REQUEST_TIMEOUT)
+                except (OSError, ValueError, asyncio.IncompleteReadError, asyncio.TimeoutError) as exc:
+                    errors[type(exc).__name__] += 1
+                    await connection.close()
+                    # Do not spin against a server that refuses connections
+                    await asyncio.sleep(0.01)
+                    continue
+                latencies.append((perf_counter() - start) * 1000)
+                statuses[status] += 1
+        finally:
+            await connection.close()
+
+    start = perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(connections)))
+    elapsed = perf_counter() - start
+
+    latencies.sort()
+
+    def percentile(fraction):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * fraction))], 3) if latencies else None
+
+    return {
+        'requests': len(latencies),
+        'errors': dict(errors),
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'elapsed_s': round(elapsed, 3),
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'latency_ms': {
+            'p50': percentile(0.5),
+            'p90': percentile(0.9),
+            'p99': percentile(0.99),
+            'max': round(latencies[-1], 3) if latencies else None,
+            'mean': round(statistics.mean(latencies), 3) if latencies else None,
+        },
+    }
@@ -0,0 +1 @@
+# Management package for benchmarks app 
\ No newline at end of file
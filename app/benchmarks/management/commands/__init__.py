@@ -0,0 +1 @@
+# Commands package for benchmarks app 
\ No newline at end of file
@@ -0,0 +1,215 @@
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from itertools import cycle
+from time import perf_counter
+
+import django
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+
+from benchmarks.synthetic import seed
+from carts.cache import totals_cache
+from carts.models import Cart, CartItem
+from products.models import Product
+
+
+class Command(BaseCommand):
+    """
+    Benchmark pricing and the cart/order endpoints on synthetic data.
+    """
+    help = 'Seed a throwaway database with synthetic data and benchmark pricing and the cart and order endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20, help='Number of users to seed')
+        parser.add_argument('--carts', type=int, default=10, help='Carts per user')
+        parser.add_argument('--items', type=int, default=8, help='Items per cart')
+        parser.add_argument('--products', type=int, default=100, help='Number of products to seed')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per scenario')
+        parser.add_argument('--output', help='Write the JSON results to this file instead of stdout')
+        parser.add_argument('--compare', help='JSON results of a previous run to compare against')
+
+    def handle(self, *args, **options):
+        """Execute the command."""
+        if options['repeat'] < 1 or options['carts'] < 2 or options['items'] < 1:
+            raise CommandError('--repeat and --items must be at least 1 and --carts at least 2.')
+
+        # Work on a throwaway test database, never on the development data.
+        # Prints from signal handlers are kept out of the JSON written to stdout.
+        with redirect_stdout(sys.stderr):
+            setup_test_environment()
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                dataset = seed(
+                    users=options['users'],
+                    carts_per_user=options['carts'],
+                    items_per_cart=options['items'],
+                    products=options['products'],
+                )
+                results = self.run_scenarios(dataset, options)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                teardown_test_environment()
+
+        dataset.pop('usernames')
+        report = {
+            'meta': {
+                'commit': self.get_commit(),
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'repeat': options['repeat'],
+                'dataset': dataset,
+            },
+            'results': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+        if options['compare']:
+            self.compare(results, options['compare'])
+
+    def run_scenarios(self, dataset, options):
+        """
+        Run every scenario as the first (VIP) seeded user, who owns the most expensive carts to price.
+        """
+        user = User.objects.get(username=dataset['usernames'][0])
+        client = Client()
+        client.force_login(user)
+        carts = list(Cart.objects.filter(user=user).order_by('id'))
+        active_cart = next(cart for cart in carts if cart.status == 'ACTIVO')
+        finalized_cart = next(cart for cart in carts if cart.status == 'FINALIZADO')
+        products = list(Product.objects.order_by('id')[:options['items']])
+        product_ids = [product.id for product in products]
+
+        def fresh_cart():
+            totals_cache.clear()
+            return Cart.objects.get(pk=finalized_cart.pk)
+
+        def cold():
+            totals_cache.clear()
+
+        def checkout_cart():
+            # Every checkout takes stock, keep enough for all the runs
+            Product.objects.filter(pk__in=product_ids).update(stock=1000)
+            cart = Cart.objects.create(user=user, cart_type='COMUN')
+            CartItem.objects.bulk_create([
+                CartItem(cart=cart, product=product, quantity=1, unit_price=product.price)
+                for product in products
+            ])
+            Cart.refresh_aggregates(Cart.objects.filter(pk=cart.pk))
+            totals_cache.clear()
+            return cart
+
+        next_product_id = cycle(product_ids).__next__
+
+        def add_item(state):
+            return client.post(
+                f'/carts/{active_cart.id}/items/', {'product_id': next_product_id(), 'quantity': 1},
+                content_type='application/json'
+            )
+
+        scenarios = [
+            ('Cart.get_total_payable', fresh_cart, lambda cart: cart.get_total_payable(), None),
+            ('Cart.get_total_payable (cached)', lambda: Cart.objects.get(pk=finalized_cart.pk), lambda cart: cart.get_total_payable(), None),
+            ('CartListCreateView GET', cold, lambda state: client.get('/carts/'), 200),
+            ('CartDetailView GET', cold, lambda state: client.get(f'/carts/{finalized_cart.id}/'), 200),
+            ('CartItemCreateView POST', cold, add_item, 201),
+            ('OrderCreateView POST', checkout_cart, lambda cart: client.post(
+                '/orders/create/', {'cart_id': cart.id}, content_type='application/json'
+            ), 201),
+            ('OrderListView GET (user)', cold, lambda state: client.get('/orders/?user=true'), 200),
+            ('OrderListView GET (all)', cold, lambda state: client.get('/orders/'), 200),
+        ]
+
+        results = []
+        for name, setup, func, expected_status in scenarios:
+            self.stderr.write(f'Running {name}...')
+            results.append(self.measure(name, setup, func, expected_status, options['repeat']))
+        return results
+
+    def measure(self, name, setup, func, expected_status, repeat):
+        """
+        Time func over repeat runs (setup is not timed), count its queries and
+        trace its memory allocations in one extra run.
+        """
+        timings = []
+        queries = []
+        for _ in range(repeat):
+            state = setup()
+            with CaptureQueriesContext(connection) as context:
+                start = perf_counter()
+                result = func(state)
+                timings.append((perf_counter() - start) * 1000)
+            queries.append(len(context.captured_queries))
+            if expected_status is not None and result.status_code != expected_status:
+                raise CommandError(f'{name} returned {result.status_code}, expected {expected_status}')
+
+        state = setup()
+        tracemalloc.start()
+        func(state)
+        allocated, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        timings.sort()
+        return {
+            'name': name,
+            'latency_ms': {
+                'min': round(timings[0], 3),
+                'median': round(statistics.median(timings), 3),
+                'p95': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+                'mean': round(statistics.mean(timings), 3),
+                'max': round(timings[-1], 3),
+            },
+            'queries': {
+                'min': min(queries),
+                'max': max(queries),
+                'mean': round(statistics.mean(queries), 2),
+            },
+            'allocations': {
+                'retained_kib': round(allocated / 1024, 1),
+                'peak_kib': round(peak / 1024, 1),
+            },
+        }
+
+    def compare(self, results, path):
+        """
+        Print the median latency and query changes against a previous run.
+        """
+        with open(path) as file:
+            baseline = {result['name']: result for result in json.load(file)['results']}
+        self.stdout.write(f'\nComparison against {path}:')
+        for result in results:
+            previous = baseline.get(result['name'])
+            if previous is None:
+                self.stdout.write(f"  {result['name']}: no baseline")
+                continue
+            before = previous['latency_ms']['median']
+            after = result['latency_ms']['median']
+            change = (after - before) / before * 100 if before else 0
+            self.stdout.write(
+                f"  {result['name']}: median {before:.3f} → {after:.3f} ms ({change:+.1f}%), "
+                f"queries {previous['queries']['mean']} → {result['queries']['mean']}"
+            )
+
+    def get_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
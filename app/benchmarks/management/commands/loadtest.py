@@ -0,0 +1,107 @@
+import asyncio
+import json
+import platform
+from datetime import datetime, timezone
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.load import fetch_json, login, run_load
+
+
+DEFAULT_PATHS = ['/products/', '/promotions/special-dates/', '/orders/?user=true']
+
+
+class Command(BaseCommand):
+    """
+    Load test running servers, e.g. the WSGI and the ASGI deployment of the same database.
+    """
+    help = (
+        'Send concurrent GET requests to one or more running servers and compare their '
+        'requests per second and latency percentiles'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target', action='append', required=True, metavar='NAME=URL',
+            help='Server to load, e.g. wsgi=http://127.0.0.1:8000 (repeatable; the first one is the baseline)'
+        )
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help='Path to request (repeatable). Defaults to the catalog, promotions, the orders '
+                 'of the user and, when logged in, the detail of their first cart'
+        )
+        parser.add_argument('--connections', type=int, default=500, help='Concurrent connections')
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds to run against each target')
+        parser.add_argument('--username', help='Log in as this user first (needed for carts and orders)')
+        parser.add_argument('--password', help='Password of --username')
+        parser.add_argument('--output', help='Write the JSON results to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        """Execute the command."""
+        if options['connections'] < 1 or options['duration'] <= 0:
+            raise CommandError('--connections must be at least 1 and --duration positive.')
+        targets = []
+        for target in options['target']:
+            name, sep, url = target.partition('=')
+            if not sep or not name or not url.startswith('http://'):
+                raise CommandError(f'Invalid --target {target!r}, expected NAME=http://host:port')
+            targets.append((name, url))
+
+        results = []
+        for name, url in targets:
+            self.stderr.write(f"Loading {name} ({url}) with {options['connections']} connections...")
+            try:
+                results.append({'name': name, 'url': url, **asyncio.run(self.load(url, options))})
+            except (OSError, ValueError) as exc:
+                raise CommandError(f'{name}: {exc}')
+
+        report = {
+            'meta': {
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'connections': options['connections'],
+                'duration_s': options['duration'],
+            },
+            'results': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+        if len(results) > 1:
+            self.compare(results)
+
+    async def load(self, url, options):
+        headers = []
+        paths = options['paths']
+        if options['username']:
+            headers.append(await login(url, options['username'], options['password'] or ''))
+        if not paths:
+            paths = list(DEFAULT_PATHS)
+            if headers:
+                status, carts = await fetch_json(url, '/carts/', headers)
+                if status == 200 and carts['results']:
+                    paths.append(f"/carts/{carts['results'][0]['id']}/")
+        result = await run_load(url, paths, options['connections'], options['duration'], headers)
+        return {'paths': paths, **result}
+
+    def compare(self, results):
+        """
+        Print the throughput and p99 latency of every target against the first one.
+        """
+        baseline = results[0]
+        self.stdout.write(f"\nComparison against {baseline['name']}:")
+        for result in results[1:]:
+            before, after = baseline['requests_per_second'], result['requests_per_second']
+            change = (after - before) / before * 100 if before else 0
+            self.stdout.write(
+                f"  {result['name']}: {before} → {after} requests/s ({change:+.1f}%), "
+                f"p99 {baseline['latency_ms']['p99']} → {result['latency_ms']['p99']} ms, "
+                f"errors {sum(baseline['errors'].values())} → {sum(result['errors'].values())}"
+            )
@@ -0,0 +1,171 @@
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+from contextlib import redirect_stdout
+from decimal import Decimal
+from time import perf_counter
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from carts.models import Cart
+from products.models import Product
+
+
+# Database OPTIONS and retries of each mode; 'before' is a stock SQLite setup
+MODES = [
+    ('before', {'init_command': 'PRAGMA journal_mode=DELETE'}, 0),
+    ('after', None, None),
+]
+
+
+class Command(BaseCommand):
+    """
+    Stress concurrent cart and checkout writes on SQLite with and without the tuned settings.
+    """
+    help = (
+        'Run concurrent add-to-cart and checkout requests against a throwaway SQLite file, '
+        'first with stock SQLite settings and then with the configured ones, and report the write throughput'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent users writing')
+        parser.add_argument('--checkouts', type=int, default=20, help='Checkouts per worker')
+        parser.add_argument('--items', type=int, default=3, help='Items added before each checkout')
+        parser.add_argument('--output', help='Write the JSON results to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        """Execute the command."""
+        if connection.vendor != 'sqlite':
+            raise CommandError('stress_writes only applies to SQLite databases.')
+        if min(options['workers'], options['checkouts'], options['items']) < 1:
+            raise CommandError('--workers, --checkouts and --items must be at least 1.')
+
+        settings_dict = connection.settings_dict
+        configured_options = settings_dict.get('OPTIONS', {})
+        # Locking needs a real file shared by every connection, not the in-memory test database
+        with redirect_stdout(sys.stderr), tempfile.TemporaryDirectory() as directory:
+            old_test_name = settings_dict['TEST']['NAME']
+            settings_dict['TEST']['NAME'] = os.path.join(directory, 'stress.sqlite3')
+            setup_test_environment()
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                users, products = self.seed(options)
+                results = []
+                for mode, mode_options, retries in MODES:
+                    settings_dict['OPTIONS'] = configured_options if mode_options is None else mode_options
+                    connection.close()
+                    self.stderr.write(f'Running {mode}...')
+                    if retries is None:
+                        results.append(self.run_mode(mode, users, products, options))
+                    else:
+                        with override_settings(DATABASE_LOCK_RETRIES=retries):
+                            results.append(self.run_mode(mode, users, products, options))
+            finally:
+                settings_dict['OPTIONS'] = configured_options
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                settings_dict['TEST']['NAME'] = old_test_name
+                teardown_test_environment()
+
+        output = json.dumps({'workers': options['workers'], 'results': results}, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+        before, after = results
+        self.stdout.write(
+            f"\nwrites/s {before['writes_per_second']} → {after['writes_per_second']}, "
+            f"failed requests {before['failed']} → {after['failed']}"
+        )
+
+    def seed(self, options):
+        users = [
+            User.objects.create_user(username=f'stress{index}', password='testpassword123')
+            for index in range(options['workers'])
+        ]
+        products = Product.objects.bulk_create([
+            Product(name=f'Stress product {index}', description='Stress test product',
+                    price=Decimal('10.00') + index, stock=10 ** 6)
+            for index in range(options['items'])
+        ])
+        return users, products
+
+    def run_mode(self, mode, users, products, options):
+        """
+        Have every user add items and check out concurrently, timing each write request.
+        """
+        latencies = []
+        failures = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(len(users))
+
+        def worker(user):
+            client = Client()
+            client.force_login(user)
+            own_latencies = []
+            own_failures = []
+            barrier.wait()
+            try:
+                for _ in range(options['checkouts']):
+                    for product in products:
+                        self.timed_post(client, '/carts/0/items/', {'product_id': product.id, 'quantity': 1},
+                                        201, own_latencies, own_failures)
+                    cart_id = Cart.objects.filter(user=user, status='ACTIVO').values_list('id', flat=True).first()
+                    if cart_id is not None:
+                        self.timed_post(client, '/orders/create/', {'cart_id': cart_id},
+                                        201, own_latencies, own_failures)
+            finally:
+                connections.close_all()
+            with lock:
+                latencies.extend(own_latencies)
+                failures.extend(own_failures)
+
+        # Failed requests are counted, not logged with their tracebacks
+        request_logger = logging.getLogger('django.request')
+        old_level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        threads = [threading.Thread(target=worker, args=(user,)) for user in users]
+        start = perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = perf_counter() - start
+        request_logger.setLevel(old_level)
+
+        latencies.sort()
+        return {
+            'mode': mode,
+            'writes': len(latencies),
+            'failed': len(failures),
+            'errors': sorted(set(failures)),
+            'elapsed_s': round(elapsed, 3),
+            'writes_per_second': round(len(latencies) / elapsed, 1),
+            'latency_ms': {
+                'median': round(statistics.median(latencies), 3) if latencies else None,
+                'p99': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 3) if latencies else None,
+                'max': round(latencies[-1], 3) if latencies else None,
+            },
+        }
+
+    def timed_post(self, client, path, data, expected_status, latencies, failures):
+        start = perf_counter()
+        try:
+            response = client.post(path, data, content_type='application/json')
+        except OperationalError as exc:
+            failures.append(str(exc))
+            return
+        if response.status_code != expected_status:
+            failures.append(f'{path} returned {response.status_code}')
+            return
+        latencies.append((perf_counter() - start) * 1000)
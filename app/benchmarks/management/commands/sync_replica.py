@@ -0,0 +1,38 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.routers import REPLICA_ALIAS
+
+
+class Command(BaseCommand):
+    """
+    Refresh a SQLite read replica with a copy of the default database.
+    """
+    help = (
+        'Copy the default SQLite database onto the replica file (DATABASE_REPLICA_NAME) '
+        'with the SQLite online backup API, for local replica setups'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--to', help='Replica file to write (defaults to the NAME of the replica database)')
+
+    def handle(self, *args, **options):
+        """Execute the command."""
+        connection = connections[DEFAULT_DB_ALIAS]
+        if connection.vendor != 'sqlite':
+            raise CommandError('Only SQLite replicas are copied; other databases replicate on their own.')
+        target = options['to'] or settings.DATABASES.get(REPLICA_ALIAS, {}).get('NAME')
+        if not target:
+            raise CommandError('No replica configured: set DATABASE_REPLICA_NAME or pass --to.')
+
+        connection.ensure_connection()
+        # The backup is a consistent snapshot even while the default database is being written
+        replica = sqlite3.connect(target)
+        try:
+            connection.connection.backup(replica)
+        finally:
+            replica.close()
+        self.stdout.write(self.style.SUCCESS(f'Replica {target} is up to date.'))
@@ -0,0 +1,92 @@
+"""
+Synthetic data generator for benchmarks.
+
+Seeds N users × M carts × K items with bulk inserts. Every user gets one
+ACTIVO cart and M - 1 finalized carts, each finalized cart with its Order.
+"""
+import random
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from carts.models import Cart, CartItem
+from carts.pricing import price_carts
+from carts.serializers import CartItemSerializer
+from orders.models import Order, UserMonthlySpend
+from products.models import Product
+from users.models import UserProfile
+
+
+def seed(users=10, carts_per_user=5, items_per_cart=5, products=50, vip_ratio=0.1, prefix='bench', random_seed=0):
+    """
+    Create the synthetic data set and return a summary dict with the created
+    counts and the usernames (the first ones are VIP). All users share the
+    password 'benchpassword123'.
+    """
+    rng = random.Random(random_seed)
+    products = max(products, items_per_cart)
+    # At least one VIP user, so the VIP pricing rule is always exercised
+    vip_users = max(1, int(users * vip_ratio)) if users else 0
+
+    with transaction.atomic():
+        product_objs = Product.objects.bulk_create([
+            Product(
+                name=f'{prefix} product {i}',
+                description=f'Synthetic product number {i} for benchmarks.',
+                price=Decimal(rng.randrange(100, 5000)) + Decimal('0.99'),
+                stock=rng.randrange(10, 1000)
+            )
+            for i in range(products)
+        ])
+
+        password = make_password('benchpassword123')
+        user_objs = User.objects.bulk_create([
+            User(username=f'{prefix}user{i}', email=f'{prefix}user{i}@example.com', password=password)
+            for i in range(users)
+        ])
+        # bulk_create does not send post_save, so profiles are created here
+        UserProfile.objects.bulk_create([
+            UserProfile(user=user, is_vip=index < vip_users)
+            for index, user in enumerate(user_objs)
+        ])
+
+        cart_objs = Cart.objects.bulk_create([
+            Cart(
+                user=user,
+                cart_type='VIP' if index < vip_users else 'COMUN',
+                status='ACTIVO' if cart_number == carts_per_user - 1 else 'FINALIZADO'
+            )
+            for index, user in enumerate(user_objs)
+            for cart_number in range(carts_per_user)
+        ])
+
+        CartItem.objects.bulk_create([
+            CartItem(cart=cart, product=product, quantity=rng.randint(1, 3), unit_price=product.price)
+            for cart in cart_objs
+            for product in rng.sample(product_objs, items_per_cart)
+        ], batch_size=1000)
+        Cart.refresh_aggregates(Cart.objects.filter(pk__in=[cart.pk for cart in cart_objs]))
+
+        finalized = list(Cart.objects.filter(
+            pk__in=[cart.pk for cart in cart_objs], status='FINALIZADO'
+        ).with_items())
+        totals = price_carts(finalized)
+        orders = []
+        for cart in finalized:
+            order = Order(cart=cart, total_paid=totals[cart.id]['total_payable'])
+            order.set_snapshot(totals[cart.id], CartItemSerializer(cart.items.all(), many=True).data)
+            orders.append(order)
+        Order.objects.bulk_create(orders, batch_size=1000)
+        UserMonthlySpend.rebuild()
+
+    return {
+        'products': len(product_objs),
+        'users': len(user_objs),
+        'vip_users': vip_users,
+        'carts': len(cart_objs),
+        'items': len(cart_objs) * items_per_cart,
+        'orders': len(finalized),
+        'usernames': [user.username for user in user_objs],
+    }
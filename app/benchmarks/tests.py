@@ -0,0 +1,64 @@
+import json
+import os
+import sqlite3
+import tempfile
+from io import StringIO
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import LiveServerTestCase, TestCase, TransactionTestCase
+
+from benchmarks.synthetic import seed
+from carts.models import Cart
+from orders.models import Order
+
+
+class SyntheticSeedTests(TestCase):
+    def test_seed_creates_consistent_data(self):
+        """The generator creates the requested counts with consistent maintained aggregates."""
+        summary = seed(users=4, carts_per_user=3, items_per_cart=2, products=5)
+
+        self.assertEqual(summary['carts'], 12)
+        self.assertEqual(summary['orders'], 8)
+        self.assertEqual(summary['vip_users'], 1)
+        self.assertEqual(Order.objects.filter(cart__user__username__startswith='bench').count(), 8)
+        self.assertEqual(Cart.objects.filter(status='ACTIVO', user__username__startswith='bench').count(), 4)
+        carts = Cart.objects.filter(user__username__startswith='bench')
+        self.assertFalse(carts.exclude(item_count=2).exists())
+        self.assertFalse(carts.filter(subtotal=0).exists())
+
+
+class LoadTestCommandTests(LiveServerTestCase):
+    def test_loads_running_server(self):
+        """The load test logs in, finds a cart of the user and reports every request of a live server."""
+        user = User.objects.create_user(username='loader', password='testpassword123')
+        cart = Cart.objects.create(user=user, cart_type='COMUN')
+        out = StringIO()
+        call_command(
+            'loadtest', '--target', f'live={self.live_server_url}', '--connections', '3', '--duration', '0.5',
+            '--username', 'loader', '--password', 'testpassword123', stdout=out, stderr=StringIO()
+        )
+        [result] = json.loads(out.getvalue())['results']
+        self.assertIn(f'/carts/{cart.id}/', result['paths'])
+        self.assertGreater(result['requests'], 0)
+        self.assertEqual(result['errors'], {})
+        self.assertEqual(list(result['statuses']), ['200'])
+        self.assertIsNotNone(result['latency_ms']['p99'])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'sync_replica copies SQLite databases')
+class SyncReplicaCommandTests(TransactionTestCase):
+    def test_copies_default_database(self):
+        """The replica file gets the current rows of the default database."""
+        User.objects.create_user(username='copied', password='testpassword123')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'replica.sqlite3')
+            call_command('sync_replica', '--to', path, stdout=StringIO())
+            replica = sqlite3.connect(path)
+            try:
+                rows = replica.execute("SELECT username FROM auth_user WHERE username = 'copied'").fetchall()
+            finally:
+                replica.close()
+        self.assertEqual(rows, [('copied',)])
@@ -16,13 +16,18 @@ class CartAdmin(admin.ModelAdmin):
     """
     Admin configuration for Cart model.
     """
-    list_display = ['id', 'user', 'cart_type', 'status', 'get_subtotal_display', 'created_at']
+    list_display = ['id', 'user', 'cart_type', 'status', 'item_count', 'get_subtotal_display', 'created_at']
     list_filter = ['cart_type', 'status', 'created_at']
     search_fields = ['user__username', 'user__email']
     readonly_fields = ['created_at', 'updated_at']
     inlines = [CartItemInline]
     ordering = ['-created_at']
 
+    def save_related(self, request, form, formsets, change):
+        """Recompute the cart aggregates after inline items were edited."""
+        super().save_related(request, form, formsets, change)
+        Cart.refresh_aggregates(Cart.objects.filter(pk=form.instance.pk))
+
     def get_subtotal_display(self, obj):
         """Display subtotal in admin list."""
         return f"${obj.get_subtotal():.2f}"
@@ -40,6 +45,22 @@ class CartItemAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at', 'updated_at']
     ordering = ['-created_at']
 
+    def save_model(self, request, obj, form, change):
+        """Save the item and recompute the aggregates of its cart."""
+        super().save_model(request, obj, form, change)
+        Cart.refresh_aggregates(Cart.objects.filter(pk=obj.cart_id))
+
+    def delete_model(self, request, obj):
+        """Delete the item and recompute the aggregates of its cart."""
+        super().delete_model(request, obj)
+        Cart.refresh_aggregates(Cart.objects.filter(pk=obj.cart_id))
+
+    def delete_queryset(self, request, queryset):
+        """Delete the items and recompute the aggregates of their carts."""
+        cart_ids = set(queryset.values_list('cart_id', flat=True))
+        super().delete_queryset(request, queryset)
+        Cart.refresh_aggregates(Cart.objects.filter(pk__in=cart_ids))
+
     def get_total_price_display(self, obj):
         """Display total price in admin list."""
         return f"${obj.get_total_price():.2f}"
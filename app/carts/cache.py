@@ -0,0 +1,76 @@
+"""
+In-process cache for cart totals.
+
+Entries are keyed by (cart id, items_version, effective date, promotions
+version), so a change to the cart items or to the promotions produces a new
+key and stale entries simply age out of the LRU.
+"""
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+
+
+class LRUCache:
+    """
+    Thread-safe, bounded least-recently-used cache with hit/miss counters.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        """
+        Return the cached value for key (marking it as recently used), or default.
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """
+        Store value under key, evicting the least recently used entry if full.
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove all entries and reset the counters.
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Return the current counters, e.g. for logging or a debug shell.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+            }
+
+
+# Cached results are shared between callers and must not be mutated.
+totals_cache = LRUCache(maxsize=getattr(settings, 'CART_TOTALS_CACHE_SIZE', 1024))
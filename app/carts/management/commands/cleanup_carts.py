@@ -1,6 +1,6 @@
 from django.core.management.base import BaseCommand
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, time, timedelta
 from carts.models import Cart
 
 
@@ -34,9 +34,10 @@ class Command(BaseCommand):
 
         # --- Limpieza original de carritos inactivos antiguos ---
         yesterday = timezone.now().date() - timedelta(days=1)
+        # Compare created_at itself rather than its date, which databases cannot serve from an index
         inactive_carts = Cart.objects.filter(
             status='ACTIVO',
-            created_at__date__lt=yesterday
+            created_at__lt=timezone.make_aware(datetime.combine(yesterday, time.min))
         )
         count = inactive_carts.count()
         if options['dry_run']:
@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from carts.models import Cart
+
+
+AGGREGATE_FIELDS = ['subtotal', 'total_quantity', 'item_count', 'cheapest_unit_price']
+
+
+class Command(BaseCommand):
+    """
+    Detect and repair drift between the cart aggregates and the cart items.
+    """
+    help = 'Compare the maintained cart aggregates with their items and fix the carts that drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show which carts drifted without fixing them',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Number of carts read per database round-trip',
+        )
+
+    def handle(self, *args, **options):
+        """Execute the command."""
+        expressions = {
+            f'actual_{name}': expression
+            for name, expression in Cart.get_aggregate_expressions().items()
+        }
+        carts = Cart.objects.annotate(**expressions).values_list(
+            'id', *AGGREGATE_FIELDS, *expressions
+        ).order_by('id')
+
+        drifted = []
+        for row in carts.iterator(chunk_size=options['chunk_size']):
+            cart_id, stored, actual = row[0], row[1:5], row[5:]
+            if tuple(stored) != tuple(actual):
+                drifted.append(cart_id)
+                if len(drifted) <= 5:
+                    differences = ', '.join(
+                        f'{name}: {old} → {new}'
+                        for name, old, new in zip(AGGREGATE_FIELDS, stored, actual)
+                        if old != new
+                    )
+                    self.stdout.write(f'  - Cart {cart_id}: {differences}')
+        if len(drifted) > 5:
+            self.stdout.write(f'  ... and {len(drifted) - 5} more')
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('All cart aggregates are consistent with their items.'))
+            return
+
+        if options['dry_run']:
+            self.stdout.write(
+                self.style.WARNING(f'DRY RUN: Would repair {len(drifted)} carts with drifted aggregates')
+            )
+            return
+
+        repaired = 0
+        with transaction.atomic():
+            for start in range(0, len(drifted), options['chunk_size']):
+                chunk = drifted[start:start + options['chunk_size']]
+                repaired += Cart.refresh_aggregates(Cart.objects.filter(pk__in=chunk))
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully repaired {repaired} carts with drifted aggregates')
+        )
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carts', '0002_cart_unique_active_cart_per_user_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='items_version',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Incremented every time an item of the cart changes'),
+        ),
+    ]
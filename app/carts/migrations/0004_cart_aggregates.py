@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:44
+
+from django.db import migrations, models
+from django.db.models import Count, F, Min, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_aggregates(apps, schema_editor):
+    Cart = apps.get_model('carts', 'Cart')
+    CartItem = apps.get_model('carts', 'CartItem')
+    items = CartItem.objects.filter(cart_id=OuterRef('pk')).order_by().values('cart_id')
+    Cart.objects.update(
+        subtotal=Coalesce(Subquery(items.annotate(value=Sum(F('unit_price') * F('quantity'))).values('value')), 0, output_field=models.DecimalField(max_digits=12, decimal_places=2)),
+        total_quantity=Coalesce(Subquery(items.annotate(value=Sum('quantity')).values('value')), 0),
+        item_count=Coalesce(Subquery(items.annotate(value=Count('id')).values('value')), 0),
+        cheapest_unit_price=Subquery(items.annotate(value=Min('unit_price')).values('value')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carts', '0003_cart_items_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='cheapest_unit_price',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, help_text='Lowest unit price among the items', max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of distinct items'),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, help_text='Sum of unit_price × quantity of all items', max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='total_quantity',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Sum of the quantities of all items'),
+        ),
+        migrations.RunPython(backfill_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carts', '0004_cart_aggregates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cart',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='cart_user_created_at_id_idx'),
+        ),
+    ]
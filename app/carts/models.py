@@ -1,9 +1,29 @@
-from django.db import models
+from django.db import connections, models, router
+from django.db.models import Count, F, Min, OuterRef, Prefetch, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
+from django.utils import timezone
 from products.models import Product
-from decimal import Decimal
-from promotions.models import SpecialDatePromotion
-from datetime import date
+from promotions.index import promotion_index
+
+
+class CartQuerySet(models.QuerySet):
+    """
+    QuerySet for carts with helpers for the read path.
+    """
+
+    def with_items(self):
+        """
+        Prefetch the items of the carts together with their products, so
+        serializing and pricing the carts needs no further queries.
+        """
+        return self.prefetch_related(CartItem.get_prefetch('items'))
+
+    def active_for(self, user, effective_date):
+        """
+        Active carts of the type the user gets on effective_date (at most one).
+        """
+        return self.filter(user=user, cart_type=Cart.get_cart_type_for(user, effective_date), status='ACTIVO')
 
 
 class Cart(models.Model):
@@ -24,9 +44,17 @@ class Cart(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='carts')
     cart_type = models.CharField(max_length=20, choices=CART_TYPES, default='COMUN')
     status = models.CharField(max_length=20, choices=CART_STATUS, default='ACTIVO')
+    items_version = models.PositiveIntegerField(default=0, editable=False, help_text='Incremented every time an item of the cart changes')
+    # Aggregates maintained on every item write, see apply_item_change()
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False, help_text='Sum of unit_price × quantity of all items')
+    total_quantity = models.PositiveIntegerField(default=0, editable=False, help_text='Sum of the quantities of all items')
+    item_count = models.PositiveIntegerField(default=0, editable=False, help_text='Number of distinct items')
+    cheapest_unit_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, editable=False, help_text='Lowest unit price among the items')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CartQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Cart'
         verbose_name_plural = 'Carts'
@@ -34,104 +62,88 @@ class Cart(models.Model):
         constraints = [
             models.UniqueConstraint(fields=['user', 'cart_type', 'status'], name='unique_active_cart_per_user_type', condition=models.Q(status='ACTIVO'))
         ]
+        indexes = [
+            # Keyset pagination of a user's carts (core.pagination.KeysetPagination)
+            models.Index(fields=['user', '-created_at', '-id'], name='cart_user_created_at_id_idx'),
+        ]
 
     def __str__(self):
         return f"Cart {self.id} - {self.user.username} ({self.cart_type})"
 
-    def get_subtotal(self):
+    @staticmethod
+    def get_cart_type_for(user, effective_date):
         """
-        Calculate subtotal by summing unit_price × quantity for all items.
+        Determine the cart type for a user on a date: VIP for VIP users, otherwise
+        FECHA_ESPECIAL if a special date promotion is active, otherwise COMUN.
         """
-        return sum(item.unit_price * item.quantity for item in self.items.all())
+        if hasattr(user, 'profile') and user.profile.is_vip:
+            return 'VIP'
+        if promotion_index.active_on(effective_date):
+            return 'FECHA_ESPECIAL'
+        return 'COMUN'
 
-    def get_total_payable(self, simulated_date=None):
+    def get_subtotal(self):
         """
-        Calculate total payable with discounts applied in order:
-        1. If total quantity is exactly 4 → 25% discount on subtotal
-        2. If total quantity > 10 → -$100 additional
-        3. If there is an active special date promotion → discount (discount_amount)
-        4. If type == VIP → free one unit of the cheapest item + $500 discount
-        5. Always add $1000 service fee (never less than $1000 total)
-        """
-        subtotal = self.get_subtotal()
-        total_quantity = sum(item.quantity for item in self.items.all())
-        discounts_applied = []
-        final_total = subtotal
-
-        # Rule 1: Exactly 4 items → 25% discount
-        if total_quantity == 4:
-            discount = subtotal * Decimal('0.25')
-            final_total -= discount
-            discounts_applied.append({
-                'type': 'quantity_exactly_4',
-                'description': '25% de descuento por exactamente 4 productos',
-                'amount': float(discount)
-            })
-
-        # Rule 2: If total quantity > 10 items are purchased → $100 discount
-        if total_quantity > 10:
-            final_total -= Decimal('100.00')
-            discounts_applied.append({
-                'type': 'quantity_over_10',
-                'description': '$100 de descuento por más de 10 productos',
-                'amount': 100.00
-            })
-
-        # Rule 3: If there is an active special date promotion → discount
-        if self.cart_type != 'VIP':
-            effective_date = simulated_date or date.today()
-            promo = SpecialDatePromotion.objects.filter(
-                start_date__lte=effective_date,
-                end_date__gte=effective_date
-            ).order_by('-discount_amount').first()
-            if promo and promo.discount_amount > 0:
-                final_total -= promo.discount_amount
-                discounts_applied.append({
-                    'type': 'special_date_promotion',
-                    'description': f'Descuento por fecha especial: {promo.description}',
-                    'amount': float(promo.discount_amount)
-                })
-
-        # Rule 4: If cart is VIP → free one unit of the cheapest item + $500 discount
-        if self.cart_type == 'VIP':
-            # Only apply free cheapest item if there is more than 1 product in total (any combination)
-            if total_quantity > 1:
-                cheapest_item = self.items.order_by('unit_price').first()
-                if cheapest_item:
-                    item_discount = cheapest_item.unit_price  # Only one unit
-                    final_total -= item_discount
-                    discounts_applied.append({
-                        'type': 'vip_free_cheapest',
-                        'description': f'1x gratis {cheapest_item.product.name}',
-                        'amount': float(item_discount)
-                    })
-            # $500 VIP discount always applies
-            final_total -= Decimal('500.00')
-            discounts_applied.append({
-                'type': 'vip_general',
-                'description': '$500 de descuento VIP',
-                'amount': 500.00
-            })
-
-        # Rule 5: Always add $1000 service fee
-        service_fee = Decimal('1000.00')
-        final_total += service_fee
-        discounts_applied.append({
-            'type': 'service_fee',
-            'description': 'Cargo por servicio',
-            'amount': float(service_fee)
-        })
-
-        # Ensure total doesn't go below service fee
-        final_total = max(final_total, service_fee)
+        Get subtotal (unit_price × quantity for all items) from the maintained aggregate.
+        """
+        return self.subtotal
 
+    @classmethod
+    def apply_item_change(cls, cart_id, quantity_delta=0, amount_delta=0, item_count_delta=0):
+        """
+        Update the maintained aggregates of a cart after one of its items changed.
+        Must run in the same transaction as the item write. Counters are updated
+        with F() expressions so concurrent writes do not lose updates. The items
+        version is bumped as well, for item writes that send no signals.
+        """
+        cls.objects.filter(pk=cart_id).update(
+            items_version=F('items_version') + 1,
+            subtotal=F('subtotal') + amount_delta,
+            total_quantity=F('total_quantity') + quantity_delta,
+            item_count=F('item_count') + item_count_delta,
+            cheapest_unit_price=Subquery(
+                CartItem.objects.filter(cart_id=OuterRef('pk')).order_by('unit_price').values('unit_price')[:1]
+            ),
+        )
+
+    @staticmethod
+    def get_aggregate_expressions():
+        """
+        Expressions computing the maintained aggregates from the cart items,
+        usable both in annotate() and update().
+        """
+        items = CartItem.objects.filter(cart_id=OuterRef('pk')).order_by().values('cart_id')
         return {
-            'subtotal': float(subtotal),
-            'total_payable': float(final_total),
-            'discounts_applied': discounts_applied,
-            'total_quantity': total_quantity
+            'subtotal': Coalesce(
+                Subquery(items.annotate(value=Sum(F('unit_price') * F('quantity'))).values('value')),
+                0,
+                output_field=models.DecimalField(max_digits=12, decimal_places=2)
+            ),
+            'total_quantity': Coalesce(Subquery(items.annotate(value=Sum('quantity')).values('value')), 0),
+            'item_count': Coalesce(Subquery(items.annotate(value=Count('id')).values('value')), 0),
+            'cheapest_unit_price': Subquery(items.annotate(value=Min('unit_price')).values('value')),
         }
 
+    @classmethod
+    def refresh_aggregates(cls, queryset=None):
+        """
+        Recompute the maintained aggregates from the items of the given carts
+        (all carts by default) in a single UPDATE. The items version is bumped so
+        totals cached from the previous values are not used anymore.
+        Returns the number of carts updated.
+        """
+        queryset = cls.objects.all() if queryset is None else queryset
+        return queryset.update(items_version=F('items_version') + 1, **cls.get_aggregate_expressions())
+
+    def get_total_payable(self, simulated_date=None):
+        """
+        Calculate total payable with discounts applied.
+        See carts.pricing.calculate_totals for the rules and their order.
+        """
+        # Import here to avoid circular imports
+        from .pricing import price_carts
+        return price_carts([self], simulated_date=simulated_date)[self.id]
+
 
 class CartItem(models.Model):
     """
@@ -152,6 +164,58 @@ class CartItem(models.Model):
     def __str__(self):
         return f"{self.quantity}x {self.product.name} in Cart {self.cart.id}"
 
+    @classmethod
+    def get_prefetch(cls, lookup):
+        """
+        Prefetch for the items reachable through lookup (e.g. 'items' or
+        'cart__items'), loading their products in the same query.
+        """
+        return Prefetch(lookup, queryset=cls.objects.select_related('product').order_by('id'))
+
+    @classmethod
+    def add(cls, cart, product, quantity):
+        """
+        Add quantity of product to cart in a single INSERT ... ON CONFLICT DO
+        UPDATE, so concurrent adds of the same product neither lose an
+        increment nor fail on the (cart, product) unique constraint. A new
+        line takes the current product price, an existing one keeps its price.
+        Returns the item with created set to whether the line is new: lines
+        never hold a quantity below 1 (0 removes them), so the line is new
+        exactly when its quantity is the one just added. Sends no signals:
+        callers update the cart with Cart.apply_item_change().
+        """
+        if quantity < 1:
+            raise ValueError('CartItem.add() needs a quantity of at least 1.')
+        connection = connections[router.db_for_write(cls, instance=cart)]
+        table = connection.ops.quote_name(cls._meta.db_table)
+        now = cls._meta.get_field('created_at').get_db_prep_value(timezone.now(), connection)
+        unit_price = cls._meta.get_field('unit_price').get_db_prep_value(product.price, connection)
+        fields = cls._meta.concrete_fields
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (cart_id, product_id, quantity, unit_price, created_at, updated_at)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                ON CONFLICT (cart_id, product_id) DO UPDATE
+                SET quantity = {table}.quantity + excluded.quantity, updated_at = excluded.updated_at
+                RETURNING {', '.join(connection.ops.quote_name(field.column) for field in fields)}
+                """,
+                [cart.pk, product.pk, quantity, unit_price, now, now]
+            )
+            row = cursor.fetchone()
+        # Convert the values as a queryset would, e.g. SQLite datetimes and decimals
+        values = []
+        for field, value in zip(fields, row):
+            column = field.get_col(cls._meta.db_table)
+            for converter in connection.ops.get_db_converters(column) + column.get_db_converters(connection):
+                value = converter(value, column, connection)
+            values.append(value)
+        item = cls.from_db(connection.alias, [field.attname for field in fields], values)
+        item.created = item.quantity == quantity
+        item.cart = cart
+        item.product = product
+        return item
+
     def get_total_price(self):
         """
         Calculate total price for this item (unit_price × quantity).
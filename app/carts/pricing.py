@@ -0,0 +1,237 @@
+"""
+Pricing for carts.
+
+calculate_totals() is a pure function over a PricingSnapshot: it never touches
+the ORM, so it can be reused by any caller and benchmarked in isolation.
+price_carts() builds the snapshots for a whole set of carts from the aggregates
+maintained on Cart, loading items and products in a single query only for the
+carts that need their lines, so pricing N carts costs a constant number of
+queries instead of several queries per cart. Results are kept in
+carts.cache.totals_cache, so carts that did not change are not priced again.
+"""
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from core.timing import timed
+from promotions.index import promotion_index
+from promotions.utils import promotions_version
+from .cache import totals_cache
+from .models import CartItem
+
+
+def get_active_promotion(effective_date):
+    """
+    Return the special date promotion with the biggest discount active on effective_date, or None.
+    """
+    return promotion_index.best_on(effective_date)
+
+
+class PricingSnapshot:
+    """
+    Immutable, ORM-free view of a cart used as input for pricing.
+    lines: tuple of (product_id, unit_price, quantity, name) tuples.
+    promotion: the resolved special date promotion, or None. Any object with
+    description and discount_amount attributes is accepted.
+    subtotal, total_quantity and cheapest (the line with the lowest unit price)
+    are derived from the lines, or given directly by from_aggregates().
+    """
+    __slots__ = ('lines', 'cart_type', 'promotion', 'subtotal', 'total_quantity', 'cheapest')
+
+    def __init__(self, lines, cart_type, promotion=None):
+        lines = tuple(lines)
+        self._set(
+            lines=lines,
+            cart_type=cart_type,
+            promotion=promotion,
+            subtotal=sum((unit_price * quantity for _, unit_price, quantity, _ in lines), Decimal('0')),
+            total_quantity=sum(quantity for _, _, quantity, _ in lines),
+            cheapest=min(lines, key=lambda line: line[1]) if lines else None,
+        )
+
+    def _set(self, **values):
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self):
+        return f"PricingSnapshot(cart_type={self.cart_type!r}, lines={len(self.lines)})"
+
+    @classmethod
+    def from_items(cls, items, cart_type, promotion=None):
+        """
+        Build a snapshot from CartItem instances with their product already loaded.
+        """
+        return cls(
+            ((item.product_id, item.unit_price, item.quantity, item.product.name) for item in items),
+            cart_type,
+            promotion
+        )
+
+    @classmethod
+    def from_aggregates(cls, subtotal, total_quantity, cart_type, promotion=None):
+        """
+        Build a snapshot without lines from maintained cart aggregates.
+        Only valid when the cheapest line is not needed (see needs_lines()).
+        """
+        snapshot = cls.__new__(cls)
+        snapshot._set(
+            lines=(),
+            cart_type=cart_type,
+            promotion=promotion,
+            subtotal=subtotal,
+            total_quantity=total_quantity,
+            cheapest=None,
+        )
+        return snapshot
+
+    @staticmethod
+    def needs_lines(cart_type, total_quantity):
+        """
+        Whether pricing needs the individual lines (VIP free cheapest item).
+        """
+        return cart_type == 'VIP' and total_quantity > 1
+
+
+def calculate_totals(snapshot):
+    """
+    Apply the discount rules to a PricingSnapshot, in order:
+    1. If total quantity is exactly 4 → 25% discount on subtotal
+    2. If total quantity > 10 → -$100 additional
+    3. If there is an active special date promotion → discount (discount_amount)
+    4. If type == VIP → free one unit of the cheapest item + $500 discount
+    5. Always add $1000 service fee (never less than $1000 total)
+    """
+    cart_type = snapshot.cart_type
+    promotion = snapshot.promotion
+    subtotal = snapshot.subtotal
+    total_quantity = snapshot.total_quantity
+    discounts_applied = []
+    final_total = subtotal
+
+    # Rule 1: Exactly 4 items → 25% discount
+    if total_quantity == 4:
+        discount = subtotal * Decimal('0.25')
+        final_total -= discount
+        discounts_applied.append({
+            'type': 'quantity_exactly_4',
+            'description': '25% de descuento por exactamente 4 productos',
+            'amount': float(discount)
+        })
+
+    # Rule 2: If total quantity > 10 items are purchased → $100 discount
+    if total_quantity > 10:
+        final_total -= Decimal('100.00')
+        discounts_applied.append({
+            'type': 'quantity_over_10',
+            'description': '$100 de descuento por más de 10 productos',
+            'amount': 100.00
+        })
+
+    # Rule 3: If there is an active special date promotion → discount
+    if cart_type != 'VIP':
+        if promotion and promotion.discount_amount > 0:
+            final_total -= promotion.discount_amount
+            discounts_applied.append({
+                'type': 'special_date_promotion',
+                'description': f'Descuento por fecha especial: {promotion.description}',
+                'amount': float(promotion.discount_amount)
+            })
+
+    # Rule 4: If cart is VIP → free one unit of the cheapest item + $500 discount
+    if cart_type == 'VIP':
+        # Only apply free cheapest item if there is more than 1 product in total (any combination)
+        if total_quantity > 1 and snapshot.cheapest:
+            _, item_discount, _, cheapest_name = snapshot.cheapest  # Only one unit
+            final_total -= item_discount
+            discounts_applied.append({
+                'type': 'vip_free_cheapest',
+                'description': f'1x gratis {cheapest_name}',
+                'amount': float(item_discount)
+            })
+        # $500 VIP discount always applies
+        final_total -= Decimal('500.00')
+        discounts_applied.append({
+            'type': 'vip_general',
+            'description': '$500 de descuento VIP',
+            'amount': 500.00
+        })
+
+    # Rule 5: Always add $1000 service fee
+    service_fee = Decimal('1000.00')
+    final_total += service_fee
+    discounts_applied.append({
+        'type': 'service_fee',
+        'description': 'Cargo por servicio',
+        'amount': float(service_fee)
+    })
+
+    # Ensure total doesn't go below service fee
+    final_total = max(final_total, service_fee)
+
+    return {
+        'subtotal': float(subtotal),
+        'total_payable': float(final_total),
+        'discounts_applied': discounts_applied,
+        'total_quantity': total_quantity
+    }
+
+
+@timed('pricing')
+def price_carts(carts, simulated_date=None):
+    """
+    Calculate totals for many carts at once.
+    Carts whose totals are cached for their current items_version, the
+    effective date and the promotion set are not priced again. The rest are
+    priced from their prefetched items (see CartQuerySet.with_items) or from
+    their maintained aggregates when possible; only carts that still need
+    their lines have their items (with products) fetched, in a single query.
+    Returns a dict mapping cart id to the same structure returned by
+    Cart.get_total_payable().
+    """
+    effective_date = simulated_date or date.today()
+    promotion_set = promotions_version.get()
+    totals = {}
+    pending = {}
+    for cart in carts:
+        key = (cart.id, cart.items_version, effective_date, promotion_set)
+        cached = totals_cache.get(key)
+        if cached is None:
+            pending[cart.id] = (cart, key)
+        else:
+            totals[cart.id] = cached
+    if not pending:
+        return totals
+
+    promotion = None
+    if any(cart.cart_type != 'VIP' for cart, _ in pending.values()):
+        promotion = get_active_promotion(effective_date)
+
+    items_by_cart = defaultdict(list)
+    needs_lines = []
+    for cart_id, (cart, _) in pending.items():
+        if 'items' in getattr(cart, '_prefetched_objects_cache', {}):
+            items_by_cart[cart_id] = list(cart.items.all())
+        elif PricingSnapshot.needs_lines(cart.cart_type, cart.total_quantity):
+            needs_lines.append(cart_id)
+    if needs_lines:
+        items = CartItem.objects.filter(
+            cart_id__in=needs_lines
+        ).select_related('product').order_by('id')
+        for item in items:
+            items_by_cart[item.cart_id].append(item)
+
+    for cart_id, (cart, key) in pending.items():
+        if cart_id in items_by_cart:
+            snapshot = PricingSnapshot.from_items(items_by_cart[cart_id], cart.cart_type, promotion)
+        else:
+            snapshot = PricingSnapshot.from_aggregates(cart.subtotal, cart.total_quantity, cart.cart_type, promotion)
+        result = calculate_totals(snapshot)
+        totals_cache.set(key, result)
+        totals[cart_id] = result
+    return totals
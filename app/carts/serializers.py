@@ -1,9 +1,10 @@
 from rest_framework import serializers
+from core.timing import TimedSerializerMixin
 from .models import Cart, CartItem
 from products.serializers import ProductSerializer
 
 
-class CartItemSerializer(serializers.ModelSerializer):
+class CartItemSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for CartItem model.
     """
@@ -24,9 +25,33 @@ class CartItemSerializer(serializers.ModelSerializer):
             'updated_at'
         ]
         read_only_fields = ['id', 'unit_price', 'created_at', 'updated_at']
+        # Adding 0 would leave an empty line; PATCH with 0 is how a line is removed
+        extra_kwargs = {'quantity': {'min_value': 1}}
 
 
-class CartSerializer(serializers.ModelSerializer):
+class CartItemBulkEntrySerializer(serializers.Serializer):
+    """
+    One line of a bulk cart update: the new quantity of a product (0 removes it).
+    """
+    product_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=0)
+
+
+class CartItemBulkSerializer(serializers.Serializer):
+    """
+    Serializer for setting several cart lines at once.
+    """
+    items = CartItemBulkEntrySerializer(many=True, allow_empty=False, max_length=200)
+
+    def validate_items(self, items):
+        """Each product may only appear once."""
+        product_ids = [item['product_id'] for item in items]
+        if len(set(product_ids)) != len(product_ids):
+            raise serializers.ValidationError('Each product can only appear once.')
+        return items
+
+
+class CartSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for Cart model with items and calculated totals.
     """
@@ -64,8 +89,11 @@ class CartSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         """Override to include calculated fields."""
         data = super().to_representation(instance)
-        simulated_date = self.context.get('simulated_date', None)
-        totals = instance.get_total_payable(simulated_date=simulated_date)
+        # Views that price carts in batch pass the results in the context
+        totals = self.context.get('cart_totals', {}).get(instance.id)
+        if totals is None:
+            simulated_date = self.context.get('simulated_date', None)
+            totals = instance.get_total_payable(simulated_date=simulated_date)
         data['subtotal'] = totals['subtotal']
         data['total_payable'] = totals['total_payable']
         data['discounts_applied'] = totals['discounts_applied']
@@ -73,6 +101,25 @@ class CartSerializer(serializers.ModelSerializer):
         return data
 
 
+class CartSummarySerializer(serializers.ModelSerializer):
+    """
+    Serializer for the totals of a cart, without its items.
+    Expects the cart totals in the 'cart_totals' context.
+    """
+
+    class Meta:
+        model = Cart
+        fields = ['id', 'cart_type', 'status', 'item_count', 'total_quantity', 'updated_at']
+
+    def to_representation(self, instance):
+        """Add the priced totals."""
+        data = super().to_representation(instance)
+        totals = self.context['cart_totals'][instance.id]
+        data['subtotal'] = totals['subtotal']
+        data['total_payable'] = totals['total_payable']
+        return data
+
+
 class CartCreateSerializer(serializers.ModelSerializer):
     """
     Serializer for creating new carts.
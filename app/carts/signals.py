@@ -1,6 +1,7 @@
-from django.db.models.signals import post_save
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Cart
+from .models import Cart, CartItem
 
 
 @receiver(post_save, sender=Cart)
@@ -14,8 +15,8 @@ def handle_cart_status_change(sender, instance, created, **kwargs):
             # Here you would typically:
             # 1. Create an order in the orders app
             # 2. Send notifications
-            # 3. Update inventory
-            # 4. Generate invoice
+            # 3. Generate invoice
+            # (stock is taken at checkout, see Product.take_stock)
             
             print(f"Cart {instance.id} has been finalized!")
             print(f"User: {instance.user.username}")
@@ -30,4 +31,16 @@ def handle_cart_status_change(sender, instance, created, **kwargs):
             # For now, just print the information
             # In a real application, you would:
             # from orders.models import Order
-            # Order.objects.create_from_cart(instance) 
\ No newline at end of file
+            # Order.objects.create_from_cart(instance)
+
+
+@receiver(post_save, sender=CartItem)
+@receiver(post_delete, sender=CartItem)
+def handle_cart_item_change(sender, instance, **kwargs):
+    """
+    Bump the cart items version so cached totals for the cart are no longer used.
+    """
+    Cart.objects.filter(pk=instance.cart_id).update(items_version=F('items_version') + 1)
+    # Keep an already loaded cart consistent with the database
+    if CartItem.cart.is_cached(instance):
+        instance.cart.items_version += 1
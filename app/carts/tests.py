@@ -1,3 +1,820 @@
-from django.test import TestCase
+import base64
+import re
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest import skipUnless
+from unittest.mock import patch
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import AsyncClient, SimpleTestCase, TestCase, TransactionTestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from datetime import date
+from decimal import Decimal
+from core.routers import replica_reads
+from products.models import Product
+from promotions.index import promotion_index
+from promotions.models import SpecialDatePromotion
+from promotions.utils import PROMOTIONS_VERSION_KEY
+from .cache import LRUCache, totals_cache
+from .models import Cart, CartItem
+from .pricing import PricingSnapshot, calculate_totals, price_carts
 
-# Create your tests here.
+
+class PricingSnapshotTests(SimpleTestCase):
+    """
+    Tests for the ORM-free pricing core.
+    """
+
+    def test_snapshot_is_immutable(self):
+        """
+        Test that a snapshot cannot be modified after creation.
+        """
+        snapshot = PricingSnapshot([(1, Decimal('10.00'), 2, 'Soap')], 'COMUN')
+        with self.assertRaises(AttributeError):
+            snapshot.cart_type = 'VIP'
+        with self.assertRaises(AttributeError):
+            snapshot.extra = True
+        self.assertIsInstance(snapshot.lines, tuple)
+
+    def test_calculate_totals_from_lines(self):
+        """
+        Test pricing straight from line tuples and a plain promotion object.
+        """
+        promotion = type('Promotion', (), {'description': 'Promo', 'discount_amount': Decimal('300.00')})()
+        lines = [(1, Decimal('2000.00'), 3, 'Lamp'), (2, Decimal('500.00'), 1, 'Soap')]
+        totals = calculate_totals(PricingSnapshot(lines, 'FECHA_ESPECIAL', promotion))
+        self.assertEqual(totals['subtotal'], 6500.0)
+        self.assertEqual(totals['total_quantity'], 4)
+        self.assertEqual(totals['total_payable'], 6500 * 0.75 - 300 + 1000)
+
+        totals = calculate_totals(PricingSnapshot(lines, 'VIP', promotion))
+        self.assertEqual(totals['discounts_applied'][1]['description'], '1x gratis Soap')
+        self.assertEqual(totals['total_payable'], 6500 * 0.75 - 500 - 500 + 1000)
+
+
+class CartPricingTests(TestCase):
+    """
+    Tests for cart discount rules and batch pricing.
+    """
+
+    def setUp(self):
+        """
+        Set up test data.
+        """
+        totals_cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='buyer', password='testpassword123')
+        self.soap = Product.objects.create(name='Soap', description='Soap bar', price=Decimal('100.00'), stock=10)
+        self.brush = Product.objects.create(name='Brush', description='Bamboo brush', price=Decimal('250.00'), stock=10)
+        SpecialDatePromotion.objects.create(
+            start_date=date(2025, 6, 1),
+            end_date=date(2025, 6, 30),
+            description='Summer Sale',
+            discount_amount=Decimal('300.00')
+        )
+
+    def add_item(self, cart, product, quantity):
+        item = CartItem.objects.create(cart=cart, product=product, quantity=quantity, unit_price=product.price)
+        Cart.apply_item_change(cart.id, quantity, product.price * quantity, 1)
+        cart.refresh_from_db()
+        return item
+
+    def test_exactly_four_items_discount(self):
+        """
+        Test that exactly 4 units get a 25% discount plus the service fee.
+        """
+        cart = Cart.objects.create(user=self.user, cart_type='COMUN')
+        self.add_item(cart, self.soap, 4)
+        totals = cart.get_total_payable(simulated_date=date(2025, 9, 1))
+        self.assertEqual(totals['subtotal'], 400.0)
+        self.assertEqual(totals['total_quantity'], 4)
+        self.assertEqual(totals['total_payable'], 1300.0)
+
+    def test_special_date_promotion_discount(self):
+        """
+        Test that the active promotion is discounted for non VIP carts.
+        """
+        cart = Cart.objects.create(user=self.user, cart_type='FECHA_ESPECIAL')
+        self.add_item(cart, self.brush, 2)
+        totals = cart.get_total_payable(simulated_date=date(2025, 6, 15))
+        types = [discount['type'] for discount in totals['discounts_applied']]
+        self.assertIn('special_date_promotion', types)
+        self.assertEqual(totals['total_payable'], 1200.0)
+
+    def test_vip_cheapest_item_free(self):
+        """
+        Test that VIP carts get the cheapest unit for free plus $500 off, and no date promotion.
+        """
+        cart = Cart.objects.create(user=self.user, cart_type='VIP')
+        self.add_item(cart, self.brush, 1)
+        self.add_item(cart, self.soap, 1)
+        totals = cart.get_total_payable(simulated_date=date(2025, 6, 15))
+        types = [discount['type'] for discount in totals['discounts_applied']]
+        self.assertEqual(types, ['vip_free_cheapest', 'vip_general', 'service_fee'])
+        self.assertEqual(totals['discounts_applied'][0]['description'], '1x gratis Soap')
+        self.assertEqual(totals['total_payable'], 1000.0)
+
+    def test_price_carts_matches_single_cart_pricing(self):
+        """
+        Test that batch pricing returns the same totals as pricing each cart on its own.
+        """
+        carts = [
+            Cart.objects.create(user=self.user, cart_type='COMUN'),
+            Cart.objects.create(user=self.user, cart_type='FECHA_ESPECIAL'),
+            Cart.objects.create(user=self.user, cart_type='VIP'),
+        ]
+        for index, cart in enumerate(carts):
+            self.add_item(cart, self.soap, index + 3)
+            self.add_item(cart, self.brush, 1)
+        simulated_date = date(2025, 6, 15)
+        totals = price_carts(Cart.objects.filter(user=self.user), simulated_date=simulated_date)
+        for cart in carts:
+            self.assertEqual(totals[cart.id], cart.get_total_payable(simulated_date=simulated_date))
+
+    def test_price_carts_query_count_is_constant(self):
+        """
+        Test that batch pricing issues the same number of queries regardless of the number of carts.
+        """
+        for cart_type in ['COMUN', 'FECHA_ESPECIAL', 'VIP']:
+            cart = Cart.objects.create(user=self.user, cart_type=cart_type)
+            self.add_item(cart, self.soap, 2)
+            self.add_item(cart, self.brush, 3)
+        carts = list(Cart.objects.filter(user=self.user))
+        with self.assertNumQueries(2):
+            price_carts(carts, simulated_date=date(2025, 6, 15))
+
+    def test_totals_are_cached_until_items_change(self):
+        """
+        Test that unchanged carts are served from the totals cache and item changes invalidate it.
+        """
+        cart = Cart.objects.create(user=self.user, cart_type='COMUN')
+        item = self.add_item(cart, self.soap, 2)
+        simulated_date = date(2025, 9, 1)
+        cart.get_total_payable(simulated_date=simulated_date)
+        with self.assertNumQueries(0):
+            totals = cart.get_total_payable(simulated_date=simulated_date)
+        self.assertEqual(totals['subtotal'], 200.0)
+        self.assertEqual(totals_cache.stats()['hits'], 1)
+
+        item.quantity = 3
+        item.save()
+        Cart.apply_item_change(cart.id, 1, item.unit_price)
+        cart.refresh_from_db()
+        self.assertEqual(cart.get_total_payable(simulated_date=simulated_date)['subtotal'], 300.0)
+
+    def test_promotion_change_invalidates_cached_totals(self):
+        """
+        Test that saving a promotion makes cached totals stale.
+        """
+        cart = Cart.objects.create(user=self.user, cart_type='COMUN')
+        self.add_item(cart, self.brush, 1)
+        simulated_date = date(2025, 10, 1)
+        self.assertEqual(cart.get_total_payable(simulated_date=simulated_date)['total_payable'], 1250.0)
+        SpecialDatePromotion.objects.create(
+            start_date=date(2025, 10, 1),
+            end_date=date(2025, 10, 31),
+            description='October Sale',
+            discount_amount=Decimal('200.00')
+        )
+        self.assertEqual(cart.get_total_payable(simulated_date=simulated_date)['total_payable'], 1050.0)
+
+    def test_promotion_change_in_another_process_invalidates_cached_totals(self):
+        """
+        Test that cached totals are priced again once the shared promotions version changes.
+        """
+        cart = Cart.objects.create(user=self.user, cart_type='COMUN')
+        self.add_item(cart, self.brush, 1)
+        simulated_date = date(2025, 9, 1)
+        cart.get_total_payable(simulated_date=simulated_date)
+        cart.get_total_payable(simulated_date=simulated_date)
+        self.assertEqual(totals_cache.stats()['misses'], 1)
+        # What another process does on a promotion change, without this process's signals
+        cache.incr(PROMOTIONS_VERSION_KEY)
+        cart.get_total_payable(simulated_date=simulated_date)
+        self.assertEqual(totals_cache.stats()['misses'], 2)
+
+
+
+class CartAggregatesTests(TestCase):
+    """
+    Tests for the aggregates maintained on Cart.
+    """
+
+    def setUp(self):
+        """
+        Set up test data.
+        """
+        totals_cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='buyer', password='testpassword123')
+        self.client.force_login(self.user)
+        self.soap = Product.objects.create(name='Soap', description='Soap bar', price=Decimal('100.00'), stock=10)
+        self.brush = Product.objects.create(name='Brush', description='Bamboo brush', price=Decimal('250.00'), stock=10)
+        self.cart = Cart.objects.create(user=self.user, cart_type='COMUN')
+
+    def assertAggregates(self, subtotal, total_quantity, item_count, cheapest_unit_price):
+        self.cart.refresh_from_db()
+        self.assertEqual(
+            (self.cart.subtotal, self.cart.total_quantity, self.cart.item_count, self.cart.cheapest_unit_price),
+            (subtotal, total_quantity, item_count, cheapest_unit_price)
+        )
+
+    def test_item_endpoints_maintain_aggregates(self):
+        """
+        Test that adding, updating and deleting items through the API keeps the aggregates in sync.
+        """
+        url = f'/carts/{self.cart.id}/items/'
+        self.client.post(url, {'product_id': self.brush.id, 'quantity': 2}, content_type='application/json')
+        response = self.client.post(url, {'product_id': self.soap.id, 'quantity': 1}, content_type='application/json')
+        self.assertAggregates(Decimal('600.00'), 3, 2, Decimal('100.00'))
+
+        self.client.post(url, {'product_id': self.soap.id, 'quantity': 2}, content_type='application/json')
+        self.assertAggregates(Decimal('800.00'), 5, 2, Decimal('100.00'))
+
+        soap_item = response.json()['id']
+        self.client.patch(f'{url}{soap_item}/', {'quantity': 1}, content_type='application/json')
+        self.assertAggregates(Decimal('600.00'), 3, 2, Decimal('100.00'))
+
+        self.client.delete(f'{url}{soap_item}/')
+        self.assertAggregates(Decimal('500.00'), 2, 1, Decimal('250.00'))
+
+    def test_item_updates_lock_the_line(self):
+        """
+        Test that PATCH and DELETE read the line with SELECT ... FOR UPDATE where the database supports it.
+        """
+        item = CartItem.add(self.cart, self.soap, 2)
+        Cart.refresh_aggregates(Cart.objects.filter(pk=self.cart.pk))
+        url = f'/carts/{self.cart.id}/items/{item.id}/'
+        for method in (self.client.patch, self.client.delete):
+            with self.subTest(method=method.__name__), CaptureQueriesContext(connection) as context:
+                method(url, {'quantity': 1}, content_type='application/json')
+            locked = any('FOR UPDATE' in query['sql'] for query in context.captured_queries)
+            self.assertEqual(locked, connection.features.has_select_for_update)
+        self.assertAggregates(Decimal('0.00'), 0, 0, None)
+
+    def test_invalid_quantities_are_rejected(self):
+        """
+        Test that a negative or non-integer quantity is answered with 400 and changes nothing.
+        """
+        item = CartItem.add(self.cart, self.soap, 2)
+        Cart.refresh_aggregates(Cart.objects.filter(pk=self.cart.pk))
+        for quantity in (-1, 'two'):
+            with self.subTest(quantity=quantity):
+                response = self.client.patch(
+                    f'/carts/{self.cart.id}/items/{item.id}/', {'quantity': quantity}, content_type='application/json'
+                )
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('quantity', response.json())
+        self.assertAggregates(Decimal('200.00'), 2, 1, Decimal('100.00'))
+
+    def test_add_item_is_a_single_upsert(self):
+        """
+        Test that adding a product writes the item with one INSERT ... ON CONFLICT and keeps its first price.
+        """
+        url = f'/carts/{self.cart.id}/items/'
+        first = self.client.post(url, {'product_id': self.soap.id, 'quantity': 1}, content_type='application/json')
+        self.assertEqual(first.status_code, 201)
+        self.soap.price = Decimal('120.00')
+        self.soap.save()
+
+        with CaptureQueriesContext(connection) as context:
+            second = self.client.post(url, {'product_id': self.soap.id, 'quantity': 2}, content_type='application/json')
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second.json()['id'], first.json()['id'])
+        self.assertEqual((second.json()['quantity'], second.json()['unit_price']), (3, '100.00'))
+        item_queries = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].lstrip().startswith(('INSERT INTO "carts_cartitem"', 'UPDATE "carts_cartitem"', 'SELECT "carts_cartitem"'))
+        ]
+        self.assertEqual(len(item_queries), 1)
+        self.assertIn('ON CONFLICT', item_queries[0])
+        self.assertAggregates(Decimal('300.00'), 3, 1, Decimal('100.00'))
+
+    def test_add_reports_new_and_existing_lines(self):
+        """
+        Test that CartItem.add inserts once and then increments, bumping the items version through the cart.
+        """
+        version = self.cart.items_version
+        item = CartItem.add(self.cart, self.brush, 2)
+        again = CartItem.add(self.cart, self.brush, 3)
+        self.assertTrue(item.created)
+        self.assertFalse(again.created)
+        self.assertEqual((again.pk, again.quantity), (item.pk, 5))
+        stored = CartItem.objects.get(cart=self.cart)
+        self.assertEqual(stored.quantity, 5)
+        self.assertEqual((again.unit_price, again.created_at), (stored.unit_price, stored.created_at))
+        with self.assertRaises(ValueError):
+            CartItem.add(self.cart, self.brush, 0)
+
+        Cart.apply_item_change(self.cart.id, 5, Decimal('1250.00'), 1)
+        self.assertAggregates(Decimal('1250.00'), 5, 1, Decimal('250.00'))
+        self.assertEqual(self.cart.items_version, version + 1)
+
+    def test_add_writes_to_the_default_database(self):
+        """
+        Test that CartItem.add runs on the write database even inside replica reads.
+        """
+        with patch('core.routers.has_replica', return_value=True), replica_reads():
+            item = CartItem.add(self.cart, self.brush, 1)
+        self.assertTrue(item.created)
+        self.assertEqual(item._state.db, 'default')
+        response = self.client.post(
+            f'/carts/{self.cart.id}/items/', {'product_id': self.brush.id, 'quantity': 0},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_reconcile_command_repairs_drift(self):
+        """
+        Test that the reconciliation command detects and repairs drifted carts.
+        """
+        CartItem.objects.create(cart=self.cart, product=self.soap, quantity=3, unit_price=self.soap.price)
+        out = StringIO()
+        call_command('reconcile_cart_aggregates', '--dry-run', stdout=out)
+        self.assertIn('Would repair 1 carts', out.getvalue())
+        self.assertAggregates(Decimal('0.00'), 0, 0, None)
+
+        call_command('reconcile_cart_aggregates', stdout=StringIO())
+        self.assertAggregates(Decimal('300.00'), 3, 1, Decimal('100.00'))
+        out = StringIO()
+        call_command('reconcile_cart_aggregates', stdout=out)
+        self.assertIn('consistent', out.getvalue())
+
+
+
+class CartReadPathTests(TestCase):
+    """
+    Tests for the query count of the cart read endpoints.
+    """
+
+    def setUp(self):
+        """
+        Set up test data.
+        """
+        self.client = Client()
+        self.user = User.objects.create_user(username='vip', password='testpassword123')
+        self.client.force_login(self.user)
+        self.products = [
+            Product.objects.create(name=f'Product {i}', description='Test product', price=Decimal(100 + i), stock=10)
+            for i in range(8)
+        ]
+        # Load the promotion index up front, it is only queried once per process
+        promotion_index.invalidate()
+        promotion_index.active_on(date.today())
+
+    def create_cart(self, cart_type, item_count):
+        cart = Cart.objects.create(user=self.user, cart_type=cart_type, status='FINALIZADO')
+        for product in self.products[:item_count]:
+            CartItem.objects.create(cart=cart, product=product, quantity=2, unit_price=product.price)
+        Cart.refresh_aggregates(Cart.objects.filter(pk=cart.pk))
+        return cart
+
+    def count_queries(self, url):
+        totals_cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_cart_detail_query_count_is_constant(self):
+        """
+        Test that the cart detail costs the same number of queries with 1 or 8 items.
+        """
+        small = self.create_cart('VIP', 1)
+        large = self.create_cart('VIP', 8)
+        self.assertEqual(self.count_queries(f'/carts/{small.id}/'), self.count_queries(f'/carts/{large.id}/'))
+
+        response = self.client.get(f'/carts/{large.id}/')
+        self.assertEqual(len(response.json()['items']), 8)
+        self.assertEqual(response.json()['total_quantity'], 16)
+
+    def test_cart_list_query_count_is_constant(self):
+        """
+        Test that listing carts costs the same number of queries with 1 or 4 carts.
+        """
+        self.create_cart('VIP', 3)
+        single = self.count_queries('/carts/')
+        for item_count in (2, 5, 8):
+            self.create_cart('COMUN', item_count)
+        self.assertEqual(self.count_queries('/carts/'), single)
+
+
+class LRUCacheTests(SimpleTestCase):
+    """
+    Tests for the bounded LRU cache.
+    """
+
+    def test_evicts_least_recently_used(self):
+        """
+        Test that the oldest unused entry is evicted and counters are tracked.
+        """
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.stats(), {'hits': 2, 'misses': 1, 'size': 2, 'maxsize': 2})
+
+
+class ConditionalGetTests(TestCase):
+    """
+    Tests for the ETag support of the cart endpoints.
+    """
+
+    def setUp(self):
+        """
+        Set up test data.
+        """
+        totals_cache.clear()
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='buyer', password='testpassword123')
+        self.client.force_login(self.user)
+        self.soap = Product.objects.create(name='Soap', description='Soap bar', price=Decimal('100.00'), stock=10)
+        self.cart = Cart.objects.create(user=self.user, cart_type='COMUN')
+
+    def assertRevalidates(self, url):
+        """
+        Assert that url sends an ETag and answers it with 304, returning the ETag.
+        """
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertIn('no-cache', response['Cache-Control'])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+        return etag
+
+    def test_cart_detail(self):
+        """
+        Test that the cart ETag changes with its items and with the effective date.
+        """
+        url = f'/carts/{self.cart.id}/'
+        etag = self.assertRevalidates(url)
+        self.assertIn('private', self.client.get(url)['Cache-Control'])
+
+        self.client.post(
+            f'/carts/{self.cart.id}/items/', {'product_id': self.soap.id, 'quantity': 1},
+            content_type='application/json'
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['items']), 1)
+
+        etag = self.assertRevalidates(url)
+        self.assertEqual(self.client.get(f'{url}?fecha=2025-06-15', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_not_modified_skips_serialization(self):
+        """
+        Test that a 304 for the cart detail only reads the cart version stamp.
+        """
+        url = f'/carts/{self.cart.id}/'
+        etag = self.client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # The session and the user come from the cache, only the cart version stamp is read
+        self.assertEqual(len(context.captured_queries), 1)
+
+    def test_other_users_cart(self):
+        """
+        Test that a cart of another user is still a 404 without an ETag.
+        """
+        other = User.objects.create_user(username='other', password='testpassword123')
+        cart = Cart.objects.create(user=other, cart_type='COMUN')
+        response = self.client.get(f'/carts/{cart.id}/', HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_promotions_stamp_is_shared(self):
+        """
+        Test that ETags are not revalidated after another process changes promotions or the cache loses the version.
+        """
+        for url in [f'/carts/{self.cart.id}/', '/promotions/special-dates/', '/carts/active/summary/']:
+            with self.subTest(url=url):
+                etag = self.assertRevalidates(url)
+                cache.incr(PROMOTIONS_VERSION_KEY)
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+                etag = self.assertRevalidates(url)
+                # A restarted cache starts a new version instead of reusing an old one
+                cache.delete(PROMOTIONS_VERSION_KEY)
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class AsyncReadViewTests(TestCase):
+    """
+    Tests for the async read views served under ASGI (core.asgi_urls).
+    """
+
+    def setUp(self):
+        """
+        Set up test data.
+        """
+        totals_cache.clear()
+        cache.clear()
+        self.user = User.objects.create_user(username='buyer', password='testpassword123')
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.async_client.force_login(self.user)
+        soap = Product.objects.create(name='Soap', description='Soap bar', price=Decimal('100.00'), stock=10)
+        ordered = Cart.objects.create(user=self.user, cart_type='COMUN')
+        self.add_item(ordered, soap, 2)
+        response = self.client.post('/orders/create/', {'cart_id': ordered.id}, content_type='application/json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.cart = Cart.objects.create(user=self.user, cart_type='COMUN')
+        self.add_item(self.cart, soap, 3)
+        SpecialDatePromotion.objects.create(
+            start_date=date(2025, 6, 1), end_date=date(2025, 6, 30),
+            description='June', discount_amount=Decimal('300.00')
+        )
+
+    def add_item(self, cart, product, quantity):
+        self.client.post(
+            f'/carts/{cart.id}/items/', {'product_id': product.id, 'quantity': quantity},
+            content_type='application/json'
+        )
+
+    def async_get(self, url, client=None, **headers):
+        with override_settings(ROOT_URLCONF='core.asgi_urls'):
+            return async_to_sync((client or self.async_client).get)(url, headers=headers)
+
+    def test_responses_match_sync_views(self):
+        """
+        Test that the async views answer with the same data as the synchronous ones and that
+        Server-Timing counts the queries they run in sync_to_async threads.
+        """
+        urls = [
+            f'/carts/{self.cart.id}/?fecha=2025-06-15',
+            '/orders/?user=true',
+            '/products/?q=soap&min_price=50',
+            '/promotions/special-dates/?fecha=2025-06-15',
+            '/carts/',
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                async_response = self.async_get(url)
+                self.assertEqual(async_response.status_code, 200)
+                queries = re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', async_response['Server-Timing'])
+                self.assertGreater(int(queries[1]), 0)
+                cache.clear()
+                self.assertEqual(async_response.json(), self.client.get(url).json())
+
+    def test_conditional_get(self):
+        """
+        Test that the async views send the ETags of the synchronous ones and answer them with 304
+        until the promotions version changes.
+        """
+        url = f'/carts/{self.cart.id}/'
+        etag = self.client.get(url)['ETag']
+        response = self.async_get(url)
+        self.assertEqual(response['ETag'], etag)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertEqual(self.async_get(url, if_none_match=etag).status_code, 304)
+        cache.incr(PROMOTIONS_VERSION_KEY)
+        self.assertEqual(self.async_get(url, if_none_match=etag).status_code, 200)
+
+        url = '/promotions/special-dates/'
+        self.assertEqual(self.async_get(url)['ETag'], self.client.get(url)['ETag'])
+
+    def test_errors(self):
+        """
+        Test that login, missing carts and invalid filters are answered like the synchronous views.
+        """
+        anonymous = AsyncClient()
+        self.assertEqual(self.async_get(f'/carts/{self.cart.id}/', client=anonymous).status_code, 403)
+        self.assertEqual(self.async_get('/orders/', client=anonymous).status_code, 403)
+        self.assertEqual(self.async_get('/products/', client=anonymous).status_code, 200)
+        for url in ['/carts/0/', '/products/?min_price=abc']:
+            with self.subTest(url=url):
+                response = self.async_get(url)
+                expected = self.client.get(url)
+                self.assertEqual(response.status_code, expected.status_code)
+                self.assertEqual(response.json(), expected.json())
+
+    def test_other_methods_use_sync_view(self):
+        """
+        Test that deleting a cart through the async routes still works.
+        """
+        with override_settings(ROOT_URLCONF='core.asgi_urls'):
+            response = async_to_sync(self.async_client.delete)(f'/carts/{self.cart.id}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Cart.objects.filter(pk=self.cart.pk).exists())
+
+    def test_basic_authentication(self):
+        """
+        Test that the async routes accept the authentication classes of the DRF views, with CSRF left to DRF.
+        """
+        client = AsyncClient(enforce_csrf_checks=True)
+        credentials = base64.b64encode(b'buyer:testpassword123').decode()
+        url = f'/carts/{self.cart.id}/'
+        response = self.async_get(url, client=client, authorization=f'Basic {credentials}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['id'], self.cart.id)
+        self.assertEqual(self.async_get(url, client=client, authorization='Basic d3Jvbmc6d3Jvbmc=').status_code, 403)
+
+        with override_settings(ROOT_URLCONF='core.asgi_urls'):
+            response = async_to_sync(client.delete)(url, headers={'authorization': f'Basic {credentials}'})
+            self.assertEqual(response.status_code, 204)
+            # Session-authenticated writes still need the CSRF token
+            client.force_login(self.user)
+            other = Cart.objects.create(user=self.user, cart_type='COMUN')
+            response = async_to_sync(client.delete)(f'/carts/{other.id}/')
+            self.assertEqual(response.status_code, 403)
+        self.assertFalse(Cart.objects.filter(pk=self.cart.pk).exists())
+        self.assertTrue(Cart.objects.filter(pk=other.pk).exists())
+
+
+class CartItemBulkTests(TestCase):
+    """
+    Tests for the bulk cart item endpoint.
+    """
+
+    def setUp(self):
+        """
+        Set up test data.
+        """
+        totals_cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='buyer', password='testpassword123')
+        self.client.force_login(self.user)
+        self.products = [
+            Product.objects.create(name=f'Product {i}', description='Test product', price=Decimal(100 * (i + 1)), stock=10)
+            for i in range(4)
+        ]
+        self.cart = Cart.objects.create(user=self.user, cart_type='COMUN')
+        self.url = f'/carts/{self.cart.id}/items/bulk/'
+        # Load the promotion index up front, it is only queried once per process
+        promotion_index.invalidate()
+        promotion_index.active_on(date.today())
+
+    def post(self, *lines):
+        items = [{'product_id': self.products[index].id, 'quantity': quantity} for index, quantity in lines]
+        return self.client.post(self.url, {'items': items}, content_type='application/json')
+
+    def test_sets_adds_and_removes_lines(self):
+        """
+        Test that one request creates, updates and deletes lines and returns the priced cart.
+        """
+        response = self.post((0, 1), (1, 2), (2, 1))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_quantity'], 4)
+        # Exactly 4 products: 25% off, plus the service fee
+        self.assertEqual(response.json()['total_payable'], 1600.0)
+
+        response = self.post((0, 3), (1, 0), (3, 1), (2, 1))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(
+            sorted((item['product']['name'], item['quantity']) for item in data['items']),
+            [('Product 0', 3), ('Product 2', 1), ('Product 3', 1)]
+        )
+        self.assertEqual((data['subtotal'], data['total_quantity']), (1000.0, 5))
+        self.cart.refresh_from_db()
+        self.assertEqual((self.cart.subtotal, self.cart.total_quantity, self.cart.item_count), (Decimal('1000.00'), 5, 3))
+
+    def test_existing_lines_keep_their_price(self):
+        """
+        Test that changing the quantity of an existing line keeps the price it was added with.
+        """
+        self.post((0, 1))
+        self.products[0].price = Decimal('150.00')
+        self.products[0].save()
+        response = self.post((0, 2), (1, 1))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sorted((item['product']['name'], item['quantity'], item['unit_price']) for item in response.json()['items']),
+            [('Product 0', 2, '100.00'), ('Product 1', 1, '200.00')]
+        )
+
+    def test_query_count_does_not_grow_with_lines(self):
+        """
+        Test that adding 4 products costs the same number of queries as adding 1.
+        """
+        with CaptureQueriesContext(connection) as single:
+            self.post((0, 1))
+        CartItem.objects.all().delete()
+        with CaptureQueriesContext(connection) as several:
+            self.post((0, 1), (1, 1), (2, 1), (3, 1))
+        self.assertEqual(len(several.captured_queries), len(single.captured_queries))
+
+    def test_invalid_requests_change_nothing(self):
+        """
+        Test that duplicated or unknown products are rejected without writing anything.
+        """
+        response = self.post((0, 1), (0, 2))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('items', response.json())
+
+        response = self.client.post(
+            self.url, {'items': [{'product_id': self.products[0].id, 'quantity': 1}, {'product_id': 999999, 'quantity': 1}]},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('999999', response.json()['items'][0])
+        self.assertFalse(CartItem.objects.exists())
+
+
+@skipUnless(connection.vendor == 'postgresql', 'SQLite runs one write transaction at a time')
+class CartItemBulkConcurrencyTests(TransactionTestCase):
+    """
+    Tests for the bulk cart item endpoint racing single adds of the same product.
+    """
+
+    def test_concurrent_bulk_and_single_adds(self):
+        """
+        Test that bulk requests and single adds of the same new product all succeed and share one line.
+        """
+        user = User.objects.create_user(username='racer', password='testpassword123')
+        product = Product.objects.create(name='Hot product', price=Decimal('5.00'), stock=100)
+        cart = Cart.objects.create(user=user, cart_type='COMUN')
+        requests = [
+            (f'/carts/{cart.id}/items/', {'product_id': product.id, 'quantity': 1}),
+            (f'/carts/{cart.id}/items/bulk/', {'items': [{'product_id': product.id, 'quantity': 5}]}),
+        ] * 4
+
+        def send(request):
+            client = Client()
+            client.force_login(user)
+            try:
+                return client.post(*request, content_type='application/json').status_code
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            statuses = list(executor.map(send, requests))
+        self.assertEqual(sorted(statuses), [200] * 4 + [201] * 4)
+        self.assertEqual(CartItem.objects.filter(cart=cart, product=product).count(), 1)
+
+
+class CartSummaryTests(TestCase):
+    """
+    Tests for the cart summary endpoints.
+    """
+
+    def setUp(self):
+        """
+        Set up test data.
+        """
+        totals_cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='buyer', password='testpassword123')
+        self.client.force_login(self.user)
+        self.soap = Product.objects.create(name='Soap', description='Soap bar', price=Decimal('100.00'), stock=10)
+        self.cart = Cart.objects.create(user=self.user, cart_type='COMUN')
+        CartItem.objects.create(cart=self.cart, product=self.soap, quantity=4, unit_price=self.soap.price)
+        Cart.refresh_aggregates(Cart.objects.filter(pk=self.cart.pk))
+        promotion_index.invalidate()
+        promotion_index.active_on(date.today())
+
+    def test_summary_matches_cart_detail(self):
+        """
+        Test that the summary has the totals of the full cart in fewer queries.
+        """
+        with CaptureQueriesContext(connection) as detail_queries:
+            detail = self.client.get(f'/carts/{self.cart.id}/').json()
+        totals_cache.clear()
+        with CaptureQueriesContext(connection) as summary_queries:
+            response = self.client.get(f'/carts/{self.cart.id}/summary/')
+        self.assertEqual(response.status_code, 200)
+        summary = response.json()
+        self.assertNotIn('items', summary)
+        self.assertEqual(
+            (summary['item_count'], summary['total_quantity'], summary['subtotal'], summary['total_payable']),
+            (1, detail['total_quantity'], detail['subtotal'], detail['total_payable'])
+        )
+        self.assertLess(len(summary_queries.captured_queries), len(detail_queries.captured_queries))
+
+        etag = response['ETag']
+        self.assertEqual(self.client.get(f'/carts/{self.cart.id}/summary/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.client.post(
+            f'/carts/{self.cart.id}/items/', {'product_id': self.soap.id, 'quantity': 1}, content_type='application/json'
+        )
+        response = self.client.get(f'/carts/{self.cart.id}/summary/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response.json()['total_quantity']), (200, 5))
+
+    def test_active_summary(self):
+        """
+        Test that the active summary follows the active cart of the user and is empty without one.
+        """
+        response = self.client.get('/carts/active/summary/')
+        self.assertEqual((response.json()['id'], response.json()['total_quantity']), (self.cart.id, 4))
+        etag = response['ETag']
+        self.assertEqual(self.client.get('/carts/active/summary/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.cart.status = 'FINALIZADO'
+        self.cart.save()
+        response = self.client.get('/carts/active/summary/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {'id': None, 'cart_type': 'COMUN', 'status': None, 'item_count': 0, 'total_quantity': 0,
+             'updated_at': None, 'subtotal': 0.0, 'total_payable': 0.0}
+        )
@@ -5,7 +5,10 @@ from . import views
 urlpatterns = [
     path('', CartListCreateView.as_view(), name='cart-list-create'),
     path('<int:pk>/', views.CartDetailView.as_view(), name='cart-detail'),
+    path('<int:pk>/summary/', views.CartSummaryView.as_view(), name='cart-summary'),
+    path('active/summary/', views.ActiveCartSummaryView.as_view(), name='cart-active-summary'),
     # Cart items endpoints
     path('<int:cart_id>/items/', views.CartItemCreateView.as_view(), name='cart-item-create'),
+    path('<int:cart_id>/items/bulk/', views.CartItemBulkView.as_view(), name='cart-item-bulk'),
     path('<int:cart_id>/items/<int:pk>/', views.CartItemUpdateView.as_view(), name='cart-item-update'),
 ] 
\ No newline at end of file
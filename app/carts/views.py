@@ -1,3 +1,5 @@
+from asgiref.sync import sync_to_async
+from django.http import Http404
 from django.shortcuts import render, get_object_or_404
 from rest_framework import generics, status
 from rest_framework.response import Response
@@ -6,9 +8,16 @@ from django.db import transaction
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiExample
 from rest_framework.exceptions import ValidationError
 from .models import Cart, CartItem
-from .serializers import CartSerializer, CartCreateSerializer, CartItemSerializer
+from .serializers import (
+    CartSerializer, CartCreateSerializer, CartItemSerializer, CartItemBulkSerializer, CartSummarySerializer
+)
+from .pricing import price_carts
+from core.async_views import AsyncReadView
+from core.db import retry_on_lock
+from core.conditional import conditional_get, version_etag
+from core.pagination import KeysetPagination
+from promotions.utils import get_effective_date, promotions_version
 from products.models import Product
-from promotions.models import SpecialDatePromotion
 from datetime import date
 
 
@@ -42,8 +51,10 @@ class CartListCreateView(generics.ListCreateAPIView):
     """
     List all carts for the authenticated user (GET), or create a new cart (POST).
     Soporta filtros por type, status y simulación de fecha.
+    The list is paginated with a cursor, newest carts first.
     """
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -51,7 +62,7 @@ class CartListCreateView(generics.ListCreateAPIView):
         return CartSerializer
 
     def get_queryset(self):
-        qs = Cart.objects.filter(user=self.request.user)
+        qs = Cart.objects.filter(user=self.request.user).with_items()
         cart_type = self.request.query_params.get('type')
         status = self.request.query_params.get('status')
         if cart_type:
@@ -68,22 +79,19 @@ class CartListCreateView(generics.ListCreateAPIView):
 
     def perform_create(self, serializer):
         user = self.request.user
-        is_vip = hasattr(user, 'profile') and user.profile.is_vip
         simulated_date = getattr(self.request, 'simulated_date', None)
         effective_date = simulated_date or date.today()
-        if is_vip:
-            cart_type = 'VIP'
-        else:
-            promo = SpecialDatePromotion.objects.filter(
-                start_date__lte=effective_date,
-                end_date__gte=effective_date
-            ).first()
-            if promo:
-                cart_type = 'FECHA_ESPECIAL'
-            else:
-                cart_type = 'COMUN'
+        cart_type = Cart.get_cart_type_for(user, effective_date)
         serializer.save(user=user, cart_type=cart_type)
 
+    def list(self, request, *args, **kwargs):
+        """Override to price all carts of the page in a single batch."""
+        carts = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        context = self.get_serializer_context()
+        context['cart_totals'] = price_carts(carts, simulated_date=context.get('simulated_date'))
+        serializer = CartSerializer(carts, many=True, context=context)
+        return self.get_paginated_response(serializer.data)
+
     def create(self, request, *args, **kwargs):
         """Override to return full cart data after creation."""
         serializer = self.get_serializer(data=request.data)
@@ -95,6 +103,17 @@ class CartListCreateView(generics.ListCreateAPIView):
         return Response(output_serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
 
+def cart_detail_etag(request, pk):
+    """
+    ETag of a cart of the current user: its row and items versions plus what
+    its discounts depend on (effective date and promotions).
+    """
+    stamp = Cart.objects.filter(pk=pk, user=request.user).values_list('updated_at', 'items_version').first()
+    if stamp is None:
+        return None
+    return version_etag(*stamp, get_effective_date(request), promotions_version.get())
+
+
 @extend_schema_view(
     retrieve=extend_schema(
         summary="Obtener carrito",
@@ -107,6 +126,7 @@ class CartListCreateView(generics.ListCreateAPIView):
         tags=['carts']
     )
 )
+@conditional_get(cart_detail_etag, private=True)
 class CartDetailView(generics.RetrieveAPIView, generics.DestroyAPIView):
     """
     Retrieve or delete a specific cart.
@@ -115,8 +135,11 @@ class CartDetailView(generics.RetrieveAPIView, generics.DestroyAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        """Filter carts by current user."""
-        return Cart.objects.filter(user=self.request.user)
+        """Filter carts by current user, prefetching items and products when reading."""
+        queryset = Cart.objects.filter(user=self.request.user)
+        if self.request.method == 'GET':
+            queryset = queryset.with_items()
+        return queryset
 
     def get_serializer_context(self):
         ctx = super().get_serializer_context()
@@ -124,6 +147,42 @@ class CartDetailView(generics.RetrieveAPIView, generics.DestroyAPIView):
             ctx['simulated_date'] = self.request.simulated_date
         return ctx
 
+    def retrieve(self, request, *args, **kwargs):
+        """Override to price the cart through the batch pricing engine."""
+        cart = self.get_object()
+        context = self.get_serializer_context()
+        context['cart_totals'] = price_carts([cart], simulated_date=context.get('simulated_date'))
+        serializer = self.get_serializer_class()(cart, context=context)
+        return Response(serializer.data)
+
+
+class AsyncCartDetailView(AsyncReadView):
+    """
+    Async variant of CartDetailView for ASGI deployments (core.asgi_urls);
+    DELETE is still served by CartDetailView.
+    """
+    sync_view = CartDetailView
+    private = True
+
+    async def get_etag(self, request, pk):
+        stamp = await Cart.objects.filter(pk=pk, user=request.user).values_list(
+            'updated_at', 'items_version'
+        ).afirst()
+        if stamp is None:
+            return None
+        return version_etag(*stamp, get_effective_date(request), await promotions_version.aget())
+
+    async def get_data(self, request, pk):
+        cart = await Cart.objects.with_items().filter(pk=pk, user=request.user).afirst()
+        if cart is None:
+            raise Http404('No Cart matches the given query.')
+        simulated_date = getattr(request, 'simulated_date', None)
+        context = {
+            'simulated_date': simulated_date,
+            'cart_totals': await sync_to_async(price_carts)([cart], simulated_date=simulated_date),
+        }
+        return CartSerializer(cart, context=context).data
+
 
 @extend_schema(
     summary="Agregar item al carrito",
@@ -164,21 +223,9 @@ class CartItemCreateView(generics.CreateAPIView):
                 pass
         
         # Determine cart type based on VIP status and special date promotions
-        is_vip = hasattr(user, 'profile') and user.profile.is_vip
         simulated_date = getattr(self.request, 'simulated_date', None)
         effective_date = simulated_date or date.today()
-        
-        if is_vip:
-            cart_type = 'VIP'
-        else:
-            promo = SpecialDatePromotion.objects.filter(
-                start_date__lte=effective_date,
-                end_date__gte=effective_date
-            ).first()
-            if promo:
-                cart_type = 'FECHA_ESPECIAL'
-            else:
-                cart_type = 'COMUN'
+        cart_type = Cart.get_cart_type_for(user, effective_date)
         
         # Look for existing active cart of the determined type
         cart = Cart.objects.filter(user=user, cart_type=cart_type, status='ACTIVO').first()
@@ -188,7 +235,7 @@ class CartItemCreateView(generics.CreateAPIView):
         # If no existing cart, create a new one
         return Cart.objects.create(user=user, cart_type=cart_type)
 
-    @transaction.atomic
+    @retry_on_lock
     def perform_create(self, serializer):
         """Add item to cart, updating quantity if product already exists."""
         cart = self.get_cart()
@@ -197,19 +244,11 @@ class CartItemCreateView(generics.CreateAPIView):
         
         # Get product and current price
         product = get_object_or_404(Product, id=product_id)
-        unit_price = product.price
-        
-        # Check if item already exists in cart
-        existing_item = CartItem.objects.filter(cart=cart, product=product).first()
         
-        if existing_item:
-            # Update quantity of existing item
-            existing_item.quantity += quantity
-            existing_item.save()
-            serializer.instance = existing_item
-        else:
-            # Create new item
-            serializer.save(cart=cart, unit_price=unit_price)
+        # Insert the item or add to its quantity in one statement
+        item = CartItem.add(cart, product, quantity)
+        serializer.instance = item
+        Cart.apply_item_change(cart.id, quantity, item.unit_price * quantity, 1 if item.created else 0)
 
 
 @extend_schema_view(
@@ -232,24 +271,203 @@ class CartItemUpdateView(generics.UpdateAPIView, generics.DestroyAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        """Filter items by cart and user."""
-        return CartItem.objects.filter(
+        """
+        Filter items by cart and user. PATCH and DELETE lock the line until
+        they commit: the aggregate deltas are computed from its quantity, so
+        a CartItem.add committed in between must not be missed.
+        """
+        queryset = CartItem.objects.filter(
             cart_id=self.kwargs['cart_id'],
             cart__user=self.request.user
         )
+        if self.request.method in ('PATCH', 'DELETE'):
+            queryset = queryset.select_for_update(of=('self',))
+        return queryset
 
+    @transaction.atomic
     def patch(self, request, *args, **kwargs):
         """Update item quantity or delete if quantity is 0."""
         item = self.get_object()
-        quantity = request.data.get('quantity', item.quantity)
-        
+        try:
+            quantity = int(request.data.get('quantity', item.quantity))
+        except (TypeError, ValueError):
+            raise ValidationError({'quantity': ['A valid integer is required.']})
+        if quantity < 0:
+            raise ValidationError({'quantity': ['Ensure this value is greater than or equal to 0.']})
+
         if quantity == 0:
             # Delete item if quantity is 0
-            item.delete()
+            self.perform_destroy(item)
             return Response(status=status.HTTP_204_NO_CONTENT)
         else:
             # Update quantity
+            quantity_delta = quantity - item.quantity
             item.quantity = quantity
             item.save()
+            Cart.apply_item_change(item.cart_id, quantity_delta, item.unit_price * quantity_delta)
             serializer = self.get_serializer(item)
             return Response(serializer.data)
+
+    @transaction.atomic
+    def delete(self, request, *args, **kwargs):
+        return self.destroy(request, *args, **kwargs)
+
+    def perform_destroy(self, instance):
+        """Delete the item and update the cart aggregates."""
+        instance.delete()
+        Cart.apply_item_change(instance.cart_id, -instance.quantity, -instance.unit_price * instance.quantity, -1)
+
+
+@extend_schema(
+    summary="Modificar varios items del carrito",
+    description=(
+        "Fija la cantidad de varios productos del carrito en una sola operación. "
+        "Los productos nuevos se agregan, los existentes cambian de cantidad y quantity=0 los elimina. "
+        "Devuelve el carrito con los totales recalculados."
+    ),
+    request=CartItemBulkSerializer,
+    responses={
+        200: CartSerializer,
+        400: OpenApiExample(
+            'Producto repetido',
+            value={'items': ['Each product can only appear once.']},
+            response_only=True
+        )
+    },
+    examples=[
+        OpenApiExample(
+            'Armar canasta',
+            value={'items': [
+                {'product_id': 1, 'quantity': 2},
+                {'product_id': 3, 'quantity': 1},
+                {'product_id': 4, 'quantity': 0}
+            ]},
+            request_only=True
+        )
+    ],
+    tags=['carts']
+)
+class CartItemBulkView(generics.GenericAPIView):
+    """
+    Set the quantity of several cart items at once.
+    """
+    serializer_class = CartItemBulkSerializer
+    permission_classes = [IsAuthenticated]
+
+    @transaction.atomic
+    def post(self, request, cart_id):
+        """Create, update and delete the given lines in bulk and return the priced cart."""
+        cart = get_object_or_404(Cart, id=cart_id, user=request.user)
+        if cart.status != 'ACTIVO':
+            return Response({'error': 'Cart is not active or already finalized.'}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        quantities = {item['product_id']: item['quantity'] for item in serializer.validated_data['items']}
+
+        set_ids = [pk for pk, quantity in quantities.items() if quantity]
+        products = Product.objects.in_bulk(set_ids)
+        missing = [pk for pk in set_ids if pk not in products]
+        if missing:
+            raise ValidationError({'items': [f'Products not found: {", ".join(map(str, missing))}.']})
+
+        # One upsert, like CartItem.add: a line added concurrently for the same
+        # product is updated instead of failing on the (cart, product) constraint.
+        # Existing lines keep their price.
+        CartItem.objects.bulk_create(
+            [
+                CartItem(cart=cart, product=products[pk], quantity=quantities[pk], unit_price=products[pk].price)
+                for pk in set_ids
+            ],
+            update_conflicts=True, unique_fields=['cart', 'product'], update_fields=['quantity', 'updated_at']
+        )
+        removed_ids = [pk for pk, quantity in quantities.items() if not quantity]
+        if removed_ids:
+            CartItem.objects.filter(cart=cart, product_id__in=removed_ids).delete()
+        # Bulk writes send no signals: recompute the aggregates and bump the items version once
+        Cart.refresh_aggregates(Cart.objects.filter(pk=cart.pk))
+
+        cart = Cart.objects.with_items().get(pk=cart.pk)
+        simulated_date = getattr(request, 'simulated_date', None)
+        context = self.get_serializer_context()
+        context['cart_totals'] = price_carts([cart], simulated_date=simulated_date)
+        return Response(CartSerializer(cart, context=context).data)
+
+
+def active_cart_summary_etag(request):
+    """
+    ETag of the summary of the current active cart, which also changes when
+    another cart becomes the active one.
+    """
+    effective_date = get_effective_date(request)
+    stamp = Cart.objects.active_for(request.user, effective_date).values_list('id', 'updated_at', 'items_version').first()
+    return version_etag(stamp, effective_date, promotions_version.get())
+
+
+class CartSummaryMixin:
+    """
+    Shared behaviour of the cart summary views.
+    """
+    serializer_class = CartSummarySerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """Filter carts by current user."""
+        return Cart.objects.filter(user=self.request.user)
+
+    def get_summary(self, cart):
+        """Price the cart from its maintained aggregates and serialize its totals."""
+        simulated_date = getattr(self.request, 'simulated_date', None)
+        context = self.get_serializer_context()
+        context['cart_totals'] = price_carts([cart], simulated_date=simulated_date)
+        return self.get_serializer(cart, context=context).data
+
+
+@extend_schema(
+    summary="Resumen de carrito",
+    description=(
+        "Devuelve solo los totales de un carrito (cantidad de items y unidades, subtotal y total a pagar), "
+        "calculados a partir de los contadores del carrito. Soporta ETag/If-None-Match para polling."
+    ),
+    responses={200: CartSummarySerializer},
+    tags=['carts']
+)
+@conditional_get(cart_detail_etag, private=True)
+class CartSummaryView(CartSummaryMixin, generics.RetrieveAPIView):
+    """
+    Retrieve the totals of a cart of the current user.
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(self.get_summary(self.get_object()))
+
+
+@extend_schema(
+    summary="Resumen del carrito activo",
+    description=(
+        "Devuelve los totales del carrito activo que corresponde al usuario (según su estado VIP y las "
+        "promociones de la fecha). Si no tiene uno, id es null y los totales son 0. Soporta ETag/If-None-Match."
+    ),
+    responses={200: CartSummarySerializer},
+    tags=['carts']
+)
+@conditional_get(active_cart_summary_etag, private=True)
+class ActiveCartSummaryView(CartSummaryMixin, generics.RetrieveAPIView):
+    """
+    Retrieve the totals of the active cart of the current user.
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        effective_date = get_effective_date(request)
+        cart = Cart.objects.active_for(request.user, effective_date).first()
+        if cart is None:
+            return Response({
+                'id': None,
+                'cart_type': Cart.get_cart_type_for(request.user, effective_date),
+                'status': None,
+                'item_count': 0,
+                'total_quantity': 0,
+                'updated_at': None,
+                'subtotal': 0.0,
+                'total_payable': 0.0,
+            })
+        return Response(self.get_summary(cart))
@@ -2,6 +2,8 @@
 ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+The read-heavy endpoints are routed to their async views (core.asgi_urls);
+set DJANGO_ROOT_URLCONF=core.urls to serve only the synchronous ones.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -12,5 +14,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+os.environ.setdefault('DJANGO_ROOT_URLCONF', 'core.asgi_urls')
 
 application = get_asgi_application()
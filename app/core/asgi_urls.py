@@ -0,0 +1,19 @@
+"""
+URL configuration for ASGI deployments.
+
+The read-heavy endpoints are served by their async views (core.async_views);
+everything else, and the other methods of those endpoints, by core.urls.
+"""
+from django.urls import path, include
+from carts.views import AsyncCartDetailView
+from orders.views import AsyncOrderListView
+from products.views import AsyncProductListView
+from promotions.views import AsyncSpecialDatePromotionListView
+
+urlpatterns = [
+    path('products/', AsyncProductListView.as_view()),
+    path('promotions/special-dates/', AsyncSpecialDatePromotionListView.as_view()),
+    path('carts/<int:pk>/', AsyncCartDetailView.as_view()),
+    path('orders/', AsyncOrderListView.as_view()),
+    path('', include('core.urls')),
+]
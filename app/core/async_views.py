@@ -0,0 +1,117 @@
+"""
+Async read views for ASGI deployments.
+
+Django REST framework views are synchronous, so under ASGI each request to
+them holds a worker thread from start to finish. The read-heavy endpoints
+also have an async variant built on AsyncReadView: ETag stamps, cache reads
+and single-row lookups use Django's async APIs, and only the remaining
+synchronous work (authentication and permissions, pagination, pricing) goes
+through sync_to_async. Authentication and permissions are those of the
+synchronous view, and responses are rendered with DRF's JSONRenderer, so both
+deployments accept the same requests and answer with the same bodies.
+
+core.asgi_urls routes the endpoints to these views.
+"""
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+
+class AsyncReadView(View):
+    """
+    Async GET view with a synchronous DRF counterpart (sync_view) that keeps
+    serving every other method, e.g. DELETE on a cart.
+    Subclasses implement get_data() and, for conditional GETs, get_etag().
+    """
+    sync_view = None
+    private = False
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # As APIView.as_view(): CSRF is enforced by DRF's SessionAuthentication only
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await sync_to_async(self.sync_view.as_view())(request, *args, **kwargs)
+        return await super().dispatch(request, *args, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        response = await sync_to_async(self.check_access)(request, *args, **kwargs)
+        if response is not None:
+            return response
+
+        etag = await self.get_etag(request, *args, **kwargs)
+        if etag is not None:
+            response = get_conditional_response(request, etag=etag)
+            if response is not None:
+                return self.add_etag(response, etag)
+
+        try:
+            data = await self.get_data(request, *args, **kwargs)
+        except Http404 as exc:
+            return self.render({'detail': str(exc) or 'Not found.'}, status=404)
+        except ValidationError as exc:
+            return self.render(exc.detail, status=400)
+        response = self.render(data)
+        return self.add_etag(response, etag) if etag is not None else response
+
+    def check_access(self, request, *args, **kwargs):
+        """
+        Run the authentication, permission and throttling checks of sync_view
+        as its DRF dispatch would, returning its error response if one fails.
+        The authenticated user is left on request.user, so the lazy user is
+        never resolved from the event loop.
+        """
+        view = self.sync_view()
+        view.args, view.kwargs = args, kwargs
+        drf_request = view.initialize_request(request, *args, **kwargs)
+        view.request = drf_request
+        view.headers = view.default_response_headers
+        try:
+            view.initial(drf_request, *args, **kwargs)
+        except Exception as exc:
+            response = view.finalize_response(drf_request, view.handle_exception(exc), *args, **kwargs)
+            return response.render()
+        request.user = drf_request.user
+        return None
+
+    async def get_etag(self, request, *args, **kwargs):
+        """
+        ETag of the current representation, or None to skip the conditional GET.
+        """
+        return None
+
+    async def get_data(self, request, *args, **kwargs):
+        """
+        Build the data of the response.
+        """
+        raise NotImplementedError
+
+    def render(self, data, status=200):
+        response = HttpResponse(JSONRenderer().render(data), content_type='application/json', status=status)
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+    def add_etag(self, response, etag):
+        response['ETag'] = etag
+        if self.private:
+            patch_cache_control(response, no_cache=True, private=True)
+        else:
+            patch_cache_control(response, no_cache=True)
+        return response
+
+    def paginate(self, request, queryset, pagination_class, serializer_class, context=None):
+        """
+        Serialize one page of queryset in the format of the DRF list views.
+        Pagination and serialization may query, so run it with sync_to_async.
+        """
+        paginator = pagination_class()
+        page = paginator.paginate_queryset(queryset, Request(request), view=self)
+        data = serializer_class(page, many=True, context=context or {}).data
+        return paginator.get_paginated_response(data).data
@@ -0,0 +1,33 @@
+"""
+Conditional GET support for the API views.
+
+ETags are derived from cheap version stamps (counters, timestamps, dates)
+instead of hashing the response body, so a matching If-None-Match is
+answered with 304 before the view queries or serializes anything.
+"""
+import hashlib
+
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+
+def version_etag(*stamps):
+    """
+    Build a strong ETag from the version stamps of a resource.
+    """
+    digest = hashlib.sha1('|'.join(str(stamp) for stamp in stamps).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def conditional_get(etag_func, private=False):
+    """
+    Class decorator for API views that adds an ETag to GET responses and
+    answers matching requests with 304. etag_func receives the request and
+    the URL kwargs and returns an ETag, or None to skip the check (e.g. when
+    the resource does not exist). Clients are asked to revalidate every time.
+    """
+    directives = {'no_cache': True}
+    if private:
+        directives['private'] = True
+    return method_decorator([cache_control(**directives), condition(etag_func=etag_func)], name='get')
@@ -0,0 +1,48 @@
+"""
+Write transactions that retry when SQLite reports the database as locked.
+
+With WAL and IMMEDIATE transactions (see DATABASES in core.settings) a writer
+waits up to the busy timeout for the write lock instead of failing at once,
+but under heavy contention the wait can still run out. retry_on_lock runs the
+whole transaction again after a short randomized backoff, which is safe
+because a failed attempt is rolled back entirely.
+"""
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+
+def is_lock_error(exc):
+    """
+    Whether exc is SQLite giving up on a lock held by another connection.
+    """
+    message = str(exc).lower()
+    return 'database is locked' in message or 'database table is locked' in message
+
+
+def retry_on_lock(func=None, *, using=DEFAULT_DB_ALIAS):
+    """
+    Decorator that runs func in transaction.atomic() and retries it up to
+    DATABASE_LOCK_RETRIES times when the database is locked.
+    Inside an outer transaction there is nothing to retry alone, so the error
+    is left to the outermost block.
+    """
+    if func is None:
+        return lambda func: retry_on_lock(func, using=using)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        attempts = getattr(settings, 'DATABASE_LOCK_RETRIES', 0) + 1
+        for attempt in range(attempts):
+            outermost = not connections[using].in_atomic_block
+            try:
+                with transaction.atomic(using=using):
+                    return func(*args, **kwargs)
+            except OperationalError as exc:
+                if not outermost or not is_lock_error(exc) or attempt == attempts - 1:
+                    raise
+            time.sleep(random.uniform(0.5, 1.5) * 0.01 * 2 ** attempt)
+    return wrapper
@@ -0,0 +1,93 @@
+import json
+import logging
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+
+from .routers import REPLICA_PIN_COOKIE, SAFE_METHODS, has_replica
+from .timing import collect_metrics, install_query_tracking
+
+
+logger = logging.getLogger('core.request_timing')
+
+
+class RequestTimingMiddleware:
+    """
+    Middleware that measures where each request spends its time.
+    Records the database query count and time plus the 'serialize' and
+    'pricing' sections (see core.timing.timed) and returns them in the
+    Server-Timing response header. With REQUEST_TIMING_LOG enabled it also
+    logs them as one JSON line per request.
+    Under ASGI it runs natively async, so async views are not forced into a
+    thread; the queries are counted in whichever thread runs them (see core.timing).
+    """
+    metrics = ('db', 'serialize', 'pricing')
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install_query_tracking()
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = perf_counter()
+        with collect_metrics() as metrics:
+            response = self.get_response(request)
+        return self.finish(request, response, metrics, start)
+
+    async def __acall__(self, request):
+        start = perf_counter()
+        with collect_metrics() as metrics:
+            response = await self.get_response(request)
+        return self.finish(request, response, metrics, start)
+
+    def finish(self, request, response, metrics, start):
+        """
+        Add the Server-Timing header (and log line) to the response.
+        """
+        total = (perf_counter() - start) * 1000
+
+        durations = {name: round(metrics.durations[name], 2) for name in self.metrics}
+        durations['total'] = round(total, 2)
+        response['Server-Timing'] = self.format_header(durations, metrics.db_queries)
+        if getattr(settings, 'REQUEST_TIMING_LOG', False):
+            logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'db_queries': metrics.db_queries,
+                **{f'{name}_ms': duration for name, duration in durations.items()},
+            }))
+        return response
+
+    def format_header(self, durations, db_queries):
+        """
+        Build the Server-Timing header value, e.g. 'db;dur=1.5;desc="3 queries", total;dur=9.1'.
+        """
+        entries = []
+        for name, duration in durations.items():
+            entry = f'{name};dur={duration}'
+            if name == 'db':
+                entry += f';desc="{db_queries} queries"'
+            entries.append(entry)
+        return ', '.join(entries)
+
+
+class ReplicaPinMiddleware(MiddlewareMixin):
+    """
+    Middleware that pins a client to the default database for
+    REPLICA_PIN_SECONDS after each of its writes (see core.routers).
+    """
+
+    def process_response(self, request, response):
+        if request.method not in SAFE_METHODS and has_replica():
+            response.set_cookie(
+                REPLICA_PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax'
+            )
+        return response
@@ -0,0 +1,46 @@
+"""
+Keyset (cursor) pagination for the list endpoints.
+
+Pages are fetched with WHERE <key> < <cursor position> ... LIMIT instead of
+OFFSET, so every page costs the same no matter how deep into the table it is.
+The ordering always ends with the primary key, which keeps it stable between
+rows that share the same timestamp.
+"""
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Newest first cursor pagination keyed on (created_at, id).
+    Clients may ask for up to max_page_size results with ?page_size=.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-created_at', '-id')
+
+
+class SearchRankKeysetPagination(KeysetPagination):
+    """
+    Best match first cursor pagination keyed on (search_rank, id) for search
+    results annotated with a rank, newest first for everything else.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        if 'search_rank' in queryset.query.annotations:
+            return ('search_rank', 'id')
+        return super().get_ordering(request, queryset, view)
+
+
+class OrderedAtKeysetPagination(KeysetPagination):
+    """
+    Newest first cursor pagination keyed on (ordered_at, id).
+    """
+    ordering = ('-ordered_at', '-id')
+
+
+class IdKeysetPagination(KeysetPagination):
+    """
+    Newest first cursor pagination keyed on id, for models without a creation timestamp.
+    """
+    ordering = ('-id',)
@@ -0,0 +1,98 @@
+"""
+Read replica routing.
+
+When a 'replica' database is configured, views that opt in with
+ReplicaReadMixin run the reads of their GET requests on it; everything else,
+including every write, stays on 'default'. A client that has just written
+carries the pin cookie set by ReplicaPinMiddleware for REPLICA_PIN_SECONDS,
+and its reads stay on 'default' meanwhile, so it always sees its own writes
+even if the replica lags behind.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+REPLICA_ALIAS = 'replica'
+REPLICA_PIN_COOKIE = 'db_pinned'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def has_replica():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """
+    Route the reads made in the block to the replica. With enabled=False they
+    stay on 'default' even inside an outer replica_reads() block.
+    """
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def is_pinned(request):
+    """
+    Whether the request comes from a client that wrote within REPLICA_PIN_SECONDS.
+    """
+    return REPLICA_PIN_COOKIE in request.COOKIES
+
+
+class ReplicaRouter:
+    """
+    Database router sending the reads of replica_reads() blocks to the replica.
+    Sessions are always read from 'default': they are written on login and a
+    lagging copy would log the user out.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and model._meta.app_label != 'sessions' and has_replica():
+            return REPLICA_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same data, so objects of both databases can be related
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # The replica gets its schema from 'default' (sync_replica or the database replication)
+        return db != REPLICA_ALIAS
+
+
+class ReplicaReadMixin:
+    """
+    View mixin that runs the safe requests of unpinned clients with
+    replica_reads(). On a ViewSet, replica_actions limits it to those actions.
+    """
+    replica_actions = None
+
+    def reads_from_replica(self, request):
+        if request.method not in SAFE_METHODS or is_pinned(request):
+            return False
+        if self.replica_actions is None:
+            return True
+        action = getattr(self, 'action_map', {}).get(request.method.lower())
+        return action in self.replica_actions
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.reads_from_replica(request):
+            return super().dispatch(request, *args, **kwargs)
+        if self.view_is_async:
+            return self.dispatch_on_replica(request, *args, **kwargs)
+        with replica_reads():
+            return super().dispatch(request, *args, **kwargs)
+
+    async def dispatch_on_replica(self, request, *args, **kwargs):
+        with replica_reads():
+            return await super().dispatch(request, *args, **kwargs)
@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -45,22 +48,26 @@ INSTALLED_APPS = [
     'promotions',
     'carts',
     'orders',
+    'benchmarks',
     'corsheaders',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestTimingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'session.middleware.SnapshotAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'promotions.middleware.DateSimulationMiddleware',
+    'core.middleware.ReplicaPinMiddleware',
 ]
 
-ROOT_URLCONF = 'core.urls'
+# core.asgi selects core.asgi_urls, which adds the async read views
+ROOT_URLCONF = os.environ.get('DJANGO_ROOT_URLCONF', 'core.urls')
 
 TEMPLATES = [
     {
@@ -83,12 +90,111 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# The database is configured from the environment. DATABASE_ENGINE selects
+# 'sqlite' (the default, a local file) or 'postgresql' (psycopg 3).
+DATABASE_ENGINE = os.environ.get('DATABASE_ENGINE', 'sqlite')
+
+if DATABASE_ENGINE == 'sqlite':
+    # SQLite tuned for concurrent requests: with WAL readers never block the
+    # writer, IMMEDIATE transactions take the write lock when they start (so a
+    # writer waits for the busy timeout instead of failing on a lock upgrade) and
+    # synchronous=NORMAL only syncs at checkpoints, which WAL keeps consistent.
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DATABASE_NAME', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                'transaction_mode': 'IMMEDIATE',
+                # Busy timeout, in seconds
+                'timeout': 20,
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA mmap_size=134217728;'
+                    'PRAGMA cache_size=-20000;'
+                    'PRAGMA temp_store=MEMORY'
+                ),
+            },
+        }
+    }
+elif DATABASE_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DATABASE_NAME', 'factor_eco'),
+            'USER': os.environ.get('DATABASE_USER', 'postgres'),
+            'PASSWORD': os.environ.get('DATABASE_PASSWORD', ''),
+            'HOST': os.environ.get('DATABASE_HOST', 'localhost'),
+            'PORT': os.environ.get('DATABASE_PORT', '5432'),
+            'OPTIONS': {},
+        }
+    }
+    DATABASE_POOL_MAX_SIZE = int(os.environ.get('DATABASE_POOL_MAX_SIZE', '10'))
+    # With the pool, Django has it check each connection before lending it;
+    # otherwise each worker thread checks its persistent connection before reusing it
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+    if DATABASE_POOL_MAX_SIZE > 0:
+        # psycopg's pool (poetry install --with postgresql) keeps the
+        # connections open; Django requires CONN_MAX_AGE = 0 with it
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DATABASE_POOL_MIN_SIZE', '2')),
+            'max_size': DATABASE_POOL_MAX_SIZE,
+            'timeout': float(os.environ.get('DATABASE_POOL_TIMEOUT', '10')),
+        }
+    else:
+        DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('DATABASE_CONN_MAX_AGE', '60'))
+else:
+    raise ImproperlyConfigured(
+        f"DATABASE_ENGINE must be 'sqlite' or 'postgresql', not {DATABASE_ENGINE!r}."
+    )
+
+# Optional read replica for the read-only endpoints (core.routers): a copy of
+# the SQLite file at DATABASE_REPLICA_NAME, refreshed with `manage.py
+# sync_replica`, or a PostgreSQL standby at DATABASE_REPLICA_HOST. Tests read
+# it through the default database.
+DATABASE_REPLICA = os.environ.get(
+    'DATABASE_REPLICA_NAME' if DATABASE_ENGINE == 'sqlite' else 'DATABASE_REPLICA_HOST'
+)
+if DATABASE_REPLICA:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME' if DATABASE_ENGINE == 'sqlite' else 'HOST': DATABASE_REPLICA,
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+        'TEST': {'MIRROR': 'default'},
     }
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Seconds a client reads from the default database after its own writes
+REPLICA_PIN_SECONDS = 15
+
+# The cache keeps the sessions, the rendered catalog and the versions that
+# invalidate the catalog and the session user snapshots. It is local to each process
+# by default, which only suits a single process: with several workers point it
+# at a cache they share, e.g. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# and CACHE_LOCATION=redis://127.0.0.1:6379/0 (`manage.py check --deploy` warns).
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    },
 }
+if CACHE_BACKEND == 'django.core.cache.backends.locmem.LocMemCache':
+    # Room for the catalog pages without evicting sessions and snapshot versions
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': 10000}
+
+# Sessions are read from the cache and only fall back to the database on a
+# miss; 'django.contrib.sessions.backends.signed_cookies' keeps them in the
+# cookie instead. Either way the session carries a snapshot of the user and
+# its VIP profile (session.snapshot), reloaded from the database after
+# SESSION_USER_SNAPSHOT_TTL seconds or as soon as the user or profile changes.
+SESSION_ENGINE = os.environ.get('SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db')
+SESSION_USER_SNAPSHOT_TTL = 300
+
+# Times a write transaction is retried when the database is still locked
+# after the busy timeout (core.db.retry_on_lock)
+DATABASE_LOCK_RETRIES = 5
 
 
 # Password validation
@@ -167,3 +273,34 @@ CSRF_TRUSTED_ORIGINS = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
 ]
+
+# Maximum number of cart totals kept in the in-process LRU cache (carts.cache)
+CART_TOTALS_CACHE_SIZE = 1024
+
+# Seconds a pre-serialized catalog response (products.catalog) is kept in the
+# cache. Product changes invalidate them right away in the process that made
+# them; with the default per-process cache this bounds how long other worker
+# processes can serve the old catalog.
+CATALOG_CACHE_TIMEOUT = 300
+
+# Every response carries a Server-Timing header with its DB, serialization and
+# pricing time (core.middleware.RequestTimingMiddleware). Set to True to also
+# log one JSON line per request to the 'core.request_timing' logger.
+REQUEST_TIMING_LOG = False
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core.request_timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
@@ -0,0 +1,221 @@
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from unittest import skipUnless
+from unittest.mock import patch
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import TestCase, TransactionTestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from carts.cache import totals_cache
+from carts.models import Cart, CartItem
+from products.models import Product
+from promotions.index import promotion_index
+from promotions.models import SpecialDatePromotion
+from .routers import REPLICA_ALIAS, REPLICA_PIN_COOKIE, ReplicaRouter, replica_reads
+
+
+class RequestTimingTests(TestCase):
+    """
+    Tests for the Server-Timing header and log line of the request timing middleware.
+    """
+
+    def setUp(self):
+        """
+        Set up test data.
+        """
+        self.client = Client()
+        self.user = User.objects.create_user(username='timing', password='testpassword123')
+        self.client.force_login(self.user)
+        product = Product.objects.create(name='Timed product', description='Test product', price=Decimal('10.00'), stock=10)
+        self.cart = Cart.objects.create(user=self.user, cart_type='COMUN')
+        CartItem.objects.create(cart=self.cart, product=product, quantity=2, unit_price=product.price)
+        Cart.refresh_aggregates(Cart.objects.filter(pk=self.cart.pk))
+        totals_cache.clear()
+
+    def parse_server_timing(self, response):
+        metrics = {}
+        for entry in response['Server-Timing'].split(', '):
+            name, *params = entry.split(';')
+            metrics[name] = dict(param.split('=', 1) for param in params)
+        return metrics
+
+    def test_server_timing_header(self):
+        """
+        Test that the cart list reports its query count and the db, serialize and pricing time.
+        """
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/carts/')
+        self.assertEqual(response.status_code, 200)
+
+        metrics = self.parse_server_timing(response)
+        self.assertEqual(set(metrics), {'db', 'serialize', 'pricing', 'total'})
+        self.assertEqual(metrics['db']['desc'], f'"{len(context.captured_queries)} queries"')
+        self.assertGreater(float(metrics['serialize']['dur']), 0)
+        self.assertGreater(float(metrics['pricing']['dur']), 0)
+        self.assertGreaterEqual(float(metrics['total']['dur']), float(metrics['db']['dur']))
+
+    @override_settings(REQUEST_TIMING_LOG=True)
+    def test_log_line_is_opt_in(self):
+        """
+        Test that one JSON line is logged per request when REQUEST_TIMING_LOG is enabled.
+        """
+        with self.assertLogs('core.request_timing', level='INFO') as logs:
+            self.client.get(f'/carts/{self.cart.id}/')
+        self.assertEqual(len(logs.records), 1)
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line['path'], f'/carts/{self.cart.id}/')
+        self.assertEqual(line['status'], 200)
+        self.assertGreater(line['db_queries'], 0)
+        self.assertIn('pricing_ms', line)
+
+        with self.assertNoLogs('core.request_timing'), override_settings(REQUEST_TIMING_LOG=False):
+            self.client.get(f'/carts/{self.cart.id}/')
+
+
+class ReplicaRoutingTests(TestCase):
+    """
+    Tests for the read replica router and the views that opt in to it.
+    """
+
+    def setUp(self):
+        """
+        Set up test data.
+        """
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='buyer', password='testpassword123')
+        self.client.force_login(self.user)
+        self.soap = Product.objects.create(name='Soap', description='Soap bar', price=Decimal('100.00'), stock=10)
+
+    def routed(self, url, client=None):
+        """
+        Get url, returning the status and whether its reads were routed to the replica.
+        """
+        with patch('core.routers.replica_reads', wraps=replica_reads) as spy:
+            if client is None:
+                response = self.client.get(url)
+            else:
+                with override_settings(ROOT_URLCONF='core.asgi_urls'):
+                    response = async_to_sync(client.get)(url)
+        return response.status_code, spy.called
+
+    def test_router(self):
+        """
+        Test that only the reads inside replica_reads() go to a configured replica, never sessions or writes.
+        """
+        router = ReplicaRouter()
+        with replica_reads():
+            self.assertIsNone(router.db_for_read(Product))
+        with patch('core.routers.has_replica', return_value=True):
+            self.assertIsNone(router.db_for_read(Product))
+            with replica_reads():
+                self.assertEqual(router.db_for_read(Product), 'replica')
+                self.assertIsNone(router.db_for_read(Session))
+                self.assertEqual(router.db_for_write(Product), 'default')
+            self.assertFalse(router.allow_migrate('replica', 'products'))
+
+    def test_views_opt_in(self):
+        """
+        Test that the catalog, promotions, order and user list endpoints read from the replica and the rest do not.
+        """
+        for url in [
+            '/products/', f'/products/{self.soap.id}/', '/promotions/special-dates/', '/orders/',
+            '/api/users/', '/api/users/vip_changes/?month=6&year=2025',
+        ]:
+            with self.subTest(url=url):
+                self.assertEqual(self.routed(url), (200, True))
+        for url in ['/carts/', f'/api/users/{self.user.id}/', '/api/users/vip_status/']:
+            with self.subTest(url=url):
+                self.assertEqual(self.routed(url)[1], False)
+
+        self.async_client.force_login(self.user)
+        self.assertEqual(self.routed('/orders/', client=self.async_client), (200, True))
+
+    def test_writes_pin_the_client(self):
+        """
+        Test that after a write the client reads from the default database until the pin cookie expires.
+        """
+        with patch('core.middleware.has_replica', return_value=True):
+            response = self.client.post(
+                '/carts/0/items/', {'product_id': self.soap.id, 'quantity': 1}, content_type='application/json'
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.cookies[REPLICA_PIN_COOKIE]['max-age'], 15)
+        self.assertEqual(self.routed('/products/'), (200, False))
+
+        del self.client.cookies[REPLICA_PIN_COOKIE]
+        self.assertEqual(self.routed('/products/'), (200, True))
+
+
+@skipUnless(connection.vendor == 'sqlite', 'the lagging replica is a copy made by sync_replica')
+class LaggingReplicaTests(TransactionTestCase):
+    """
+    Tests for the shared caches with a replica file that lags behind the default database.
+    """
+
+    def setUp(self):
+        """
+        Set up test data.
+        """
+        cache.clear()
+        promotion_index.invalidate()
+        self.addCleanup(promotion_index.invalidate)
+        self.client = Client()
+        self.soap = Product.objects.create(name='Soap', description='Soap bar', price=Decimal('100.00'), stock=10)
+
+    @contextmanager
+    def lagging_replica(self):
+        """
+        Configure a replica holding a copy of the default database as of now.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'replica.sqlite3')
+            call_command('sync_replica', '--to', path, stdout=StringIO())
+            connections.settings[REPLICA_ALIAS] = {**connections[DEFAULT_DB_ALIAS].settings_dict, 'NAME': path}
+            # The replica only exists within the block, so it is allowed here rather than in databases
+            try:
+                with patch.object(type(self), 'databases', {DEFAULT_DB_ALIAS, REPLICA_ALIAS}), \
+                        patch('core.routers.has_replica', return_value=True):
+                    yield
+            finally:
+                connections[REPLICA_ALIAS].close()
+                del connections[REPLICA_ALIAS]
+                del connections.settings[REPLICA_ALIAS]
+
+    def test_catalog_cache_is_filled_from_default(self):
+        """
+        Test that a catalog page cached after a change holds the new data, for pinned clients too.
+        """
+        with self.lagging_replica():
+            self.soap.price = Decimal('150.00')
+            self.soap.save()
+            url = f'/products/{self.soap.id}/'
+            # Uncached reads still come from the lagging replica
+            self.assertEqual(self.client.get(f'{url}?format=json').json()['price'], '100.00')
+            self.assertEqual(self.client.get(url).json()['price'], '150.00')
+            self.client.cookies[REPLICA_PIN_COOKIE] = '1'
+            self.assertEqual(self.client.get(url).json()['price'], '150.00')
+
+    def test_promotion_index_is_loaded_from_default(self):
+        """
+        Test that a promotion missing from the replica is listed and used for pricing.
+        """
+        with self.lagging_replica():
+            promotion = SpecialDatePromotion.objects.create(
+                start_date=date(2025, 6, 1),
+                end_date=date(2025, 6, 30),
+                description='Summer Sale',
+                discount_amount=Decimal('300.00')
+            )
+            response = self.client.get('/promotions/special-dates/?fecha=2025-06-15')
+            self.assertEqual([promo['id'] for promo in response.json()['promotions']], [promotion.id])
+            self.assertEqual(promotion_index.best_on(date(2025, 6, 15)), promotion)
@@ -0,0 +1,124 @@
+"""
+Per-request timing metrics.
+
+RequestTimingMiddleware starts a RequestMetrics for every request and keeps it
+in a context variable; code anywhere in the request can then add to it with
+timed('<name>'). Nested or recursive sections with the same name (e.g. a
+serializer rendering its nested serializers) are only counted once.
+
+Queries are counted by an execute wrapper installed on every database
+connection, which adds them to the metrics of the current context. Django
+connections belong to a thread, and under ASGI the ORM runs in the thread of
+sync_to_async, not in the one of the request; the context variable follows the
+request there, so its queries are counted wherever they run.
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+
+_current_metrics = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """
+    Accumulated durations (in milliseconds) and the database query count of one request.
+    """
+
+    def __init__(self):
+        self.durations = defaultdict(float)
+        self.db_queries = 0
+        self._running = set()
+
+    def record_query(self, execute, sql, params, many, context):
+        """
+        Database execute wrapper that counts the query and times it as 'db'.
+        """
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.durations['db'] += (perf_counter() - start) * 1000
+            self.db_queries += 1
+
+
+def record_current_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper that adds the query to the current request's metrics, if any.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics.record_query(execute, sql, params, many, context)
+
+
+def track_queries(connection, **kwargs):
+    """
+    Install record_current_query on a database connection, once. Connected to
+    connection_created, which is sent again when a connection reconnects.
+    """
+    if record_current_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_current_query)
+
+
+def install_query_tracking():
+    """
+    Count the queries of every connection: the ones opened from now on, in
+    any thread, and the ones already open in this thread.
+    """
+    connection_created.connect(track_queries)
+    for connection in connections.all(initialized_only=True):
+        track_queries(connection)
+
+
+def get_current_metrics():
+    """
+    Return the RequestMetrics of the current request, or None outside a request.
+    """
+    return _current_metrics.get()
+
+
+@contextmanager
+def collect_metrics():
+    """
+    Make a fresh RequestMetrics the current one for the duration of the block.
+    """
+    metrics = RequestMetrics()
+    token = _current_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_metrics.reset(token)
+
+
+@contextmanager
+def timed(name):
+    """
+    Add the time spent in the block to the current request's metric name.
+    Does nothing outside a request or inside an enclosing block of the same name.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None or name in metrics._running:
+        yield
+        return
+    metrics._running.add(name)
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        metrics.durations[name] += (perf_counter() - start) * 1000
+        metrics._running.discard(name)
+
+
+class TimedSerializerMixin:
+    """
+    Serializer mixin that times to_representation() as 'serialize'.
+    """
+
+    def to_representation(self, instance):
+        with timed('serialize'):
+            return super().to_representation(instance)
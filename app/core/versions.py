@@ -0,0 +1,62 @@
+"""
+Version counters shared through the Django cache.
+
+Data derived from a set of rows (cached responses, in-process indexes, ETags)
+is tagged with the version of that set. Bumping the version makes every
+process treat the older data as stale. When the cache loses a counter it
+restarts from the clock, so a version handed out before is never reused.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+class CacheVersion:
+    """
+    A version counter stored in the cache under key.
+    """
+
+    def __init__(self, key):
+        self.key = key
+
+    def get(self):
+        """
+        Get the current version, starting a new one if the cache lost it.
+        """
+        version = cache.get(self.key)
+        if version is None:
+            cache.add(self.key, time.time_ns(), timeout=None)
+            version = cache.get(self.key)
+        return version
+
+    async def aget(self):
+        """
+        Async version of get().
+        """
+        version = await cache.aget(self.key)
+        if version is None:
+            await cache.aadd(self.key, time.time_ns(), timeout=None)
+            version = await cache.aget(self.key)
+        return version
+
+    def bump(self):
+        """
+        Move to a new version and return it.
+        """
+        try:
+            return cache.incr(self.key)
+        except ValueError:
+            # Lost by the cache: a new start is as good as an increment
+            return self.get()
+
+
+def invalidate_on_commit(invalidate):
+    """
+    Call invalidate now and again when the current transaction commits. The
+    first call covers the writes of this thread; the second stops other
+    threads from keeping data they read before the commit made the change
+    visible to them.
+    """
+    invalidate()
+    transaction.on_commit(invalidate)
@@ -1,10 +1,19 @@
 from django.contrib import admin
-from .models import Order
+from .models import Order, UserMonthlySpend
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     list_display = ['id', 'cart', 'ordered_at', 'total_paid']
     list_filter = ['ordered_at']
     search_fields = ['cart__user__username']
-    readonly_fields = ['ordered_at']
+    readonly_fields = ['ordered_at', 'subtotal', 'total_quantity', 'discounts_applied', 'line_items']
     ordering = ['-ordered_at']
+
+
+@admin.register(UserMonthlySpend)
+class UserMonthlySpendAdmin(admin.ModelAdmin):
+    list_display = ['user', 'year', 'month', 'total', 'order_count', 'updated_at']
+    list_filter = ['year', 'month']
+    search_fields = ['user__username']
+    readonly_fields = ['user', 'year', 'month', 'total', 'order_count', 'updated_at']
+    ordering = ['-year', '-month']
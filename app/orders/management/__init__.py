@@ -0,0 +1 @@
+# Management package for orders app 
\ No newline at end of file
@@ -0,0 +1 @@
+# Commands package for orders app 
\ No newline at end of file
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from carts.models import CartItem
+from carts.pricing import price_carts
+from carts.serializers import CartItemSerializer
+from orders.models import Order
+
+
+class Command(BaseCommand):
+    """
+    Freeze the pricing of orders created before orders stored it.
+    """
+    help = 'Store the pricing snapshot (items, subtotal and discounts) on orders that do not have one'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show how many orders would be updated without updating them',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of orders updated per transaction',
+        )
+
+    def handle(self, *args, **options):
+        """Execute the command."""
+        pending = Order.objects.filter(total_quantity__isnull=True)
+        count = pending.count()
+        if not count:
+            self.stdout.write(self.style.SUCCESS('All orders already have a pricing snapshot.'))
+            return
+
+        if options['dry_run']:
+            self.stdout.write(
+                self.style.WARNING(f'DRY RUN: Would store the pricing snapshot of {count} orders')
+            )
+            return
+
+        updated = 0
+        while True:
+            with transaction.atomic():
+                orders = list(
+                    pending.select_related('cart').prefetch_related(CartItem.get_prefetch('cart__items'))
+                    .order_by('id')[:options['chunk_size']]
+                )
+                if not orders:
+                    break
+                for order in orders:
+                    # Discounts are those of the promotions active on the day of the order;
+                    # total_paid is what was actually charged and is kept as is
+                    totals = price_carts([order.cart], simulated_date=timezone.localdate(order.ordered_at))
+                    order.set_snapshot(
+                        totals[order.cart.id], CartItemSerializer(order.cart.items.all(), many=True).data
+                    )
+                Order.objects.bulk_update(
+                    orders, ['subtotal', 'total_quantity', 'discounts_applied', 'line_items']
+                )
+                updated += len(orders)
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully stored the pricing snapshot of {updated} orders')
+        )
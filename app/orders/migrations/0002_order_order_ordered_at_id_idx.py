@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carts', '0005_cart_cart_user_created_at_id_idx'),
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['-ordered_at', '-id'], name='order_ordered_at_id_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:55
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_order_order_ordered_at_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='discounts_applied',
+            field=models.JSONField(default=list, editable=False, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Discounts applied when the order was placed'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='line_items',
+            field=models.JSONField(default=list, editable=False, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Cart items (with their products) when the order was placed'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, editable=False, help_text='Cart subtotal when the order was placed', max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='total_quantity',
+            field=models.PositiveIntegerField(editable=False, help_text='Cart total quantity when the order was placed', null=True),
+        ),
+    ]
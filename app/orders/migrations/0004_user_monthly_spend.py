@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def backfill_monthly_spend(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    UserMonthlySpend = apps.get_model('orders', 'UserMonthlySpend')
+    months = Order.objects.annotate(
+        year=ExtractYear('ordered_at'), month=ExtractMonth('ordered_at')
+    ).values('cart__user_id', 'year', 'month').annotate(
+        total=Sum('total_paid'), order_count=Count('id')
+    ).order_by()
+    UserMonthlySpend.objects.bulk_create([
+        UserMonthlySpend(
+            user_id=row['cart__user_id'], year=row['year'], month=row['month'],
+            total=row['total'], order_count=row['order_count']
+        )
+        for row in months
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_order_pricing_snapshot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserMonthlySpend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('total', models.DecimalField(decimal_places=2, default=0, help_text='Sum of total_paid of the orders of the month', max_digits=14)),
+                ('order_count', models.PositiveIntegerField(default=0, help_text='Number of orders of the month')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_spend', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'User Monthly Spend',
+                'verbose_name_plural': 'User Monthly Spend',
+                'constraints': [models.UniqueConstraint(fields=('user', 'year', 'month'), name='unique_spend_per_user_month')],
+            },
+        ),
+        migrations.RunPython(backfill_monthly_spend, migrations.RunPython.noop),
+    ]
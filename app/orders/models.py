@@ -1,18 +1,122 @@
-from django.db import models
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.utils import timezone
 from carts.models import Cart
 
 class Order(models.Model):
     """
     Order model linked to a finalized cart.
+    The pricing of the cart is frozen on the order when it is created, so
+    reading an order never prices its cart again and historical totals do not
+    drift when promotions or products change.
     """
     cart = models.OneToOneField(Cart, on_delete=models.CASCADE, related_name='order')
     ordered_at = models.DateTimeField(auto_now_add=True)
     total_paid = models.DecimalField(max_digits=12, decimal_places=2)
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, null=True, editable=False, help_text='Cart subtotal when the order was placed')
+    total_quantity = models.PositiveIntegerField(null=True, editable=False, help_text='Cart total quantity when the order was placed')
+    discounts_applied = models.JSONField(default=list, encoder=DjangoJSONEncoder, editable=False, help_text='Discounts applied when the order was placed')
+    line_items = models.JSONField(default=list, encoder=DjangoJSONEncoder, editable=False, help_text='Cart items (with their products) when the order was placed')
 
     class Meta:
         verbose_name = 'Order'
         verbose_name_plural = 'Orders'
         ordering = ['-ordered_at']
+        indexes = [
+            # Keyset pagination of the order list (core.pagination.OrderedAtKeysetPagination)
+            models.Index(fields=['-ordered_at', '-id'], name='order_ordered_at_id_idx'),
+        ]
 
     def __str__(self):
         return f"Order {self.id} for Cart {self.cart.id} - ${self.total_paid}"
+
+    @property
+    def has_snapshot(self):
+        """
+        Whether the pricing was frozen on the order (orders created before it was not).
+        """
+        return self.total_quantity is not None
+
+    def set_snapshot(self, totals, line_items):
+        """
+        Freeze the pricing of the cart on the order.
+        totals is the structure returned by Cart.get_total_payable() and
+        line_items the serialized cart items.
+        """
+        self.subtotal = totals['subtotal']
+        self.total_quantity = totals['total_quantity']
+        self.discounts_applied = totals['discounts_applied']
+        self.line_items = line_items
+
+
+# Users who pay at least this much in a month are VIP from the next month on
+VIP_MONTHLY_SPEND = 10000
+
+
+class UserMonthlySpend(models.Model):
+    """
+    Ledger of what each user paid per calendar month.
+    Incremented in the same transaction that creates each order, so the VIP
+    rules read one row instead of summing the orders of the month.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='monthly_spend')
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text='Sum of total_paid of the orders of the month')
+    order_count = models.PositiveIntegerField(default=0, help_text='Number of orders of the month')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'User Monthly Spend'
+        verbose_name_plural = 'User Monthly Spend'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'year', 'month'], name='unique_spend_per_user_month')
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} {self.year}-{self.month:02d}: ${self.total} ({self.order_count} orders)"
+
+    @classmethod
+    def record_order(cls, order):
+        """
+        Add the order to the ledger row of its user and month, creating the row if needed.
+        Must run inside the transaction that creates the order.
+        """
+        ordered_at = timezone.localtime(order.ordered_at)
+        amount = cls._meta.get_field('total').to_python(order.total_paid)
+        row = cls.objects.filter(user_id=order.cart.user_id, year=ordered_at.year, month=ordered_at.month)
+        changes = {'total': F('total') + amount, 'order_count': F('order_count') + 1}
+        if row.update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    user_id=order.cart.user_id, year=ordered_at.year, month=ordered_at.month,
+                    total=amount, order_count=1
+                )
+        except IntegrityError:
+            # Another checkout of the same user created the row first
+            row.update(**changes)
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Recompute the whole ledger from the orders, e.g. after bulk-loading orders.
+        """
+        months = Order.objects.annotate(
+            year=ExtractYear('ordered_at'), month=ExtractMonth('ordered_at')
+        ).values('cart__user_id', 'year', 'month').annotate(
+            total=Sum('total_paid'), order_count=Count('id')
+        ).order_by()
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create([
+                cls(
+                    user_id=row['cart__user_id'], year=row['year'], month=row['month'],
+                    total=row['total'], order_count=row['order_count']
+                )
+                for row in months
+            ], batch_size=1000)
@@ -1,11 +1,41 @@
 from rest_framework import serializers
+from core.timing import TimedSerializerMixin
 from .models import Order
+from carts.models import Cart
 from carts.serializers import CartSerializer
 
-class OrderSerializer(serializers.ModelSerializer):
-    cart = CartSerializer(read_only=True)
+
+class OrderCartSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the cart row of an order; items and totals come from the order snapshot.
+    """
+
+    class Meta:
+        model = Cart
+        fields = ['id', 'user', 'cart_type', 'status', 'created_at', 'updated_at']
+
+
+class OrderSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    Serializer for Order model.
+    The nested cart is rebuilt from the pricing frozen on the order; only
+    orders created before the snapshot existed price their cart again.
+    """
+    cart = serializers.SerializerMethodField()
 
     class Meta:
         model = Order
         fields = ['id', 'cart', 'ordered_at', 'total_paid']
-        read_only_fields = ['id', 'cart', 'ordered_at', 'total_paid'] 
\ No newline at end of file
+        read_only_fields = ['id', 'cart', 'ordered_at', 'total_paid']
+
+    def get_cart(self, obj):
+        """Get the cart as it was priced when the order was placed."""
+        if not obj.has_snapshot:
+            return CartSerializer(obj.cart, context=self.context).data
+        data = OrderCartSerializer(obj.cart, context=self.context).data
+        data['items'] = obj.line_items
+        data['subtotal'] = float(obj.subtotal)
+        data['total_payable'] = float(obj.total_paid)
+        data['discounts_applied'] = obj.discounts_applied
+        data['total_quantity'] = obj.total_quantity
+        return data
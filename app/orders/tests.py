@@ -1,3 +1,474 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from unittest import skipUnless
+from unittest.mock import patch
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections, transaction
+from django.test import TestCase, TransactionTestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from carts.cache import totals_cache
+from carts.models import Cart, CartItem
+from core.db import retry_on_lock
+from core.pagination import KeysetPagination
+from products.models import Product
+from promotions.models import SpecialDatePromotion
+from .models import Order, UserMonthlySpend
 
-# Create your tests here.
+
+class OrderListPaginationTests(TestCase):
+    """
+    Tests for the cursor pagination of the order list.
+    """
+
+    def setUp(self):
+        """
+        Set up test data.
+        """
+        self.client = Client()
+        self.user = User.objects.create_user(username='buyer', password='testpassword123')
+        self.client.force_login(self.user)
+        carts = Cart.objects.bulk_create([
+            Cart(user=self.user, cart_type='COMUN', status='FINALIZADO') for _ in range(7)
+        ])
+        Order.objects.bulk_create([Order(cart=cart, total_paid=Decimal('100.00')) for cart in carts])
+        # Give every order the same timestamp, so only the id can break the ties
+        Order.objects.update(ordered_at=timezone.now())
+
+    def test_walks_all_pages_once(self):
+        """
+        Test that following the next links returns every order exactly once, newest first.
+        """
+        ids = []
+        url = '/orders/?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.json()['results']), 3)
+            ids.extend(order['id'] for order in response.json()['results'])
+            url = response.json()['next']
+
+        self.assertEqual(ids, list(Order.objects.order_by('-id').values_list('id', flat=True)))
+
+    def test_page_size_is_capped(self):
+        """
+        Test that page_size cannot exceed the pagination maximum.
+        """
+        with patch.object(KeysetPagination, 'max_page_size', 5):
+            response = self.client.get('/orders/?page_size=100000')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 5)
+        self.assertIsNotNone(response.json()['next'])
+
+
+class OrderDateFilterTests(TestCase):
+    """
+    Tests for the start and end date filters of the order list.
+    """
+
+    def setUp(self):
+        """
+        Set up test data.
+        """
+        self.client = Client()
+        self.user = User.objects.create_user(username='buyer', password='testpassword123')
+        self.client.force_login(self.user)
+        self.orders = {}
+        for moment in ['2025-06-09 23:59:59', '2025-06-10 00:00:00', '2025-06-11 23:59:59', '2025-06-12 00:00:00']:
+            cart = Cart.objects.create(user=self.user, cart_type='COMUN', status='FINALIZADO')
+            order = Order.objects.create(cart=cart, total_paid=Decimal('100.00'))
+            Order.objects.filter(pk=order.pk).update(
+                ordered_at=timezone.make_aware(timezone.datetime.fromisoformat(moment))
+            )
+            self.orders[moment] = order.id
+
+    def get_ids(self, query):
+        response = self.client.get(f'/orders/?{query}')
+        self.assertEqual(response.status_code, 200)
+        return sorted(order['id'] for order in response.json()['results'])
+
+    def test_days_are_inclusive(self):
+        """
+        Test that start and end include their whole day in the current time zone.
+        """
+        self.assertEqual(
+            self.get_ids('start=2025-06-10&end=2025-06-11'),
+            [self.orders['2025-06-10 00:00:00'], self.orders['2025-06-11 23:59:59']]
+        )
+        self.assertEqual(self.get_ids('start=2025-06-12'), [self.orders['2025-06-12 00:00:00']])
+        self.assertEqual(self.get_ids('end=2025-06-09'), [self.orders['2025-06-09 23:59:59']])
+        with self.settings(TIME_ZONE='America/Argentina/Buenos_Aires'):
+            # 2025-06-12 00:00 UTC is still the 11th in Buenos Aires
+            self.assertEqual(
+                self.get_ids('start=2025-06-11&end=2025-06-11'),
+                [self.orders['2025-06-11 23:59:59'], self.orders['2025-06-12 00:00:00']]
+            )
+
+    def test_filters_compare_the_column(self):
+        """
+        Test that the filters compare ordered_at itself instead of casting it to a date, and reject invalid dates.
+        """
+        with CaptureQueriesContext(connection) as context:
+            self.get_ids('start=2025-06-10&end=2025-06-11')
+        sql = next(query['sql'] for query in context.captured_queries if 'orders_order' in query['sql'])
+        self.assertNotIn('django_datetime_cast_date', sql)
+        response = self.client.get('/orders/?start=2025-02-30')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('start', response.json())
+
+
+class OrderSnapshotTests(TestCase):
+    """
+    Tests for the pricing frozen on orders.
+    """
+
+    def setUp(self):
+        """
+        Set up test data.
+        """
+        self.client = Client()
+        self.user = User.objects.create_user(username='buyer', password='testpassword123')
+        self.client.force_login(self.user)
+        self.product = Product.objects.create(name='Lamp', description='Test product', price=Decimal('250.00'), stock=100)
+        totals_cache.clear()
+
+    def place_order(self, quantity=4):
+        response = self.client.post('/carts/', {'cart_type': 'COMUN'}, content_type='application/json')
+        cart_id = response.json()['id']
+        self.client.post(
+            f'/carts/{cart_id}/items/', {'product_id': self.product.id, 'quantity': quantity},
+            content_type='application/json'
+        )
+        response = self.client.post('/orders/create/', {'cart_id': cart_id}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def test_order_keeps_its_pricing(self):
+        """
+        Test that later price and promotion changes do not alter a placed order.
+        """
+        placed = self.place_order()
+        self.assertEqual(placed['cart']['subtotal'], 1000.0)
+        self.assertEqual(placed['cart']['total_payable'], 1750.0)
+        self.assertEqual(placed['cart']['items'][0]['product']['name'], 'Lamp')
+
+        self.product.price = Decimal('999.00')
+        self.product.name = 'Renamed lamp'
+        self.product.save()
+        today = date.today()
+        SpecialDatePromotion.objects.create(
+            description='Late promotion', start_date=today, end_date=today, discount_amount=Decimal('300.00')
+        )
+
+        order = self.client.get('/orders/').json()['results'][0]
+        self.assertEqual(order['cart'], placed['cart'] | {'status': 'FINALIZADO', 'updated_at': order['cart']['updated_at']})
+        self.assertEqual(order['total_paid'], '1750.00')
+
+    def test_order_list_does_not_price_carts(self):
+        """
+        Test that the order list costs the same number of queries for 1 or 3 orders.
+        """
+        self.place_order()
+        with CaptureQueriesContext(connection) as single:
+            self.client.get('/orders/')
+        self.place_order(quantity=2)
+        self.place_order(quantity=6)
+        with CaptureQueriesContext(connection) as several:
+            response = self.client.get('/orders/')
+        self.assertEqual(len(response.json()['results']), 3)
+        self.assertEqual(len(several.captured_queries), len(single.captured_queries))
+
+    def test_snapshot_orders_command(self):
+        """
+        Test that the command freezes the pricing of orders created without it.
+        """
+        cart = Cart.objects.create(user=self.user, cart_type='COMUN', status='FINALIZADO')
+        CartItem.objects.create(cart=cart, product=self.product, quantity=2, unit_price=self.product.price)
+        Cart.refresh_aggregates(Cart.objects.filter(pk=cart.pk))
+        order = Order.objects.create(cart=cart, total_paid=Decimal('1500.00'))
+        self.assertFalse(order.has_snapshot)
+
+        out = StringIO()
+        call_command('snapshot_orders', '--dry-run', stdout=out)
+        self.assertIn('Would store the pricing snapshot of 1 orders', out.getvalue())
+        order.refresh_from_db()
+        self.assertFalse(order.has_snapshot)
+
+        call_command('snapshot_orders', stdout=StringIO())
+        order.refresh_from_db()
+        self.assertTrue(order.has_snapshot)
+        self.assertEqual(order.subtotal, Decimal('500.00'))
+        self.assertEqual(order.total_quantity, 2)
+        self.assertEqual(order.total_paid, Decimal('1500.00'))
+        self.assertEqual(order.line_items[0]['product']['id'], self.product.id)
+
+
+class UserMonthlySpendTests(TestCase):
+    """
+    Tests for the monthly spend ledger used by the VIP rules.
+    """
+
+    def setUp(self):
+        """
+        Set up test data.
+        """
+        self.client = Client()
+        self.user = User.objects.create_user(username='spender', password='testpassword123')
+        self.client.force_login(self.user)
+        self.product = Product.objects.create(name='Sofa', description='Test product', price=Decimal('3000.00'), stock=100)
+        totals_cache.clear()
+
+    def place_order(self, quantity):
+        cart = Cart.objects.create(user=self.user, cart_type='COMUN')
+        CartItem.objects.create(cart=cart, product=self.product, quantity=quantity, unit_price=self.product.price)
+        Cart.refresh_aggregates(Cart.objects.filter(pk=cart.pk))
+        response = self.client.post('/orders/create/', {'cart_id': cart.id}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        return Order.objects.get(pk=response.json()['id'])
+
+    def test_orders_increment_the_ledger(self):
+        """
+        Test that every order adds its total to the row of its user and month.
+        """
+        first = self.place_order(1)
+        second = self.place_order(2)
+
+        now = timezone.localtime()
+        spend = UserMonthlySpend.objects.get(user=self.user, year=now.year, month=now.month)
+        self.assertEqual(spend.total, first.total_paid + second.total_paid)
+        self.assertEqual(spend.order_count, 2)
+        self.assertFalse(self.user.profile.is_vip)
+
+    def test_vip_after_crossing_the_threshold(self):
+        """
+        Test that the user becomes VIP once the month ledger reaches $10,000.
+        """
+        self.place_order(2)
+        self.user.profile.refresh_from_db()
+        self.assertFalse(self.user.profile.is_vip)
+
+        self.place_order(2)
+        self.user.profile.refresh_from_db()
+        self.assertTrue(self.user.profile.is_vip)
+
+    def test_rebuild_matches_incremental_ledger(self):
+        """
+        Test that rebuilding the ledger from the orders gives the same rows.
+        """
+        self.place_order(1)
+        self.place_order(3)
+        incremental = list(UserMonthlySpend.objects.values_list('user', 'year', 'month', 'total', 'order_count'))
+
+        UserMonthlySpend.rebuild()
+        rebuilt = list(UserMonthlySpend.objects.values_list('user', 'year', 'month', 'total', 'order_count'))
+        self.assertEqual(rebuilt, incremental)
+
+
+class CheckoutStockTests(TestCase):
+    """
+    Tests for the stock taken at checkout.
+    """
+
+    def setUp(self):
+        """
+        Set up test data.
+        """
+        self.client = Client()
+        self.user = User.objects.create_user(username='buyer', password='testpassword123')
+        self.client.force_login(self.user)
+        self.lamp = Product.objects.create(name='Lamp', description='Test product', price=Decimal('250.00'), stock=5)
+        self.soap = Product.objects.create(name='Soap', description='Test product', price=Decimal('10.00'), stock=3)
+        totals_cache.clear()
+
+    def create_cart(self, cart_type, **quantities):
+        cart = Cart.objects.create(user=self.user, cart_type=cart_type)
+        for name, quantity in quantities.items():
+            product = getattr(self, name)
+            CartItem.objects.create(cart=cart, product=product, quantity=quantity, unit_price=product.price)
+        Cart.refresh_aggregates(Cart.objects.filter(pk=cart.pk))
+        return cart
+
+    def checkout(self, cart):
+        return self.client.post('/orders/create/', {'cart_id': cart.id}, content_type='application/json')
+
+    def assertStock(self, lamp, soap):
+        self.assertEqual(
+            (Product.objects.get(pk=self.lamp.pk).stock, Product.objects.get(pk=self.soap.pk).stock), (lamp, soap)
+        )
+
+    def test_checkout_takes_stock_in_one_statement(self):
+        """
+        Test that every line of the cart is taken out of stock with a single UPDATE.
+        """
+        cart = self.create_cart('COMUN', lamp=2, soap=3)
+        with CaptureQueriesContext(connection) as context:
+            response = self.checkout(cart)
+        self.assertEqual(response.status_code, 201)
+        self.assertStock(3, 0)
+        product_updates = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "products_product"')
+        ]
+        self.assertEqual(len(product_updates), 1)
+
+    def test_short_product_fails_the_whole_checkout(self):
+        """
+        Test that one short line leaves every stock, the cart and the orders untouched.
+        """
+        cart = self.create_cart('COMUN', lamp=2, soap=4)
+        response = self.checkout(cart)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(
+            response.json()['products'], [{'id': self.soap.id, 'name': 'Soap', 'requested': 4, 'available': 3}]
+        )
+        self.assertStock(5, 3)
+        cart.refresh_from_db()
+        self.assertEqual(cart.status, 'ACTIVO')
+        self.assertFalse(Order.objects.exists())
+
+    def test_checkout_after_the_last_units_fails(self):
+        """
+        Test that once a checkout takes the last units, the next one for the same product fails.
+        """
+        first = self.create_cart('COMUN', lamp=3)
+        second = self.create_cart('VIP', lamp=3)
+        self.assertEqual(self.checkout(first).status_code, 201)
+        response = self.checkout(second)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['products'][0]['available'], 2)
+        self.assertStock(2, 3)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'the in-memory SQLite test database fails shared locks instead of waiting')
+class ConcurrentCheckoutTests(TransactionTestCase):
+    """
+    Tests for checkouts of the same hot product running at the same time.
+    """
+
+    def test_competing_checkouts_never_oversell(self):
+        """
+        Test that concurrent checkouts asking for more units than there are sell exactly the stock and no more.
+        """
+        lamp = Product.objects.create(name='Hot lamp', description='Test product', price=Decimal('250.00'), stock=5)
+        carts = []
+        for index in range(6):
+            user = User.objects.create_user(username=f'buyer{index}', password='testpassword123')
+            cart = Cart.objects.create(user=user, cart_type='COMUN')
+            CartItem.objects.create(cart=cart, product=lamp, quantity=2, unit_price=lamp.price)
+            carts.append(cart)
+        Cart.refresh_aggregates(Cart.objects.all())
+
+        def checkout(cart):
+            client = Client()
+            client.force_login(cart.user)
+            try:
+                return client.post('/orders/create/', {'cart_id': cart.id}, content_type='application/json').status_code
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            statuses = list(executor.map(checkout, carts))
+        # 5 units cover two carts of 2; every other checkout finds 1 left
+        self.assertEqual(sorted(statuses), [201] * 2 + [409] * 4)
+        lamp.refresh_from_db()
+        self.assertEqual(lamp.stock, 1)
+        self.assertEqual(Order.objects.count(), 2)
+
+
+@patch('core.db.time.sleep')
+class LockRetryTests(TransactionTestCase):
+    """
+    Tests for the SQLite connection settings and the retried write transactions.
+    """
+
+    @skipUnless(connection.vendor == 'sqlite', 'the pragmas are set on SQLite connections')
+    def test_connection_pragmas(self, sleep):
+        """
+        Test that connections are opened with the tuned pragmas and IMMEDIATE transactions.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)
+            cursor.execute('PRAGMA temp_store')
+            self.assertEqual(cursor.fetchone()[0], 2)
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+    def test_retries_locked_transactions(self, sleep):
+        """
+        Test that a locked transaction is rolled back and run again.
+        """
+        attempts = []
+
+        @retry_on_lock
+        def write():
+            attempts.append(Product.objects.create(name=f'Try {len(attempts)}', price=Decimal('1.00'), stock=1))
+            if len(attempts) < 3:
+                raise OperationalError('database is locked')
+            return attempts[-1]
+
+        product = write()
+        self.assertEqual(len(attempts), 3)
+        self.assertEqual(sleep.call_count, 2)
+        self.assertEqual(list(Product.objects.filter(name__startswith='Try ')), [product])
+
+    def test_gives_up(self, sleep):
+        """
+        Test that other errors, inner transactions and the last attempt are not retried.
+        """
+        calls = []
+
+        @retry_on_lock
+        def fail(message):
+            calls.append(message)
+            raise OperationalError(message)
+
+        with self.assertRaisesMessage(OperationalError, 'no such table'):
+            fail('no such table')
+        with self.assertRaises(OperationalError), transaction.atomic():
+            fail('database is locked')
+        self.assertEqual(calls, ['no such table', 'database is locked'])
+
+        with self.settings(DATABASE_LOCK_RETRIES=2), self.assertRaises(OperationalError):
+            fail('database is locked')
+        self.assertEqual(len(calls), 5)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'the pool and the concurrent upserts need PostgreSQL')
+class PostgreSQLConnectionTests(TransactionTestCase):
+    """
+    Tests for the PostgreSQL connection pool and the concurrent cart writes it serves.
+    """
+
+    def test_connection_pool(self):
+        """
+        Test that connections are lent by the psycopg pool and given back when closed.
+        """
+        if 'pool' not in connection.settings_dict['OPTIONS']:
+            self.skipTest('DATABASE_POOL_MAX_SIZE is 0')
+        self.assertEqual(connection.pool.max_size, connection.settings_dict['OPTIONS']['pool']['max_size'])
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        connection.close()
+        self.assertGreater(connection.pool.get_stats()['pool_available'], 0)
+
+    def test_concurrent_cart_adds(self):
+        """
+        Test that concurrent CartItem.add calls from pooled connections create one line and keep every unit.
+        """
+        user = User.objects.create_user(username='pooled', password='testpassword123')
+        cart = Cart.objects.create(user=user, cart_type='COMUN')
+        product = Product.objects.create(name='Pooled Brush', price=Decimal('5.00'), stock=100)
+
+        def add(_):
+            try:
+                return CartItem.add(cart, product, 1).created
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            created = list(executor.map(add, range(8)))
+        self.assertEqual(created.count(True), 1)
+        self.assertEqual(CartItem.objects.get(cart=cart, product=product).quantity, 8)
@@ -1,22 +1,37 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render
 from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from datetime import datetime, time, timedelta
 from django.utils import timezone
-from django.db import transaction
+from django.utils.dateparse import parse_date
+from django.db.models import prefetch_related_objects
 from django.shortcuts import get_object_or_404
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiExample, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
-from .models import Order
-from carts.models import Cart
+from .models import Order, UserMonthlySpend, VIP_MONTHLY_SPEND
+from carts.models import Cart, CartItem
+from products.models import InsufficientStock, Product
+from carts.pricing import price_carts
 from .serializers import OrderSerializer
-from users.models import UserProfile
+from carts.serializers import CartItemSerializer
+from users.models import UserProfile, VipStatusEvent
+from core.async_views import AsyncReadView
+from core.db import retry_on_lock
+from core.pagination import OrderedAtKeysetPagination
+from core.routers import ReplicaReadMixin
 
 # Create your views here.
 
 @extend_schema(
     summary="Crear pedido",
-    description="Finaliza un carrito y crea un pedido. Actualiza automáticamente el estado VIP del usuario si corresponde.",
+    description=(
+        "Finaliza un carrito y crea un pedido, descontando el stock de todos sus productos. "
+        "Si algún producto no tiene stock suficiente no se modifica nada y se responde 409. "
+        "Actualiza automáticamente el estado VIP del usuario si corresponde."
+    ),
     request=OpenApiExample(
         'Finalizar carrito',
         value={'cart_id': 1},
@@ -33,6 +48,14 @@ from users.models import UserProfile
             'Carrito no encontrado',
             value={'detail': 'Not found.'},
             response_only=True
+        ),
+        409: OpenApiExample(
+            'Stock insuficiente',
+            value={
+                'error': 'Insufficient stock.',
+                'products': [{'id': 3, 'name': 'Solar Power Bank', 'requested': 4, 'available': 1}]
+            },
+            response_only=True
         )
     },
     examples=[
@@ -61,24 +84,37 @@ class OrderCreateView(generics.CreateAPIView):
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
 
-    @transaction.atomic
+    @retry_on_lock
     def post(self, request, *args, **kwargs):
         cart_id = request.data.get('cart_id')
         cart = get_object_or_404(Cart, id=cart_id, user=request.user)
         if cart.status != 'ACTIVO':
             return Response({'error': 'Cart is not active or already finalized.'}, status=status.HTTP_400_BAD_REQUEST)
         # Prevent finalizing an empty cart
-        if cart.items.count() == 0:
+        if cart.item_count == 0:
             return Response({'error': 'No se puede finalizar un carrito vacío.'}, status=status.HTTP_400_BAD_REQUEST)
+        # Load items and products once for stock, pricing and the response
+        prefetch_related_objects([cart], CartItem.get_prefetch('items'))
+        # Reserve the stock of every line first, so a short product fails the checkout before anything is written
+        try:
+            Product.take_stock({item.product_id: item.quantity for item in cart.items.all()})
+        except InsufficientStock as e:
+            return Response(
+                {'error': 'Insufficient stock.', 'products': e.shortages}, status=status.HTTP_409_CONFLICT
+            )
         # Calculate total payable
-        totals = cart.get_total_payable()
-        total_paid = totals['total_payable']
-        # Create order
-        order = Order.objects.create(cart=cart, total_paid=total_paid)
+        cart_totals = price_carts([cart])
+        # Create order, freezing the pricing and the items of the cart
+        totals = cart_totals[cart.id]
+        order = Order(cart=cart, total_paid=totals['total_payable'])
+        order.set_snapshot(totals, CartItemSerializer(cart.items.all(), many=True).data)
+        order.save()
         # Mark cart as finalized
         cart.status = 'FINALIZADO'
-        cart.save()
-        # Actualizar VIP según reglas
+        # Only write the status, so the maintained aggregates are never overwritten
+        cart.save(update_fields=['status', 'updated_at'])
+        # Add the order to the monthly spend ledger and update VIP according to the rules
+        UserMonthlySpend.record_order(order)
         self.update_vip_status(cart.user)
         serializer = self.get_serializer(order)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -88,29 +124,75 @@ class OrderCreateView(generics.CreateAPIView):
         Update VIP status:
         - If user spent > $10,000 in the current month, set VIP for next month.
         - If user did NOT buy anything in the current month, remove VIP.
+        The month totals are read from the UserMonthlySpend ledger.
         """
         profile, _ = UserProfile.objects.get_or_create(user=user)
         now = timezone.now()
-        # Get all orders for this user in the current month
-        month_orders = Order.objects.filter(
-            cart__user=user,
-            ordered_at__year=now.year,
-            ordered_at__month=now.month
-        )
-        total_month = sum(order.total_paid for order in month_orders)
+        local_now = timezone.localtime(now)
+        spend = UserMonthlySpend.objects.filter(
+            user=user, year=local_now.year, month=local_now.month
+        ).values('total', 'order_count').first() or {'total': 0, 'order_count': 0}
         # VIP if spent > $10,000 this month (VIP applies next month)
-        if total_month >= 10000:
+        if spend['total'] >= VIP_MONTHLY_SPEND:
             if not profile.is_vip:
                 profile.is_vip = True
                 profile.vip_since = now.replace(day=1) + timezone.timedelta(days=32)
                 profile.vip_since = profile.vip_since.replace(day=1)  # First day of next month
                 profile.save()
+                VipStatusEvent.objects.create(user=user, kind=VipStatusEvent.GRANTED, changed_at=profile.vip_since)
         else:
             # If no purchases this month, remove VIP
-            if profile.is_vip and month_orders.count() == 0:
+            if profile.is_vip and spend['order_count'] == 0:
                 profile.is_vip = False
                 profile.vip_until = now
                 profile.save()
+                VipStatusEvent.objects.create(user=user, kind=VipStatusEvent.REVOKED, changed_at=now)
+
+def filter_orders(query_params, user):
+    """
+    Orders matching the filters of the order list query parameters.
+    """
+    # Orders carry their frozen pricing, so only the cart row is needed
+    queryset = Order.objects.select_related('cart')
+    # Filtro por usuario
+    if query_params.get('user', None):
+        queryset = queryset.filter(cart__user=user)
+    # Filtro por tipo de carrito
+    cart_type = query_params.get('cart_type', None)
+    if cart_type:
+        queryset = queryset.filter(cart__cart_type=cart_type)
+    # Filtro por rango de fechas, as a range on ordered_at so its index is used on every database
+    start = parse_day(query_params, 'start')
+    end = parse_day(query_params, 'end')
+    if start:
+        queryset = queryset.filter(ordered_at__gte=start_of_day(start))
+    if end:
+        queryset = queryset.filter(ordered_at__lt=start_of_day(end + timedelta(days=1)))
+    return queryset
+
+
+def parse_day(query_params, name):
+    """
+    Date of the YYYY-MM-DD query parameter name, or None if it is missing.
+    """
+    value = query_params.get(name)
+    if not value:
+        return None
+    try:
+        day = parse_date(value)
+    except ValueError:
+        day = None
+    if day is None:
+        raise ValidationError({name: 'Enter a valid date in YYYY-MM-DD format.'})
+    return day
+
+
+def start_of_day(day):
+    """
+    First instant of day in the current time zone.
+    """
+    return timezone.make_aware(datetime.combine(day, time.min))
+
 
 @extend_schema(
     summary="Listar pedidos",
@@ -147,28 +229,27 @@ class OrderCreateView(generics.CreateAPIView):
     ],
     tags=['orders']
 )
-class OrderListView(generics.ListAPIView):
+class OrderListView(ReplicaReadMixin, generics.ListAPIView):
     """
     List all orders with optional filters.
+    The list is paginated with a cursor, newest orders first.
     """
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = OrderedAtKeysetPagination
 
     def get_queryset(self):
-        queryset = Order.objects.all()
-        user = self.request.user
-        # Filtro por usuario
-        if self.request.query_params.get('user', None):
-            queryset = queryset.filter(cart__user=user)
-        # Filtro por tipo de carrito
-        cart_type = self.request.query_params.get('cart_type', None)
-        if cart_type:
-            queryset = queryset.filter(cart__cart_type=cart_type)
-        # Filtro por rango de fechas
-        start = self.request.query_params.get('start', None)
-        end = self.request.query_params.get('end', None)
-        if start:
-            queryset = queryset.filter(ordered_at__date__gte=start)
-        if end:
-            queryset = queryset.filter(ordered_at__date__lte=end)
-        return queryset.order_by('-ordered_at')
+        return filter_orders(self.request.query_params, self.request.user)
+
+
+class AsyncOrderListView(ReplicaReadMixin, AsyncReadView):
+    """
+    Async variant of OrderListView for ASGI deployments (core.asgi_urls).
+    """
+    sync_view = OrderListView
+
+    async def get_data(self, request):
+        queryset = filter_orders(request.GET, request.user)
+        return await sync_to_async(self.paginate)(
+            request, queryset, OrderedAtKeysetPagination, OrderSerializer
+        )
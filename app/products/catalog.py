@@ -0,0 +1,110 @@
+"""
+Pre-serialized catalog responses.
+
+The rendered JSON of the product list pages and product details is kept in the
+Django cache under keys that include a catalog version. Saving or deleting a
+Product bumps the version (products.signals), so every cached response is
+rebuilt on its next read and the stale ones simply expire. The entries are
+shared by every client, so they are always rendered from the default database,
+never from a read replica that may lag behind the version they are stored under.
+AsyncCatalogCacheMixin does the same for the async views served under ASGI.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+
+from core.conditional import version_etag
+from core.routers import replica_reads
+from core.versions import CacheVersion
+
+
+CATALOG_VERSION_KEY = 'catalog:version'
+
+# Part of every cached catalog key: bumping it makes every cached response stale
+catalog_version = CacheVersion(CATALOG_VERSION_KEY)
+
+
+def is_cacheable(request):
+    """
+    Whether the request reads the JSON catalog; the browsable API and every
+    other method are left to DRF.
+    """
+    return (request.method in ('GET', 'HEAD') and 'format' not in request.GET
+            and 'text/html' not in request.headers.get('Accept', ''))
+
+
+def cached_response(content):
+    response = HttpResponse(content, content_type='application/json')
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def add_catalog_etag(response, etag):
+    response['ETag'] = etag
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+class CatalogCacheMixin:
+    """
+    View mixin that answers JSON GET requests with the cached rendered bytes,
+    skipping the ORM and DRF entirely. Misses go through the view as usual and
+    their 200 responses are stored. The ETag comes from the catalog version,
+    so a matching If-None-Match is answered with 304 without reading the cache.
+    """
+
+    def get_catalog_key(self, request, *args, **kwargs):
+        """
+        Identify the response within a catalog version.
+        """
+        raise NotImplementedError
+
+    def dispatch(self, request, *args, **kwargs):
+        if not is_cacheable(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        key = f'catalog:{catalog_version.get()}:{self.get_catalog_key(request, *args, **kwargs)}'
+        etag = version_etag(key)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            content = cache.get(key)
+            if content is None:
+                with replica_reads(False):
+                    response = super().dispatch(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                response.render()
+                cache.set(key, response.content, settings.CATALOG_CACHE_TIMEOUT)
+            else:
+                response = cached_response(content)
+        return add_catalog_etag(response, etag)
+
+
+class AsyncCatalogCacheMixin:
+    """
+    CatalogCacheMixin for async views (core.async_views.AsyncReadView),
+    reading and filling the same cache entries.
+    """
+    get_catalog_key = CatalogCacheMixin.get_catalog_key
+
+    async def dispatch(self, request, *args, **kwargs):
+        if not is_cacheable(request):
+            return await super().dispatch(request, *args, **kwargs)
+
+        key = f'catalog:{await catalog_version.aget()}:{self.get_catalog_key(request, *args, **kwargs)}'
+        etag = version_etag(key)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            content = await cache.aget(key)
+            if content is None:
+                with replica_reads(False):
+                    response = await super().dispatch(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                await cache.aset(key, response.content, settings.CATALOG_CACHE_TIMEOUT)
+            else:
+                response = cached_response(content)
+        return add_catalog_etag(response, etag)
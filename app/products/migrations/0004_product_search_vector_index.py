@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:10
+
+from django.db import migrations
+
+
+INDEX_NAME = 'product_search_vector_idx'
+
+
+def search_vector_index():
+    # Must be the expression of products.search.postgresql_search_vector(),
+    # or the planner cannot use the index for ?q= searches
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    vector = (SearchVector('name', weight='A', config='simple')
+              + SearchVector('description', weight='B', config='simple'))
+    return GinIndex(vector, name=INDEX_NAME)
+
+
+def add_search_vector_index(apps, schema_editor):
+    # The SQLite search index is an FTS5 table (see products.search)
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.add_index(apps.get_model('products', 'Product'), search_vector_index())
+
+
+def remove_search_vector_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.remove_index(apps.get_model('products', 'Product'), search_vector_index())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_vector_index, remove_search_vector_index),
+    ]
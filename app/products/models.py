@@ -1,7 +1,23 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, F, When
+from django.utils import timezone
+from core.versions import invalidate_on_commit
+from .catalog import catalog_version
+from .search import SEARCH_TABLE, Match
 
 # Create your models here.
 
+class InsufficientStock(Exception):
+    """
+    Raised when some products do not have enough stock for a checkout.
+    shortages lists them as dicts with id, name, requested and available.
+    """
+
+    def __init__(self, shortages):
+        self.shortages = shortages
+        super().__init__('Insufficient stock for products ' + ', '.join(str(item['id']) for item in shortages))
+
+
 class Product(models.Model):
     """
     Product model for the e-commerce platform.
@@ -21,6 +37,10 @@ class Product(models.Model):
         verbose_name = 'Product'
         verbose_name_plural = 'Products'
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of the catalog (core.pagination.KeysetPagination)
+            models.Index(fields=['-created_at', '-id'], name='product_created_at_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} - ${self.price}"
@@ -31,3 +51,54 @@ class Product(models.Model):
         Check if product is available (has stock).
         """
         return self.stock > 0
+
+    @classmethod
+    def take_stock(cls, quantities):
+        """
+        Take the requested quantities ({product id: quantity}) out of stock in
+        a single UPDATE guarded by stock >= quantity, so concurrent checkouts
+        can never oversell and no product row is locked one at a time.
+        Either every product is decremented or none is and InsufficientStock
+        is raised with the products that are short.
+        """
+        if not quantities:
+            return
+        requested = Case(*[When(pk=pk, then=quantity) for pk, quantity in quantities.items()])
+        with transaction.atomic():
+            updated = cls.objects.filter(pk__in=quantities, stock__gte=requested).update(
+                stock=F('stock') - requested, updated_at=timezone.now()
+            )
+            if updated < len(quantities):
+                # Undo the products that did have enough stock
+                transaction.set_rollback(True)
+        if updated < len(quantities):
+            short = cls.objects.filter(pk__in=quantities).exclude(stock__gte=requested).values('id', 'name', 'stock')
+            raise InsufficientStock([
+                {'id': row['id'], 'name': row['name'], 'requested': quantities[row['id']], 'available': row['stock']}
+                for row in short
+            ])
+        # QuerySet.update() sends no signals, so refresh the cached catalog here
+        invalidate_on_commit(catalog_version.bump)
+
+
+class ProductSearchIndex(models.Model):
+    """
+    Read-only view of the FTS5 search table (see products.search), one row per product.
+    The table and the triggers filling it are not managed by migrations.
+    """
+    product = models.OneToOneField(
+        Product, primary_key=True, db_column='rowid', on_delete=models.DO_NOTHING, related_name='search_index'
+    )
+    name = models.TextField()
+    description = models.TextField()
+    # FTS5 hidden columns: the table-named column takes MATCH queries and
+    # rank is the BM25 score of the match (lower is better)
+    document = models.TextField(db_column=SEARCH_TABLE)
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = SEARCH_TABLE
+
+
+ProductSearchIndex._meta.get_field('document').register_lookup(Match)
@@ -0,0 +1,170 @@
+"""
+Full-text product search.
+
+On SQLite the catalog is indexed by an FTS5 table over Product.name and
+description, kept in sync by triggers on the product table so that
+bulk_create(), update() and queryset deletes are indexed too. Searches are
+ranked with BM25. On PostgreSQL the same queries run on its own full-text
+search over a GIN expression index (migration 0004), ranking matches in the
+name above those in the description. Other databases, or SQLite builds
+without FTS5, fall back to case-insensitive substring matching.
+"""
+import re
+
+from django.db import OperationalError, connections
+from django.db.models import F, FloatField, Lookup, Q
+from django.db.models.functions import Cast
+
+
+SEARCH_TABLE = 'products_product_fts'
+
+SEARCH_INDEX_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        name, description, content='products_product', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_insert AFTER INSERT ON products_product BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_delete AFTER DELETE ON products_product BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_update AFTER UPDATE OF name, description ON products_product BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {SEARCH_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+]
+
+_indexed_aliases = set()
+
+
+def ensure_search_index(using='default'):
+    """
+    Create the search table and its triggers if they are missing and
+    rebuild the index when they were. Returns whether search is indexed.
+
+    SQLite drops triggers whenever a migration remakes the product table,
+    so this runs after every migrate (see products.signals).
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+            [f'{SEARCH_TABLE}_%']
+        )
+        if cursor.fetchone()[0] < 3:
+            try:
+                for statement in SEARCH_INDEX_SQL:
+                    cursor.execute(statement)
+            except OperationalError:
+                # SQLite compiled without FTS5
+                return False
+            cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')")
+    _indexed_aliases.add(using)
+    return True
+
+
+class Match(Lookup):
+    """
+    FTS5 full-text match of the search table column against a query.
+    """
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', (*lhs_params, *rhs_params)
+
+
+def has_search_index(using='default'):
+    """
+    Check whether the search index exists on the database.
+    """
+    if using in _indexed_aliases:
+        return True
+    connection = connections[using]
+    if connection.vendor == 'sqlite' and SEARCH_TABLE in connection.introspection.table_names():
+        _indexed_aliases.add(using)
+        return True
+    return False
+
+
+def to_match_query(text):
+    """
+    Turn user input into an FTS5 query: every word must match, as a prefix.
+    Words are quoted so FTS5 operators in the input are matched literally.
+    """
+    words = re.findall(r'\w+', text)
+    return ' '.join('"{}"*'.format(word) for word in words)
+
+
+def to_tsquery(text):
+    """
+    Turn user input into a PostgreSQL tsquery with the same meaning as
+    to_match_query(). Only word characters are kept, so the raw query is safe.
+    """
+    words = re.findall(r'\w+', text)
+    return ' & '.join('{}:*'.format(word) for word in words)
+
+
+def postgresql_search_vector():
+    """
+    The weighted document searched on PostgreSQL. Migration 0004 indexes this
+    same expression with GIN, so the two must be changed together.
+    """
+    # Imported here as it needs psycopg, which SQLite installs do not have
+    from django.contrib.postgres.search import SearchVector
+
+    return (SearchVector('name', weight='A', config='simple')
+            + SearchVector('description', weight='B', config='simple'))
+
+
+def postgresql_search(queryset, text):
+    """
+    Filter and rank a product queryset with PostgreSQL full-text search.
+    """
+    from django.contrib.postgres.search import SearchQuery, SearchRank
+
+    tsquery = to_tsquery(text)
+    if not tsquery:
+        return queryset.none()
+    vector = postgresql_search_vector()
+    query = SearchQuery(tsquery, search_type='raw', config='simple')
+    # ts_rank is a real and higher is better: negate it so it sorts like BM25,
+    # and widen it so the pagination cursor round-trips it exactly
+    return queryset.alias(search_document=vector).filter(search_document=query).annotate(
+        search_rank=Cast(-SearchRank(F('search_document'), query), FloatField())
+    )
+
+
+def search(queryset, text):
+    """
+    Filter a product queryset by the words of text. With the search index
+    the products are annotated with search_rank (BM25, lower is better), as
+    they are on PostgreSQL.
+    """
+    if connections[queryset.db].vendor == 'postgresql':
+        return postgresql_search(queryset, text)
+    if has_search_index(queryset.db):
+        match = to_match_query(text)
+        if not match:
+            return queryset.none()
+        # Joining the search table lets SQLite start from the matches and
+        # read their rank, instead of looking every product up in the index
+        return queryset.filter(search_index__document__match=match).annotate(search_rank=F('search_index__rank'))
+
+    for word in text.split():
+        queryset = queryset.filter(Q(name__icontains=word) | Q(description__icontains=word))
+    return queryset
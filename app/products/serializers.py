@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from core.timing import TimedSerializerMixin
 from .models import Product
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for Product model.
     """
@@ -20,4 +21,19 @@ class ProductSerializer(serializers.ModelSerializer):
             'created_at', 
             'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at'] 
\ No newline at end of file
+        read_only_fields = ['id', 'created_at', 'updated_at']
+
+
+class ProductFilterSerializer(serializers.Serializer):
+    """
+    Query parameters of the product list.
+    """
+    q = serializers.CharField(required=False, allow_blank=True, max_length=200, help_text='Words to search in name and description')
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, min_value=0)
+    max_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, min_value=0)
+    available = serializers.BooleanField(required=False, allow_null=True, help_text='Only products with (true) or without (false) stock')
+
+    def validate(self, data):
+        if 'min_price' in data and 'max_price' in data and data['min_price'] > data['max_price']:
+            raise serializers.ValidationError({'max_price': ['Must be greater than or equal to min_price.']})
+        return data
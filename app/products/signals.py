@@ -1,9 +1,30 @@
-from django.db.models.signals import post_migrate
+from django.db.models.signals import post_migrate, post_save, post_delete
 from django.dispatch import receiver
 from django.apps import apps
 from django.core.management import call_command
-from django.db import transaction
 import random
+from core.versions import invalidate_on_commit
+from .catalog import catalog_version
+from .models import Product
+from .search import ensure_search_index
+
+
+@receiver(post_migrate)
+def install_search_index(sender, using='default', **kwargs):
+    """
+    Keep the product search index in place after every migrate.
+    """
+    if sender.name == 'products':
+        ensure_search_index(using)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def handle_product_change(sender, instance, **kwargs):
+    """
+    Invalidate the cached catalog responses when a product changes.
+    """
+    invalidate_on_commit(catalog_version.bump)
 
 
 @receiver(post_migrate)
@@ -1,3 +1,177 @@
-from django.test import TestCase
+from decimal import Decimal
+from unittest import skipUnless
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from .models import Product
+from .search import search
 
-# Create your tests here.
+
+class CatalogCacheTests(TestCase):
+    """
+    Tests for the pre-serialized catalog responses.
+    """
+
+    def setUp(self):
+        """
+        Set up test data.
+        """
+        cache.clear()
+        self.client = Client()
+        # Start from an empty catalog instead of the base products
+        Product.objects.all().delete()
+        self.soap = Product.objects.create(name='Soap', description='Soap bar', price=Decimal('100.00'), stock=10)
+        self.brush = Product.objects.create(name='Brush', description='Bamboo brush', price=Decimal('250.00'), stock=10)
+
+    def get(self, url, **headers):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, **headers)
+        return response, len(context.captured_queries)
+
+    def test_cached_responses_skip_the_database(self):
+        """
+        Test that repeated list and detail requests are served without queries.
+        """
+        for url in ('/products/', f'/products/{self.soap.id}/'):
+            first, first_queries = self.get(url)
+            second, second_queries = self.get(url)
+            self.assertGreater(first_queries, 0)
+            self.assertEqual(second_queries, 0)
+            self.assertEqual(second.status_code, 200)
+            self.assertEqual(second.content, first.content)
+            self.assertEqual(second['Content-Type'], 'application/json')
+            self.assertEqual(second['ETag'], first['ETag'])
+
+            not_modified, queries = self.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual((not_modified.status_code, queries), (304, 0))
+
+    def test_etag_changes_with_the_catalog(self):
+        """
+        Test that the catalog ETag changes on updates and deletes and depends on the page.
+        """
+        etag = self.client.get('/products/')['ETag']
+        self.assertEqual(self.client.get('/products/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertNotEqual(self.client.get('/products/?page_size=1')['ETag'], etag)
+
+        self.soap.price = Decimal('120.00')
+        self.soap.save()
+        response = self.client.get('/products/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response['ETag']
+        Product.objects.filter(pk=self.soap.pk).delete()
+        self.assertEqual(self.client.get('/products/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_product_changes_invalidate(self):
+        """
+        Test that saving or deleting a product replaces the cached responses.
+        """
+        self.client.get('/products/')
+        self.client.get(f'/products/{self.soap.id}/')
+
+        self.soap.price = Decimal('120.00')
+        self.soap.save()
+        self.assertEqual(self.client.get(f'/products/{self.soap.id}/').json()['price'], '120.00')
+        self.assertEqual(
+            [product['price'] for product in self.client.get('/products/').json()['results']],
+            ['250.00', '120.00']
+        )
+
+        self.soap.delete()
+        self.assertEqual(self.client.get(f'/products/{self.soap.id}/').status_code, 404)
+        self.assertEqual(len(self.client.get('/products/').json()['results']), 1)
+
+    def test_pages_are_cached_separately(self):
+        """
+        Test that each page of the list has its own cached response.
+        """
+        first_page = self.client.get('/products/?page_size=1').json()
+        second_page = self.client.get(first_page['next']).json()
+        self.assertEqual([product['name'] for product in first_page['results']], ['Brush'])
+        self.assertEqual([product['name'] for product in second_page['results']], ['Soap'])
+        self.assertEqual(self.client.get('/products/?page_size=1').json(), first_page)
+
+    def test_browsable_api_is_not_cached(self):
+        """
+        Test that HTML requests still get the browsable API.
+        """
+        self.client.get('/products/')
+        response, queries = self.get('/products/', HTTP_ACCEPT='text/html')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('text/html', response['Content-Type'])
+        self.assertGreater(queries, 0)
+
+
+class ProductSearchTests(TestCase):
+    """
+    Tests for the product list search and filters.
+    """
+
+    def setUp(self):
+        """
+        Set up test data.
+        """
+        cache.clear()
+        self.client = Client()
+        Product.objects.all().delete()
+        Product.objects.bulk_create([
+            Product(name='Bamboo Toothbrush', description='Biodegradable handle', price=Decimal('12.99'), stock=10),
+            Product(name='Cotton Bag', description='Reusable bag, bamboo handles', price=Decimal('15.50'), stock=0),
+            Product(name='Bamboo Cutlery', description='Bamboo fork, knife and bamboo spoon', price=Decimal('14.50'), stock=5),
+            Product(name='Solar Lamp', description='Garden lamp', price=Decimal('34.99'), stock=3),
+        ])
+
+    def names(self, query):
+        response = self.client.get(f'/products/?{query}')
+        self.assertEqual(response.status_code, 200)
+        return [product['name'] for product in response.json()['results']]
+
+    def test_search_is_ranked(self):
+        """
+        Test that search matches name and description and ranks the best matches first.
+        """
+        self.assertEqual(self.names('q=bamboo'), ['Bamboo Cutlery', 'Bamboo Toothbrush', 'Cotton Bag'])
+        self.assertEqual(self.names('q=bamb+handle'), ['Bamboo Toothbrush', 'Cotton Bag'])
+        self.assertEqual(self.names('q=lamp+%22OR%22'), [])
+        self.assertEqual(self.names('q=%22%2A'), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        """
+        Test that the index is kept in sync, including queryset updates and deletes.
+        """
+        Product.objects.filter(name='Solar Lamp').update(description='Bamboo garden lamp')
+        self.assertIn('Solar Lamp', self.names('q=bamboo'))
+        Product.objects.filter(name='Bamboo Cutlery').delete()
+        self.assertNotIn('Bamboo Cutlery', self.names('q=bamboo'))
+
+    def test_filters(self):
+        """
+        Test the price and availability filters, alone and combined with search.
+        """
+        self.assertEqual(self.names('min_price=14.50&max_price=15.50'), ['Bamboo Cutlery', 'Cotton Bag'])
+        self.assertEqual(self.names('available=false'), ['Cotton Bag'])
+        self.assertEqual(self.names('q=bamboo&available=true&max_price=14'), ['Bamboo Toothbrush'])
+        response = self.client.get('/products/?min_price=20&max_price=10')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('max_price', response.json())
+
+    def test_search_results_are_paginated(self):
+        """
+        Test that the cursor pagination walks the ranked results.
+        """
+        page = self.client.get('/products/?q=bamboo&page_size=2').json()
+        names = [product['name'] for product in page['results']]
+        names += [product['name'] for product in self.client.get(page['next']).json()['results']]
+        self.assertEqual(names, ['Bamboo Cutlery', 'Bamboo Toothbrush', 'Cotton Bag'])
+
+    @skipUnless(connection.vendor == 'postgresql', 'the search vector index only exists on PostgreSQL')
+    def test_search_uses_the_vector_index(self):
+        """
+        Test that PostgreSQL searches through the GIN index of migration 0004 instead of scanning every product.
+        """
+        with connection.cursor() as cursor:
+            # The table is tiny, so a sequential scan would otherwise always win
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = search(Product.objects.all(), 'bamb handle').explain()
+        self.assertIn('product_search_vector_idx', plan)
@@ -1,3 +1,5 @@
+import hashlib
+from asgiref.sync import sync_to_async
 from django.shortcuts import render
 from rest_framework import generics, status
 from rest_framework.permissions import AllowAny
@@ -5,40 +7,98 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiExample
 from .models import Product
-from .serializers import ProductSerializer
+from .serializers import ProductSerializer, ProductFilterSerializer
+from core.async_views import AsyncReadView
+from core.pagination import SearchRankKeysetPagination
+from core.routers import ReplicaReadMixin
+from .catalog import AsyncCatalogCacheMixin, CatalogCacheMixin
+from .search import search
 from .signals import create_base_products_manual
 
 # Create your views here.
 
+def filter_products(queryset, query_params):
+    """
+    Apply the search and filters of the query parameters (see ProductFilterSerializer).
+    """
+    filters = ProductFilterSerializer(data=query_params)
+    filters.is_valid(raise_exception=True)
+    params = filters.validated_data
+    if params.get('q'):
+        queryset = search(queryset, params['q'])
+    if 'min_price' in params:
+        queryset = queryset.filter(price__gte=params['min_price'])
+    if 'max_price' in params:
+        queryset = queryset.filter(price__lte=params['max_price'])
+    if params.get('available') is not None:
+        queryset = queryset.filter(stock__gt=0) if params['available'] else queryset.filter(stock=0)
+    return queryset
+
+
 @extend_schema_view(
-    list=extend_schema(
+    get=extend_schema(
         summary="Listar productos",
-        description="Obtiene la lista completa de productos disponibles en el catálogo",
-        tags=['products']
-    ),
-    retrieve=extend_schema(
-        summary="Obtener producto",
-        description="Obtiene los detalles de un producto específico por su ID",
+        description=(
+            "Obtiene los productos del catálogo. Con `q` busca por nombre y descripción "
+            "(ordenados por relevancia) y se puede filtrar por precio y disponibilidad."
+        ),
+        parameters=[ProductFilterSerializer],
         tags=['products']
     )
 )
-class ProductListView(generics.ListAPIView):
+class ProductListView(ReplicaReadMixin, CatalogCacheMixin, generics.ListAPIView):
     """
-    List all products.
+    List products, paginated with a cursor (newest first, or best match first when searching).
+    Pages are served from the catalog cache (products.catalog).
     """
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [AllowAny]
+    pagination_class = SearchRankKeysetPagination
+
+    def get_queryset(self):
+        """Apply the search and filters of the query parameters."""
+        return filter_products(super().get_queryset(), self.request.query_params)
+
+    def get_catalog_key(self, request, *args, **kwargs):
+        # Pagination links are absolute, so the host is part of the page
+        uri = request.build_absolute_uri()
+        return f'list:{hashlib.sha1(uri.encode()).hexdigest()}'
+
+
+class AsyncProductListView(ReplicaReadMixin, AsyncCatalogCacheMixin, AsyncReadView):
+    """
+    Async variant of ProductListView for ASGI deployments (core.asgi_urls),
+    sharing its catalog cache entries.
+    """
+    sync_view = ProductListView
+    get_catalog_key = ProductListView.get_catalog_key
+
+    async def get_data(self, request):
+        queryset = filter_products(Product.objects.all(), request.GET)
+        return await sync_to_async(self.paginate)(
+            request, queryset, SearchRankKeysetPagination, ProductSerializer
+        )
 
 
-class ProductDetailView(generics.RetrieveAPIView):
+@extend_schema_view(
+    get=extend_schema(
+        summary="Obtener producto",
+        description="Obtiene los detalles de un producto específico por su ID",
+        tags=['products']
+    )
+)
+class ProductDetailView(ReplicaReadMixin, CatalogCacheMixin, generics.RetrieveAPIView):
     """
-    Retrieve a specific product by ID.
+    Retrieve a specific product by ID, served from the catalog cache (products.catalog).
     """
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [AllowAny]
 
+    def get_catalog_key(self, request, pk):
+        return f'detail:{pk}'
+
 
 @extend_schema(
     summary="Verificar productos base",
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PromotionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'promotions'
+
+    def ready(self):
+        """Import signals when app is ready."""
+        import promotions.signals
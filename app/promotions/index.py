@@ -0,0 +1,93 @@
+"""
+Process-wide interval index over special date promotions.
+
+All promotion start/end boundaries are kept in a sorted list; each slot between
+two consecutive boundaries stores the promotions active during that slot.
+Answering "which promotions are active on date D" is a binary search, with no
+database access once the index is loaded. Each lookup checks the shared
+promotions version, so a change made in any process reloads the index.
+"""
+from bisect import bisect_right
+from datetime import timedelta
+from threading import Lock
+
+from django.db import DEFAULT_DB_ALIAS
+
+from .models import SpecialDatePromotion
+from .utils import promotions_version
+
+
+class PromotionIndex:
+    """
+    Sorted-boundaries index answering active/best promotion queries by date.
+    Loaded lazily on first use and rebuilt after invalidate() is called or
+    once the promotions version differs from the one it was loaded at.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._version = None
+        self._boundaries = None
+        self._active = None
+        self._best = None
+
+    def invalidate(self):
+        """
+        Drop the loaded data so the next lookup reloads it from the database.
+        """
+        with self._lock:
+            self._boundaries = None
+            self._active = None
+            self._best = None
+
+    def _load(self):
+        """
+        Build the boundaries and the per-slot active and best promotions.
+        """
+        # Shared by every request, so never built from a replica that may lag behind
+        promotions = list(SpecialDatePromotion.objects.using(DEFAULT_DB_ALIAS))
+        boundaries = sorted(
+            {promo.start_date for promo in promotions}
+            | {promo.end_date + timedelta(days=1) for promo in promotions}
+        )
+        active = [[] for _ in boundaries]
+        # Promotions are loaded in the model ordering, which each slot preserves
+        for promo in promotions:
+            first = bisect_right(boundaries, promo.start_date) - 1
+            last = bisect_right(boundaries, promo.end_date) - 1
+            for slot in range(first, last + 1):
+                active[slot].append(promo)
+        active = [tuple(slot) for slot in active]
+        best = [
+            max(slot, key=lambda promo: promo.discount_amount) if slot else None
+            for slot in active
+        ]
+        return boundaries, active, best
+
+    def _get_slots(self):
+        # Read before loading, so a change made during the load triggers another one
+        version = promotions_version.get()
+        with self._lock:
+            if self._boundaries is None or self._version != version:
+                self._boundaries, self._active, self._best = self._load()
+                self._version = version
+            return self._boundaries, self._active, self._best
+
+    def active_on(self, target_date):
+        """
+        Return a tuple with all promotions active on target_date.
+        """
+        boundaries, active, _ = self._get_slots()
+        slot = bisect_right(boundaries, target_date) - 1
+        return active[slot] if slot >= 0 else ()
+
+    def best_on(self, target_date):
+        """
+        Return the promotion with the biggest discount active on target_date, or None.
+        """
+        boundaries, _, best = self._get_slots()
+        slot = bisect_right(boundaries, target_date) - 1
+        return best[slot] if slot >= 0 else None
+
+
+promotion_index = PromotionIndex()
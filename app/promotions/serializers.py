@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from core.timing import TimedSerializerMixin
 from .models import SpecialDatePromotion
 
 
-class SpecialDatePromotionSerializer(serializers.ModelSerializer):
+class SpecialDatePromotionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for SpecialDatePromotion model.
     """
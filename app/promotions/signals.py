@@ -0,0 +1,23 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.versions import invalidate_on_commit
+from .index import promotion_index
+from .models import SpecialDatePromotion
+from .utils import promotions_version
+
+
+def invalidate_promotions():
+    """
+    Invalidate the promotion index and everything keyed by the promotions version.
+    """
+    promotions_version.bump()
+    promotion_index.invalidate()
+
+
+@receiver(post_save, sender=SpecialDatePromotion)
+@receiver(post_delete, sender=SpecialDatePromotion)
+def handle_promotion_change(sender, instance, **kwargs):
+    """
+    Invalidate everything derived from the promotion set when a promotion changes.
+    """
+    invalidate_on_commit(invalidate_promotions)
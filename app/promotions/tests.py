@@ -1,7 +1,10 @@
+from django.core.cache import cache
 from django.test import TestCase, Client
 from django.urls import reverse
 from datetime import date
+from .index import promotion_index
 from .models import SpecialDatePromotion
+from .utils import PROMOTIONS_VERSION_KEY
 
 
 class SpecialDatePromotionTests(TestCase):
@@ -93,6 +96,25 @@ class SpecialDatePromotionTests(TestCase):
         data = response.json()
         self.assertEqual(len(data['promotions']), 0)
 
+    def test_promotion_list_etag(self):
+        """
+        Test that the promotions ETag is revalidated with 304 until a promotion is saved.
+        """
+        cache.clear()
+        response = self.client.get('/promotions/special-dates/')
+        etag = response['ETag']
+        self.assertIn('no-cache', response['Cache-Control'])
+        response = self.client.get('/promotions/special-dates/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response.content), (304, b''))
+
+        SpecialDatePromotion.objects.create(
+            start_date=date(2025, 1, 1),
+            end_date=date(2025, 12, 31),
+            description='All year',
+            discount_amount=300
+        )
+        self.assertEqual(self.client.get('/promotions/special-dates/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
     def test_promotion_model_methods(self):
         """
         Test the is_active_on_date method of the model.
@@ -109,3 +131,72 @@ class SpecialDatePromotionTests(TestCase):
         # Test outside range
         self.assertFalse(self.promotion_june.is_active_on_date(date(2025, 7, 1)))
         self.assertFalse(self.promotion_june.is_active_on_date(date(2025, 5, 31)))
+
+
+class PromotionIndexTests(TestCase):
+    """
+    Tests for the in-memory promotion interval index.
+    """
+
+    def setUp(self):
+        """
+        Set up overlapping promotions.
+        """
+        self.year = SpecialDatePromotion.objects.create(
+            start_date=date(2025, 1, 1),
+            end_date=date(2025, 12, 31),
+            description='Mega descuento 2025',
+            discount_amount=300
+        )
+        self.week = SpecialDatePromotion.objects.create(
+            start_date=date(2025, 6, 10),
+            end_date=date(2025, 6, 16),
+            description='Semana especial',
+            discount_amount=500
+        )
+
+    def test_active_and_best_promotions(self):
+        """
+        Test lookups inside, on the edges of and outside overlapping promotions.
+        """
+        self.assertEqual(promotion_index.active_on(date(2025, 6, 10)), (self.week, self.year))
+        self.assertEqual(promotion_index.best_on(date(2025, 6, 16)), self.week)
+        self.assertEqual(promotion_index.best_on(date(2025, 6, 17)), self.year)
+        self.assertEqual(promotion_index.active_on(date(2024, 12, 31)), ())
+        self.assertIsNone(promotion_index.best_on(date(2026, 1, 1)))
+
+    def test_lookups_do_not_query_once_loaded(self):
+        """
+        Test that the index only hits the database when it is (re)loaded.
+        """
+        promotion_index.active_on(date(2025, 3, 1))
+        with self.assertNumQueries(0):
+            promotion_index.active_on(date(2025, 6, 12))
+            promotion_index.best_on(date(2025, 9, 1))
+
+    def test_index_is_rebuilt_on_changes(self):
+        """
+        Test that saving and deleting promotions is reflected in the index.
+        """
+        self.assertEqual(promotion_index.best_on(date(2025, 3, 1)), self.year)
+        self.year.end_date = date(2025, 2, 28)
+        self.year.save()
+        self.assertIsNone(promotion_index.best_on(date(2025, 3, 1)))
+        self.week.delete()
+        self.assertEqual(promotion_index.active_on(date(2025, 6, 12)), ())
+
+    def test_index_follows_changes_made_by_other_processes(self):
+        """
+        Test that the index reloads once another process bumps the shared promotions version.
+        """
+        self.assertEqual(promotion_index.best_on(date(2025, 3, 1)), self.year)
+        # bulk_create sends no signals, as if the promotion was saved by another process
+        flash, = SpecialDatePromotion.objects.bulk_create([SpecialDatePromotion(
+            start_date=date(2025, 3, 1),
+            end_date=date(2025, 3, 2),
+            description='Venta flash',
+            discount_amount=800
+        )])
+        self.assertEqual(promotion_index.best_on(date(2025, 3, 1)), self.year)
+        cache.incr(PROMOTIONS_VERSION_KEY)
+        self.assertEqual(promotion_index.best_on(date(2025, 3, 1)), flash)
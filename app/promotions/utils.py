@@ -1,5 +1,7 @@
 from datetime import date
 
+from core.versions import CacheVersion
+
 
 def get_effective_date(request):
     """
@@ -8,4 +10,10 @@ def get_effective_date(request):
     """
     if hasattr(request, 'simulated_date'):
         return request.simulated_date
-    return date.today() 
\ No newline at end of file
+    return date.today()
+
+
+PROMOTIONS_VERSION_KEY = 'promotions:version'
+
+# Version of the promotion set, bumped every time a SpecialDatePromotion is saved or deleted
+promotions_version = CacheVersion(PROMOTIONS_VERSION_KEY)
@@ -1,14 +1,25 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render
 from rest_framework import generics
 from rest_framework.permissions import AllowAny
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
-from .models import SpecialDatePromotion
+from .index import promotion_index
 from .serializers import SpecialDatePromotionSerializer
-from .utils import get_effective_date
+from .utils import get_effective_date, promotions_version
+from core.async_views import AsyncReadView
+from core.conditional import conditional_get, version_etag
+from core.routers import ReplicaReadMixin
 
 # Create your views here.
 
+def promotion_list_etag(request, *args, **kwargs):
+    """
+    ETag of the promotions active on the effective date.
+    """
+    return version_etag(promotions_version.get(), get_effective_date(request))
+
+
 @extend_schema(
     summary="Promociones por fecha",
     description="Obtiene las promociones activas para una fecha específica. Permite simular fechas para pruebas.",
@@ -23,7 +34,8 @@ from .utils import get_effective_date
     ],
     tags=['promotions']
 )
-class SpecialDatePromotionListView(generics.ListAPIView):
+@conditional_get(promotion_list_etag)
+class SpecialDatePromotionListView(ReplicaReadMixin, generics.ListAPIView):
     """
     List active promotions for the effective date.
     """
@@ -32,13 +44,10 @@ class SpecialDatePromotionListView(generics.ListAPIView):
 
     def get_queryset(self):
         """
-        Filter promotions that are active on the effective date.
+        Get promotions that are active on the effective date from the promotion index.
         """
         effective_date = get_effective_date(self.request)
-        return SpecialDatePromotion.objects.filter(
-            start_date__lte=effective_date,
-            end_date__gte=effective_date
-        )
+        return list(promotion_index.active_on(effective_date))
 
     def list(self, request, *args, **kwargs):
         """
@@ -51,3 +60,22 @@ class SpecialDatePromotionListView(generics.ListAPIView):
             'promotions': response.data
         }
         return response
+
+
+class AsyncSpecialDatePromotionListView(ReplicaReadMixin, AsyncReadView):
+    """
+    Async variant of SpecialDatePromotionListView for ASGI deployments (core.asgi_urls).
+    """
+    sync_view = SpecialDatePromotionListView
+
+    async def get_etag(self, request):
+        return version_etag(await promotions_version.aget(), get_effective_date(request))
+
+    async def get_data(self, request):
+        effective_date = get_effective_date(request)
+        # The index loads the promotions from the database on its first use
+        promotions = await sync_to_async(promotion_index.active_on)(effective_date)
+        return {
+            'effective_date': effective_date.isoformat(),
+            'promotions': SpecialDatePromotionSerializer(promotions, many=True).data,
+        }
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class SessionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'session'
+
+    def ready(self):
+        """
+        Import and register signals and checks when the app is ready.
+        """
+        import session.checks
+        import session.signals
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+LOCAL_CACHE_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Warn when the cache that invalidates sessions and user snapshots is local to each process.
+    """
+    if settings.CACHES['default']['BACKEND'] != LOCAL_CACHE_BACKEND:
+        return []
+    return [Warning(
+        'The default cache is local to each process, so changes to a user are not seen '
+        'by the sessions and user snapshots cached in other worker processes.',
+        hint='Set CACHE_BACKEND and CACHE_LOCATION to a cache shared by every process, e.g. Redis.',
+        id='session.W001',
+    )]
@@ -0,0 +1,31 @@
+from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.models import UserProfile
+from .snapshot import invalidate_snapshots, store_snapshot
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_snapshot(sender, instance, **kwargs):
+    """
+    Reload the session snapshots of a user that changed.
+    """
+    invalidate_snapshots([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=UserProfile)
+def invalidate_profile_snapshot(sender, instance, **kwargs):
+    """
+    Reload the session snapshots of a user whose VIP profile changed.
+    """
+    invalidate_snapshots([instance.user_id])
+
+
+@receiver(user_logged_in)
+def store_login_snapshot(sender, request, user, **kwargs):
+    """
+    Snapshot the user on login, so even the first request needs no auth queries.
+    """
+    store_snapshot(request.session, user)
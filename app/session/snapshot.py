@@ -0,0 +1,152 @@
+"""
+User snapshots kept in the session.
+
+Authenticating a request normally costs a query for the user and, later, one
+for user.profile. Instead, the session keeps a compact snapshot of the user
+and of its VIP profile, tagged with a version that is also stored in the
+cache. While both versions match, request.user is rebuilt from the snapshot
+without any query (see SnapshotAuthenticationMiddleware).
+
+Saving or deleting a User or UserProfile replaces the cached version
+(session.signals), so every session of that user reloads it on its next
+request, and a version missing from the cache counts as changed. Snapshots are
+also reloaded after SESSION_USER_SNAPSHOT_TTL seconds. Invalidation only
+reaches the processes sharing the cache, hence the session.W001 deploy check.
+"""
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.crypto import constant_time_compare
+
+from users.models import UserProfile
+
+
+SNAPSHOT_SESSION_KEY = '_auth_user_snapshot'
+USER_FIELDS = ('id', 'username', 'email', 'first_name', 'last_name', 'is_active', 'is_staff', 'is_superuser')
+PROFILE_FIELDS = ('id', 'user', 'is_vip', 'vip_since', 'vip_until')
+
+
+def version_key(user_id):
+    return f'auth:snapshot:{user_id}'
+
+
+def invalidate_snapshots(user_ids):
+    """
+    Make the session snapshots of the given users stale.
+    """
+    cache.set_many(
+        {version_key(user_id): uuid.uuid4().hex for user_id in user_ids},
+        settings.SESSION_USER_SNAPSHOT_TTL
+    )
+
+
+def dump(instance, field_names):
+    data = {}
+    for name in field_names:
+        field = instance._meta.get_field(name)
+        value = field.value_from_object(instance)
+        if value is not None and not isinstance(value, (bool, int, str)):
+            value = field.value_to_string(instance)
+        data[field.attname] = value
+    return data
+
+
+def load(model, data):
+    """
+    Rebuild a model instance from dump(); the fields left out are deferred.
+    """
+    # from_db() takes the values in the order of the model fields
+    fields = [field for field in model._meta.concrete_fields if field.attname in data]
+    values = [None if data[field.attname] is None else field.to_python(data[field.attname]) for field in fields]
+    return model.from_db(DEFAULT_DB_ALIAS, [field.attname for field in fields], values)
+
+
+def build_snapshot(user, version):
+    """
+    Snapshot user and its profile. The session auth hash ties the snapshot to
+    the password the session was authenticated with.
+    """
+    try:
+        profile = user.profile
+    except UserProfile.DoesNotExist:
+        profile = None
+    return {
+        'version': version,
+        'created_at': time.time(),
+        'session_hash': user.get_session_auth_hash(),
+        'user': dump(user, USER_FIELDS),
+        'profile': dump(profile, PROFILE_FIELDS) if profile is not None else None,
+    }
+
+
+def user_from_snapshot(snapshot):
+    """
+    The user of snapshot with its profile attached, so user.profile needs no query.
+    They are meant for reading: saving them would write the snapshot values back.
+    """
+    user = load(User, snapshot['user'])
+    if snapshot['profile'] is None:
+        User._meta.get_field('profile').set_cached_value(user, None)
+    else:
+        load(UserProfile, snapshot['profile']).user = user
+    return user
+
+
+def get_version(user_id):
+    """
+    Get the cached snapshot version of a user, starting a new one if there is none.
+    """
+    key = version_key(user_id)
+    version = uuid.uuid4().hex
+    cache.add(key, version, settings.SESSION_USER_SNAPSHOT_TTL)
+    return cache.get(key, version)
+
+
+def is_current(session, snapshot):
+    """
+    Whether snapshot still stands for the session's user. A version missing
+    from the cache (evicted, cleared or never set in this cache) is not
+    current: whatever invalidated it may have been lost with it.
+    """
+    return (
+        str(snapshot['user']['id']) == str(session.get(SESSION_KEY))
+        and session.get(BACKEND_SESSION_KEY) in settings.AUTHENTICATION_BACKENDS
+        and constant_time_compare(snapshot.get('session_hash', ''), session.get(HASH_SESSION_KEY, ''))
+        and time.time() - snapshot['created_at'] < settings.SESSION_USER_SNAPSHOT_TTL
+        and cache.get(version_key(snapshot['user']['id'])) == snapshot['version']
+    )
+
+
+def get_user(request):
+    """
+    Return the user of the request's session, from its snapshot when it is current.
+    Otherwise load it with django.contrib.auth.get_user(), which also verifies the
+    session auth hash against the password, and store a new snapshot.
+    """
+    session = request.session
+    snapshot = session.get(SNAPSHOT_SESSION_KEY)
+    if snapshot is not None and is_current(session, snapshot):
+        return user_from_snapshot(snapshot)
+
+    # The version is read before the user, so a change made meanwhile makes the snapshot stale
+    user_id = session.get(SESSION_KEY)
+    version = get_version(user_id) if user_id is not None else None
+    user = auth.get_user(request)
+    if user.is_authenticated and str(user.pk) == str(user_id):
+        session[SNAPSHOT_SESSION_KEY] = build_snapshot(user, version)
+    elif SNAPSHOT_SESSION_KEY in session:
+        del session[SNAPSHOT_SESSION_KEY]
+    return user
+
+
+def store_snapshot(session, user):
+    """
+    Keep a snapshot of user in session, tagged with the current cached version.
+    """
+    session[SNAPSHOT_SESSION_KEY] = build_snapshot(user, get_version(user.pk))
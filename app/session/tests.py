@@ -1,3 +1,149 @@
-from django.test import TestCase
+from io import StringIO
+from django.contrib.auth import HASH_SESSION_KEY
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from users.models import UserProfile
+from .checks import check_shared_cache
+from .snapshot import SNAPSHOT_SESSION_KEY, version_key
 
-# Create your tests here.
+
+class SessionSnapshotTests(TestCase):
+    """
+    Tests for the user snapshot kept in the session.
+    """
+
+    def setUp(self):
+        """
+        Set up test data.
+        """
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='shopper', password='testpassword123')
+        self.client.force_login(self.user)
+
+    def vip_status(self):
+        response = self.client.get('/api/users/vip_status/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['is_vip']
+
+    def test_authenticated_requests_need_no_auth_queries(self):
+        """
+        Test that the current user and its VIP status are served without queries.
+        """
+        with self.assertNumQueries(0):
+            response = self.client.get('/session/me/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['user']['username'], 'shopper')
+        self.assertFalse(response.json()['user']['profile']['is_vip'])
+        with self.assertNumQueries(0):
+            self.assertFalse(self.vip_status())
+
+    def test_login_stores_snapshot(self):
+        """
+        Test that logging in through the endpoint stores the snapshot in the session.
+        """
+        client = Client()
+        response = client.post(
+            '/session/login/', {'username': 'shopper', 'password': 'testpassword123'},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(client.session[SNAPSHOT_SESSION_KEY]['user']['username'], 'shopper')
+        with self.assertNumQueries(0):
+            self.assertEqual(client.get('/session/me/').status_code, 200)
+
+    def test_profile_change_invalidates_snapshot(self):
+        """
+        Test that saving the profile is seen by the next request, which stores a new snapshot.
+        """
+        self.assertFalse(self.vip_status())
+        profile = UserProfile.objects.get(user=self.user)
+        profile.is_vip = True
+        profile.save()
+
+        self.assertTrue(self.vip_status())
+        with self.assertNumQueries(0):
+            self.assertTrue(self.vip_status())
+
+    def test_recompute_vip_invalidates_snapshot(self):
+        """
+        Test that the bulk updates of recompute_vip invalidate the snapshots of the users changed.
+        """
+        profile = UserProfile.objects.get(user=self.user)
+        profile.is_vip = True
+        profile.save()
+        self.assertTrue(self.vip_status())
+
+        call_command('recompute_vip', '--year', '2025', '--month', '12', stdout=StringIO())
+        self.assertFalse(self.vip_status())
+
+    def test_deactivated_user_is_logged_out(self):
+        """
+        Test that a user deactivated after logging in loses access on the next request.
+        """
+        self.assertEqual(self.client.get('/carts/').status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/carts/').status_code, 403)
+        self.assertNotIn(SNAPSHOT_SESSION_KEY, self.client.session)
+
+    @override_settings(SESSION_USER_SNAPSHOT_TTL=0)
+    def test_expired_snapshot_is_reloaded(self):
+        """
+        Test that a snapshot older than SESSION_USER_SNAPSHOT_TTL is reloaded from the database.
+        """
+        UserProfile.objects.filter(user=self.user).update(is_vip=True)
+        self.assertTrue(self.vip_status())
+
+    def test_logout_discards_snapshot(self):
+        """
+        Test that logging out removes the snapshot with the rest of the session.
+        """
+        self.assertEqual(self.client.post('/session/logout/').status_code, 200)
+        self.assertNotIn(SNAPSHOT_SESSION_KEY, self.client.session)
+        self.assertEqual(self.client.get('/carts/').status_code, 403)
+
+    def test_missing_version_reloads_snapshot(self):
+        """
+        Test that a snapshot whose version left the cache is reloaded, not trusted.
+        """
+        self.assertFalse(self.vip_status())
+        # Bulk updates send no signals, so only the lost version can reveal them
+        UserProfile.objects.filter(user=self.user).update(is_vip=True)
+        cache.delete(version_key(self.user.id))
+        self.assertTrue(self.vip_status())
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        cache.clear()
+        self.assertEqual(self.client.get('/session/me/').status_code, 403)
+
+    def test_session_auth_hash_is_verified(self):
+        """
+        Test that a snapshot is not used for a session authenticated with another password.
+        """
+        self.assertEqual(self.client.get('/session/me/').status_code, 200)
+        session = self.client.session
+        session[HASH_SESSION_KEY] = 'stale-hash'
+        session.save()
+        self.assertEqual(self.client.get('/session/me/').status_code, 403)
+
+    def test_password_change_logs_out_other_sessions(self):
+        """
+        Test that changing the password ends the other sessions of the user right away.
+        """
+        self.assertEqual(self.client.get('/session/me/').status_code, 200)
+        self.user.set_password('newpassword456')
+        self.user.save()
+        self.assertEqual(self.client.get('/session/me/').status_code, 403)
+
+    def test_local_cache_check(self):
+        """
+        Test that the deploy check warns about a cache local to each process.
+        """
+        self.assertEqual([warning.id for warning in check_shared_cache(None)], ['session.W001'])
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                              'LOCATION': 'redis://127.0.0.1:6379/0'}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(check_shared_cache(None), [])
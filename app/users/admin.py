@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
-from .models import UserProfile
+from .models import UserProfile, VipStatusEvent
 
 
 class UserProfileInline(admin.StackedInline):
@@ -56,6 +56,23 @@ class UserProfileAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(VipStatusEvent)
+class VipStatusEventAdmin(admin.ModelAdmin):
+    """
+    Read-only admin interface for the VIP status event log.
+    """
+    list_display = ('user', 'kind', 'changed_at', 'created_at')
+    list_filter = ('kind', 'changed_at')
+    search_fields = ('user__username',)
+    date_hierarchy = 'changed_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 # Re-register UserAdmin
 admin.site.unregister(User)
 admin.site.register(User, UserAdmin)
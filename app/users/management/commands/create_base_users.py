@@ -2,7 +2,7 @@ from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
 from django.db import transaction
 from django.utils import timezone
-from users.models import UserProfile
+from users.models import UserProfile, VipStatusEvent
 
 class Command(BaseCommand):
     help = 'Ensures there are at least 10 base users for login testing.'
@@ -47,6 +47,7 @@ class Command(BaseCommand):
                 last_name='User'
             )
             UserProfile.objects.filter(user=user).update(is_vip=True, vip_since=now, vip_until=None)
+            VipStatusEvent.objects.create(user=user, kind=VipStatusEvent.GRANTED, changed_at=now)
         # Add 2 ex-VIP users
         old_date = now.replace(year=now.year - 1)
         for i in range(1, 3):
@@ -59,4 +60,8 @@ class Command(BaseCommand):
                 last_name='User'
             )
             UserProfile.objects.filter(user=user).update(is_vip=False, vip_since=old_date, vip_until=old_date)
+            VipStatusEvent.objects.bulk_create([
+                VipStatusEvent(user=user, kind=VipStatusEvent.GRANTED, changed_at=old_date),
+                VipStatusEvent(user=user, kind=VipStatusEvent.REVOKED, changed_at=old_date),
+            ])
         self.stdout.write(self.style.SUCCESS('Added 2 active VIP users and 2 ex-VIP users.')) 
\ No newline at end of file
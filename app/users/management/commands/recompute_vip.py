@@ -0,0 +1,89 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from orders.models import UserMonthlySpend, VIP_MONTHLY_SPEND
+from session.snapshot import invalidate_snapshots
+from users.models import UserProfile, VipStatusEvent
+
+
+class Command(BaseCommand):
+    """
+    Apply the monthly VIP rules to every user at once.
+    """
+    help = 'Grant VIP to users who spent enough in a month and revoke it from VIP users who bought nothing'
+
+    def add_arguments(self, parser):
+        now = timezone.localtime()
+        parser.add_argument('--year', type=int, default=now.year, help='Year to evaluate (default: current)')
+        parser.add_argument('--month', type=int, default=now.month, help='Month to evaluate (default: current)')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show how many users would change without changing them',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Number of profiles updated per statement',
+        )
+
+    def handle(self, *args, **options):
+        """Execute the command."""
+        year, month = options['year'], options['month']
+        if not 1 <= month <= 12:
+            raise CommandError('--month must be between 1 and 12.')
+        # Changes take effect on the first day of the next month, as at checkout
+        effective = timezone.make_aware(datetime(year + month // 12, month % 12 + 1, 1))
+
+        # The monthly spend ledger already holds one aggregated row per user and month
+        month_spend = UserMonthlySpend.objects.filter(year=year, month=month)
+        to_grant = list(UserProfile.objects.filter(
+            is_vip=False,
+            user__monthly_spend__year=year,
+            user__monthly_spend__month=month,
+            user__monthly_spend__total__gte=VIP_MONTHLY_SPEND,
+        ).values_list('pk', flat=True))
+        to_revoke = list(UserProfile.objects.filter(is_vip=True).exclude(
+            Exists(month_spend.filter(user_id=OuterRef('user_id'), order_count__gt=0))
+        ).values_list('pk', flat=True))
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(
+                f'DRY RUN: Would grant VIP to {len(to_grant)} users and revoke it from {len(to_revoke)} users '
+                f'for {year}-{month:02d}'
+            ))
+            return
+
+        now = timezone.now()
+        granted = self.update_in_chunks(
+            to_grant, options['chunk_size'], VipStatusEvent.GRANTED, effective,
+            is_vip=True, vip_since=effective, vip_until=None, updated_at=now
+        )
+        revoked = self.update_in_chunks(
+            to_revoke, options['chunk_size'], VipStatusEvent.REVOKED, effective,
+            is_vip=False, vip_until=effective, updated_at=now
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully granted VIP to {granted} users and revoked it from {revoked} users for {year}-{month:02d}'
+        ))
+
+    def update_in_chunks(self, profile_ids, chunk_size, kind, changed_at, **values):
+        """
+        Set values on the given profiles and log a VipStatusEvent of kind for
+        each of them, one short transaction per chunk.
+        """
+        updated = 0
+        for start in range(0, len(profile_ids), chunk_size):
+            profiles = UserProfile.objects.filter(pk__in=profile_ids[start:start + chunk_size])
+            with transaction.atomic():
+                user_ids = list(profiles.values_list('user_id', flat=True))
+                VipStatusEvent.objects.bulk_create([
+                    VipStatusEvent(user_id=user_id, kind=kind, changed_at=changed_at) for user_id in user_ids
+                ])
+                updated += profiles.update(**values)
+            # Bulk updates send no signals, so the session snapshots are refreshed here
+            invalidate_snapshots(user_ids)
+        return updated
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_events(apps, schema_editor):
+    # Rebuild the last known transitions from the profile dates
+    UserProfile = apps.get_model('users', 'UserProfile')
+    VipStatusEvent = apps.get_model('users', 'VipStatusEvent')
+    events = []
+    for user_id, vip_since, vip_until in UserProfile.objects.values_list('user_id', 'vip_since', 'vip_until').iterator():
+        if vip_since:
+            events.append(VipStatusEvent(user_id=user_id, kind='GRANTED', changed_at=vip_since))
+        if vip_until:
+            events.append(VipStatusEvent(user_id=user_id, kind='REVOKED', changed_at=vip_until))
+    VipStatusEvent.objects.bulk_create(events, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VipStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('GRANTED', 'Granted'), ('REVOKED', 'Revoked')], max_length=10)),
+                ('changed_at', models.DateTimeField(help_text='When the change takes effect')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vip_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'VIP Status Event',
+                'verbose_name_plural': 'VIP Status Events',
+                'ordering': ['changed_at', 'id'],
+                'indexes': [models.Index(fields=['changed_at', 'kind'], name='vip_event_changed_kind_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_events, migrations.RunPython.noop),
+    ]
@@ -25,17 +25,19 @@ class UserProfile(models.Model):
 
     def set_vip_status(self, is_vip, vip_until=None):
         """
-        Set VIP status for the user.
+        Set VIP status for the user, recording the change in the VipStatusEvent log.
         """
         if is_vip and not self.is_vip:
             # User is becoming VIP
             self.is_vip = True
             self.vip_since = timezone.now()
             self.vip_until = vip_until
+            VipStatusEvent.objects.create(user_id=self.user_id, kind=VipStatusEvent.GRANTED, changed_at=self.vip_since)
         elif not is_vip and self.is_vip:
             # User is losing VIP status
             self.is_vip = False
             self.vip_until = timezone.now()
+            VipStatusEvent.objects.create(user_id=self.user_id, kind=VipStatusEvent.REVOKED, changed_at=self.vip_until)
         
         self.save()
 
@@ -53,6 +55,37 @@ class UserProfile(models.Model):
         return True
 
 
+class VipStatusEvent(models.Model):
+    """
+    Append-only log of VIP status changes.
+    UserProfile only keeps the latest vip_since/vip_until, which are
+    overwritten on every transition; this log keeps each one, indexed by
+    (changed_at, kind) so the changes of any month are a single range scan.
+    """
+    GRANTED = 'GRANTED'
+    REVOKED = 'REVOKED'
+    KIND_CHOICES = [
+        (GRANTED, 'Granted'),
+        (REVOKED, 'Revoked'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='vip_events')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    changed_at = models.DateTimeField(help_text='When the change takes effect')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'VIP Status Event'
+        verbose_name_plural = 'VIP Status Events'
+        ordering = ['changed_at', 'id']
+        indexes = [
+            models.Index(fields=['changed_at', 'kind'], name='vip_event_changed_kind_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} {self.get_kind_display().lower()} VIP at {self.changed_at}"
+
+
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     """
@@ -1,3 +1,126 @@
-from django.test import TestCase
+from datetime import datetime
+from decimal import Decimal
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from orders.models import UserMonthlySpend
+from .models import UserProfile, VipStatusEvent
 
-# Create your tests here.
+
+class RecomputeVipCommandTests(TestCase):
+    """
+    Tests for the recompute_vip management command.
+    """
+
+    def setUp(self):
+        """
+        Set up test data.
+        """
+        self.big_spender = User.objects.create_user(username='big', password='testpassword123')
+        self.small_spender = User.objects.create_user(username='small', password='testpassword123')
+        self.idle_vip = User.objects.create_user(username='idle', password='testpassword123')
+        self.active_vip = User.objects.create_user(username='active', password='testpassword123')
+        UserProfile.objects.filter(user__in=[self.idle_vip, self.active_vip]).update(is_vip=True)
+        UserMonthlySpend.objects.bulk_create([
+            UserMonthlySpend(user=self.big_spender, year=2025, month=12, total=Decimal('12000.00'), order_count=3),
+            UserMonthlySpend(user=self.small_spender, year=2025, month=12, total=Decimal('900.00'), order_count=1),
+            UserMonthlySpend(user=self.active_vip, year=2025, month=12, total=Decimal('1500.00'), order_count=1),
+            # Spending in another month does not count
+            UserMonthlySpend(user=self.idle_vip, year=2025, month=11, total=Decimal('20000.00'), order_count=5),
+        ])
+
+    def profile(self, user):
+        return UserProfile.objects.get(user=user)
+
+    def test_grants_and_revokes(self):
+        """
+        Test that big spenders become VIP and VIP users without orders lose it from next month.
+        """
+        out = StringIO()
+        call_command('recompute_vip', '--year', '2025', '--month', '12', '--chunk-size', '1', stdout=out)
+        self.assertIn('granted VIP to 1 users and revoked it from 1 users', out.getvalue())
+
+        next_month = timezone.make_aware(datetime(2026, 1, 1))
+        self.assertTrue(self.profile(self.big_spender).is_vip)
+        self.assertEqual(self.profile(self.big_spender).vip_since, next_month)
+        self.assertFalse(self.profile(self.small_spender).is_vip)
+        self.assertFalse(self.profile(self.idle_vip).is_vip)
+        self.assertEqual(self.profile(self.idle_vip).vip_until, next_month)
+        self.assertTrue(self.profile(self.active_vip).is_vip)
+        self.assertEqual(
+            set(VipStatusEvent.objects.values_list('user__username', 'kind', 'changed_at')),
+            {('big', VipStatusEvent.GRANTED, next_month), ('idle', VipStatusEvent.REVOKED, next_month)}
+        )
+
+    def test_dry_run(self):
+        """
+        Test that --dry-run only reports the changes.
+        """
+        out = StringIO()
+        call_command('recompute_vip', '--year', '2025', '--month', '12', '--dry-run', stdout=out)
+        self.assertIn('Would grant VIP to 1 users and revoke it from 1 users for 2025-12', out.getvalue())
+        self.assertFalse(self.profile(self.big_spender).is_vip)
+        self.assertTrue(self.profile(self.idle_vip).is_vip)
+
+
+class VipChangesTests(TestCase):
+    """
+    Tests for the VIP changes endpoint backed by the VIP status event log.
+    """
+
+    def setUp(self):
+        """
+        Set up test data.
+        """
+        self.client = Client()
+        self.viewer = User.objects.create_user(username='viewer', password='testpassword123')
+        self.client.force_login(self.viewer)
+
+    def add_user(self, username, *events):
+        user = User.objects.create_user(username=username, password='testpassword123')
+        VipStatusEvent.objects.bulk_create([
+            VipStatusEvent(user=user, kind=kind, changed_at=timezone.make_aware(changed_at))
+            for kind, changed_at in events
+        ])
+        return user
+
+    def get_changes(self, month, year):
+        response = self.client.get(f'/api/users/vip_changes/?month={month}&year={year}')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return [user['username'] for user in data['became_vip']], [user['username'] for user in data['lost_vip']]
+
+    def test_changes_of_each_month_are_kept(self):
+        """
+        Test that earlier transitions are still reported after later ones.
+        """
+        self.add_user(
+            'flip',
+            (VipStatusEvent.GRANTED, datetime(2025, 3, 1)),
+            (VipStatusEvent.REVOKED, datetime(2025, 5, 1)),
+            (VipStatusEvent.GRANTED, datetime(2025, 8, 1)),
+        )
+        self.add_user('steady', (VipStatusEvent.GRANTED, datetime(2025, 3, 15)))
+
+        self.assertEqual(self.get_changes(3, 2025), (['flip', 'steady'], []))
+        self.assertEqual(self.get_changes(5, 2025), ([], ['flip']))
+        self.assertEqual(self.get_changes(8, 2025), (['flip'], []))
+        self.assertEqual(self.get_changes(9, 2025), ([], []))
+
+    def test_query_count_does_not_grow_with_users(self):
+        """
+        Test that the endpoint costs the same number of queries for 1 or 5 changed users.
+        """
+        self.add_user('first', (VipStatusEvent.GRANTED, datetime(2025, 6, 2)))
+        with CaptureQueriesContext(connection) as single:
+            self.get_changes(6, 2025)
+        for i in range(4):
+            self.add_user(f'user{i}', (VipStatusEvent.REVOKED, datetime(2025, 6, 10 + i)))
+        with CaptureQueriesContext(connection) as several:
+            became_vip, lost_vip = self.get_changes(6, 2025)
+        self.assertEqual((len(became_vip), len(lost_vip)), (1, 4))
+        self.assertEqual(len(several.captured_queries), len(single.captured_queries))
@@ -7,8 +7,10 @@ from django.utils import timezone
 from datetime import datetime
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
-from .models import UserProfile
+from .models import UserProfile, VipStatusEvent
 from .serializers import UserSerializer, UserProfileSerializer
+from core.pagination import IdKeysetPagination
+from core.routers import ReplicaReadMixin
 
 # Create your views here.
 
@@ -49,18 +51,21 @@ from .serializers import UserSerializer, UserProfileSerializer
         tags=['users']
     )
 )
-class UserViewSet(viewsets.ReadOnlyModelViewSet):
+class UserViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for listing users with VIP status filtering.
+    The list is paginated with a cursor, newest users first.
     """
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    pagination_class = IdKeysetPagination
+    replica_actions = {'list', 'vip_changes'}
 
     def get_queryset(self):
         """
         Filter users based on VIP status if specified.
         """
-        queryset = User.objects.all()
+        queryset = User.objects.select_related('profile')
         vip_status = self.request.query_params.get('vip', None)
         
         if vip_status is not None:
@@ -100,20 +105,19 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Users who became VIP in the specified month
-        became_vip = User.objects.filter(
-            profile__vip_since__gte=start_date,
-            profile__vip_since__lt=end_date
-        )
+        # One range scan over the event log covers both kinds of change
+        events = VipStatusEvent.objects.filter(
+            changed_at__gte=start_date,
+            changed_at__lt=end_date
+        ).select_related('user', 'user__profile')
+        became_vip = {}
+        lost_vip = {}
+        for event in events:
+            changes = became_vip if event.kind == VipStatusEvent.GRANTED else lost_vip
+            changes.setdefault(event.user_id, event.user)
         
-        # Users who lost VIP status in the specified month
-        lost_vip = User.objects.filter(
-            profile__vip_until__gte=start_date,
-            profile__vip_until__lt=end_date
-        )
-        
-        became_vip_data = UserSerializer(became_vip, many=True).data
-        lost_vip_data = UserSerializer(lost_vip, many=True).data
+        became_vip_data = UserSerializer(became_vip.values(), many=True).data
+        lost_vip_data = UserSerializer(lost_vip.values(), many=True).data
         
         return Response({
             'became_vip': became_vip_data,
@@ -127,7 +131,11 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
         """Return VIP status for the authenticated user."""
         if not request.user.is_authenticated:
             return Response({'error': 'Not authenticated'}, status=status.HTTP_401_UNAUTHORIZED)
-        profile, _ = UserProfile.objects.get_or_create(user=request.user)
+        try:
+            # Attached to the user by the session snapshot, usually without a query
+            profile = request.user.profile
+        except UserProfile.DoesNotExist:
+            profile, _ = UserProfile.objects.get_or_create(user=request.user)
         return Response({
             'is_vip': profile.is_vip,
             'vip_since': profile.vip_since,
@@ -1,9 +1,17 @@
 import { api } from './http'
+import { getPage } from './pagination'
 
 export const cartsService = {
-  // Get all carts with optional filters (type, status, fecha)
-  getAll: (params?: Record<string, unknown>) =>
-    api.get('/carts/', { params }).then((res) => res.data),
+  // Get a page of carts with optional filters (type, status, fecha)
+  // (cursor: the next link of the previous page)
+  getPage: (params?: Record<string, unknown>, cursor?: string | null) =>
+    getPage('/carts/', cursor, { params }),
+
+  // Get the newest active cart of a type, or null when there is none
+  getActiveCart: (cart_type: string) =>
+    getPage('/carts/', null, { params: { status: 'ACTIVO', type: cart_type, page_size: 1 } }).then(
+      (page) => page.results[0] ?? null,
+    ),
 
   // Get cart by ID
   getById: (id: string) => api.get(`/carts/${id}/`).then((res) => res.data),
@@ -16,6 +24,10 @@ export const cartsService = {
   addItem: (cartId: string, item: { product_id: number; quantity: number }) =>
     api.post(`/carts/${cartId}/items/`, item).then((res) => res.data),
 
+  // Set the quantity of several products at once (0 removes); returns the cart with its totals
+  setItems: (cartId: string, items: { product_id: number; quantity: number }[]) =>
+    api.post(`/carts/${cartId}/items/bulk/`, { items }).then((res) => res.data),
+
   // Update cart item (PATCH, not PUT)
   updateItem: (cartId: string, itemId: string, item: unknown) =>
     api.patch(`/carts/${cartId}/items/${itemId}/`, item).then((res) => res.data),
@@ -30,9 +42,9 @@ export const cartsService = {
   // Get or create active cart (type can be passed, default COMUN)
   async getOrCreateActiveCart(cart_type: string = 'COMUN') {
     // Try to get active cart
-    const carts = await this.getAll({ status: 'ACTIVO', type: cart_type })
-    if (Array.isArray(carts) && carts.length > 0) {
-      return carts[0]
+    const cart = await this.getActiveCart(cart_type)
+    if (cart) {
+      return cart
     }
     // If not found, create one
     return this.create({ cart_type })
@@ -40,10 +52,9 @@ export const cartsService = {
 
   // Add item to active cart (creates cart if needed)
   async addItemToActiveCart(product_id: number, quantity: number = 1, cart_type: string = 'COMUN') {
-    let carts = await this.getAll({ status: 'ACTIVO', type: cart_type })
-    if (Array.isArray(carts) && carts.length > 0) {
-      const cart = carts[0]
-      return this.addItem(cart.id, { product_id, quantity })
+    const activeCart = await this.getActiveCart(cart_type)
+    if (activeCart) {
+      return this.addItem(activeCart.id, { product_id, quantity })
     } else {
       const cart = await this.create({ cart_type })
       return this.addItem(cart.id, { product_id, quantity })
@@ -31,7 +31,8 @@ api.interceptors.request.use((config) => {
     const url = config.url || ''
     // Routes that need simulated date (more flexible)
     const dateRoutes = ['/promotions/', '/carts/', '/orders/', '/products/']
-    const needsDate = dateRoutes.some((route) => url.includes(route))
+    // Cursor links of paginated lists already carry the date of the first request
+    const needsDate = dateRoutes.some((route) => url.includes(route)) && !/[?&]fecha=/.test(url)
     if (needsDate) {
       const separator = url.includes('?') ? '&' : '?'
       config.url = `${url}${separator}fecha=${simulatedDate}`
@@ -1,7 +1,9 @@
 import { api } from './http'
+import { getPage } from './pagination'
 
 export const ordersService = {
-  getAll: () => api.get('/orders/').then((res) => res.data),
+  // Get a page of the current user's orders (cursor: the next link of the previous page)
+  getPage: (cursor?: string | null) => getPage('/orders/', cursor, { params: { user: true } }),
   finalize: (cartId: string) =>
     api.post('/orders/create/', { cart_id: cartId }).then((res) => res.data),
 }
@@ -0,0 +1,20 @@
+import type { AxiosRequestConfig } from 'axios'
+
+import { api } from './http'
+
+// A page of a cursor-paginated list
+export interface Page<T> {
+  next: string | null
+  previous: string | null
+  results: T[]
+}
+
+// Get one page of a cursor-paginated list: the first one from url, or the one a
+// previous page linked to as next (the link already has the filters and the cursor)
+export const getPage = (url: string, cursor?: string | null, config?: AxiosRequestConfig) => {
+  const request = cursor ? api.get(cursor) : config ? api.get(url, config) : api.get(url)
+  return request.then((res) => res.data)
+}
+
+// getNextPageParam for infinite queries over getPage(): null once on the last page
+export const nextPageCursor = (page: { next: string | null }) => page.next
@@ -1,6 +1,12 @@
 import { api } from './http'
+import { getPage } from './pagination'
 
 export const productsService = {
-  getAll: () => api.get('/products/').then((res) => res.data),
+  // Get a page of products (cursor: the next link of the previous page)
+  getPage: (cursor?: string | null) => getPage('/products/', cursor),
   getById: (id: number) => api.get(`/products/${id}/`).then((res) => res.data),
+  search: (
+    params: { q?: string; min_price?: number; max_price?: number; available?: boolean },
+    cursor?: string | null,
+  ) => getPage('/products/', cursor, { params }),
 }
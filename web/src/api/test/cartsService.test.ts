@@ -15,32 +15,66 @@ vi.mock('../http', () => ({
 // Import the mocked api
 import { api } from '../http'
 
+// Wrap results in a cursor paginated list response
+const page = (results: unknown[]) => ({ data: { next: null, previous: null, results } })
+
 describe('Carts Service', () => {
   beforeEach(() => {
     vi.clearAllMocks()
   })
 
-  describe('getAll', () => {
-    it('should fetch all carts without parameters', async () => {
-      const mockResponse = { data: [{ id: 1, cart_type: 'COMUN' }] }
+  describe('getPage', () => {
+    it('should fetch the first page of carts without parameters', async () => {
+      const mockResponse = page([{ id: 1, cart_type: 'COMUN' }])
       ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue(mockResponse)
 
-      const result = await cartsService.getAll()
+      const result = await cartsService.getPage()
 
       expect(api.get).toHaveBeenCalledWith('/carts/', { params: undefined })
       expect(result).toEqual(mockResponse.data)
     })
 
-    it('should fetch all carts with parameters', async () => {
-      const mockResponse = { data: [{ id: 1, cart_type: 'VIP' }] }
+    it('should fetch the first page of carts with parameters', async () => {
+      const mockResponse = page([{ id: 1, cart_type: 'VIP' }])
       const params = { status: 'ACTIVO', type: 'VIP' }
       ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue(mockResponse)
 
-      const result = await cartsService.getAll(params)
+      const result = await cartsService.getPage(params)
 
       expect(api.get).toHaveBeenCalledWith('/carts/', { params })
       expect(result).toEqual(mockResponse.data)
     })
+
+    it('should follow the cursor of the next page', async () => {
+      const next = 'http://localhost:8000/carts/?cursor=cD0y&status=ACTIVO'
+      ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue(page([{ id: 2 }]))
+
+      await cartsService.getPage({ status: 'ACTIVO' }, next)
+
+      expect(api.get).toHaveBeenCalledWith(next)
+    })
+  })
+
+  describe('getActiveCart', () => {
+    it('should fetch a single active cart of the type', async () => {
+      const existingCarts = [{ id: '1', cart_type: 'VIP', status: 'ACTIVO' }]
+      ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue(page(existingCarts))
+
+      const result = await cartsService.getActiveCart('VIP')
+
+      expect(api.get).toHaveBeenCalledWith('/carts/', {
+        params: { status: 'ACTIVO', type: 'VIP', page_size: 1 },
+      })
+      expect(result).toEqual(existingCarts[0])
+    })
+
+    it('should return null when there is no active cart', async () => {
+      ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue(page([]))
+
+      const result = await cartsService.getActiveCart('VIP')
+
+      expect(result).toBeNull()
+    })
   })
 
   describe('getById', () => {
@@ -81,6 +115,22 @@ describe('Carts Service', () => {
     })
   })
 
+  describe('setItems', () => {
+    it('should send all the lines in one request', async () => {
+      const mockResponse = { data: { id: '1', total_quantity: 3 } }
+      const items = [
+        { product_id: 123, quantity: 3 },
+        { product_id: 456, quantity: 0 },
+      ]
+      ;(api.post as ReturnType<typeof vi.fn>).mockResolvedValue(mockResponse)
+
+      const result = await cartsService.setItems('1', items)
+
+      expect(api.post).toHaveBeenCalledWith('/carts/1/items/bulk/', { items })
+      expect(result).toEqual(mockResponse.data)
+    })
+  })
+
   describe('updateItem', () => {
     it('should update cart item', async () => {
       const mockResponse = { data: { id: '1', quantity: 3 } }
@@ -121,12 +171,12 @@ describe('Carts Service', () => {
   describe('getOrCreateActiveCart', () => {
     it('should return existing active cart', async () => {
       const existingCarts = [{ id: '1', cart_type: 'COMUN', status: 'ACTIVO' }]
-      ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue({ data: existingCarts })
+      ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue(page(existingCarts))
 
       const result = await cartsService.getOrCreateActiveCart('COMUN')
 
       expect(api.get).toHaveBeenCalledWith('/carts/', {
-        params: { status: 'ACTIVO', type: 'COMUN' },
+        params: { status: 'ACTIVO', type: 'COMUN', page_size: 1 },
       })
       expect(result).toEqual(existingCarts[0])
     })
@@ -134,24 +184,26 @@ describe('Carts Service', () => {
     it('should create new cart if no active cart exists', async () => {
       const emptyCarts: unknown[] = []
       const newCart = { id: '2', cart_type: 'VIP' }
-      ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValueOnce({ data: emptyCarts })
+      ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValueOnce(page(emptyCarts))
       ;(api.post as ReturnType<typeof vi.fn>).mockResolvedValueOnce({ data: newCart })
 
       const result = await cartsService.getOrCreateActiveCart('VIP')
 
-      expect(api.get).toHaveBeenCalledWith('/carts/', { params: { status: 'ACTIVO', type: 'VIP' } })
+      expect(api.get).toHaveBeenCalledWith('/carts/', {
+        params: { status: 'ACTIVO', type: 'VIP', page_size: 1 },
+      })
       expect(api.post).toHaveBeenCalledWith('/carts/', { cart_type: 'VIP' })
       expect(result).toEqual(newCart)
     })
 
     it('should use COMUN as default cart type', async () => {
       const existingCarts = [{ id: '1', cart_type: 'COMUN', status: 'ACTIVO' }]
-      ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue({ data: existingCarts })
+      ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue(page(existingCarts))
 
       await cartsService.getOrCreateActiveCart()
 
       expect(api.get).toHaveBeenCalledWith('/carts/', {
-        params: { status: 'ACTIVO', type: 'COMUN' },
+        params: { status: 'ACTIVO', type: 'COMUN', page_size: 1 },
       })
     })
   })
@@ -160,13 +212,13 @@ describe('Carts Service', () => {
     it('should add item to existing active cart', async () => {
       const existingCarts = [{ id: '1', cart_type: 'COMUN', status: 'ACTIVO' }]
       const addedItem = { id: '1', product_id: 123, quantity: 2 }
-      ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue({ data: existingCarts })
+      ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue(page(existingCarts))
       ;(api.post as ReturnType<typeof vi.fn>).mockResolvedValue({ data: addedItem })
 
       const result = await cartsService.addItemToActiveCart(123, 2, 'COMUN')
 
       expect(api.get).toHaveBeenCalledWith('/carts/', {
-        params: { status: 'ACTIVO', type: 'COMUN' },
+        params: { status: 'ACTIVO', type: 'COMUN', page_size: 1 },
       })
       expect(api.post).toHaveBeenCalledWith('/carts/1/items/', { product_id: 123, quantity: 2 })
       expect(result).toEqual(addedItem)
@@ -177,7 +229,7 @@ describe('Carts Service', () => {
       const newCart = { id: '2', cart_type: 'VIP' }
       const addedItem = { id: '1', product_id: 123, quantity: 1 }
       ;(api.get as ReturnType<typeof vi.fn>)
-        .mockResolvedValueOnce({ data: emptyCarts })
+        .mockResolvedValueOnce(page(emptyCarts))
         .mockResolvedValueOnce({ data: newCart })
       ;(api.post as ReturnType<typeof vi.fn>)
         .mockResolvedValueOnce({ data: newCart })
@@ -185,7 +237,9 @@ describe('Carts Service', () => {
 
       const result = await cartsService.addItemToActiveCart(123, 1, 'VIP')
 
-      expect(api.get).toHaveBeenCalledWith('/carts/', { params: { status: 'ACTIVO', type: 'VIP' } })
+      expect(api.get).toHaveBeenCalledWith('/carts/', {
+        params: { status: 'ACTIVO', type: 'VIP', page_size: 1 },
+      })
       expect(api.post).toHaveBeenCalledWith('/carts/', { cart_type: 'VIP' })
       expect(api.post).toHaveBeenCalledWith('/carts/2/items/', { product_id: 123, quantity: 1 })
       expect(result).toEqual(addedItem)
@@ -194,13 +248,13 @@ describe('Carts Service', () => {
     it('should use default values for quantity and cart type', async () => {
       const existingCarts = [{ id: '1', cart_type: 'COMUN', status: 'ACTIVO' }]
       const addedItem = { id: '1', product_id: 123, quantity: 1 }
-      ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue({ data: existingCarts })
+      ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue(page(existingCarts))
       ;(api.post as ReturnType<typeof vi.fn>).mockResolvedValue({ data: addedItem })
 
       await cartsService.addItemToActiveCart(123)
 
       expect(api.get).toHaveBeenCalledWith('/carts/', {
-        params: { status: 'ACTIVO', type: 'COMUN' },
+        params: { status: 'ACTIVO', type: 'COMUN', page_size: 1 },
       })
       expect(api.post).toHaveBeenCalledWith('/carts/1/items/', { product_id: 123, quantity: 1 })
     })
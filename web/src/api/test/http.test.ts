@@ -268,6 +268,25 @@ describe('HTTP Service', () => {
       expect(result.url).toBe('/promotions/?existing=param&fecha=2024-01-15')
     })
 
+    it('should not add simulated date again to a cursor link that has it', () => {
+      const mockLocalStorage = {
+        getItem: vi.fn().mockReturnValue('2024-01-15'),
+      }
+      Object.defineProperty(window, 'localStorage', {
+        writable: true,
+        value: mockLocalStorage,
+      })
+
+      const config = {
+        method: 'get',
+        url: 'http://localhost:8000/products/?cursor=cD0y&fecha=2024-01-15',
+      }
+
+      const result = interceptorCallback(config)
+
+      expect(result.url).toBe('http://localhost:8000/products/?cursor=cD0y&fecha=2024-01-15')
+    })
+
     it('should not add simulated date to non-date routes', () => {
       const mockLocalStorage = {
         getItem: vi.fn().mockReturnValue('2024-01-15'),
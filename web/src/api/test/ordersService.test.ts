@@ -18,42 +18,50 @@ describe('Orders Service', () => {
     vi.clearAllMocks()
   })
 
-  describe('getAll', () => {
-    it('should fetch all orders', async () => {
+  describe('getPage', () => {
+    it('should fetch the first page of the user's orders', async () => {
       const mockResponse = {
-        data: [
-          { id: 1, cart_id: 'cart-1', status: 'completed', total: 150.0 },
-          { id: 2, cart_id: 'cart-2', status: 'pending', total: 75.5 },
-          { id: 3, cart_id: 'cart-3', status: 'completed', total: 200.25 },
-        ],
+        data: {
+          next: null,
+          previous: null,
+          results: [
+            { id: 1, cart_id: 'cart-1', status: 'completed', total: 150.0 },
+            { id: 2, cart_id: 'cart-2', status: 'pending', total: 75.5 },
+            { id: 3, cart_id: 'cart-3', status: 'completed', total: 200.25 },
+          ],
+        },
       }
       ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue(mockResponse)
 
-      const result = await ordersService.getAll()
+      const result = await ordersService.getPage()
 
-      expect(api.get).toHaveBeenCalledWith('/orders/')
+      expect(api.get).toHaveBeenCalledWith('/orders/', { params: { user: true } })
       expect(result).toEqual(mockResponse.data)
     })
 
-    it('should return empty array when no orders exist', async () => {
-      const mockResponse = { data: [] as unknown[] }
+    it('should return an empty page when no orders exist', async () => {
+      const mockResponse = { data: { next: null, previous: null, results: [] as unknown[] } }
       ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue(mockResponse)
 
-      const result = await ordersService.getAll()
+      const result = await ordersService.getPage()
 
-      expect(api.get).toHaveBeenCalledWith('/orders/')
-      expect(result).toEqual([])
+      expect(api.get).toHaveBeenCalledWith('/orders/', { params: { user: true } })
+      expect(result.results).toEqual([])
     })
 
     it('should handle single order response', async () => {
       const mockResponse = {
-        data: [{ id: 1, cart_id: 'cart-1', status: 'completed', total: 100.0 }],
+        data: {
+          next: null,
+          previous: null,
+          results: [{ id: 1, cart_id: 'cart-1', status: 'completed', total: 100.0 }],
+        },
       }
       ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue(mockResponse)
 
-      const result = await ordersService.getAll()
+      const result = await ordersService.getPage()
 
-      expect(api.get).toHaveBeenCalledWith('/orders/')
+      expect(api.get).toHaveBeenCalledWith('/orders/', { params: { user: true } })
       expect(result).toEqual(mockResponse.data)
     })
   })
@@ -0,0 +1,64 @@
+import { beforeEach, describe, expect, it, vi } from 'vitest'
+
+import { getPage, nextPageCursor } from '../pagination'
+
+// Mock the api module
+vi.mock('../http', () => ({
+  api: {
+    get: vi.fn(),
+  },
+}))
+
+// Import the mocked api
+import { api } from '../http'
+
+describe('Pagination', () => {
+  beforeEach(() => {
+    vi.clearAllMocks()
+  })
+
+  describe('getPage', () => {
+    it('should fetch the first page from the url', async () => {
+      const mockResponse = { data: { next: null, previous: null, results: [{ id: 1 }] } }
+      ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue(mockResponse)
+
+      const result = await getPage('/orders/')
+
+      expect(api.get).toHaveBeenCalledTimes(1)
+      expect(api.get).toHaveBeenCalledWith('/orders/')
+      expect(result).toEqual(mockResponse.data)
+    })
+
+    it('should send the params with the first page', async () => {
+      const params = { status: 'ACTIVO' }
+      ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue({
+        data: { next: null, previous: null, results: [] as unknown[] },
+      })
+
+      await getPage('/carts/', null, { params })
+
+      expect(api.get).toHaveBeenCalledWith('/carts/', { params })
+    })
+
+    it('should fetch only the page the cursor points to', async () => {
+      const next = 'http://localhost:8000/carts/?cursor=cD0y&status=ACTIVO'
+      const mockResponse = { data: { next: null, previous: null, results: [{ id: 1 }] } }
+      ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue(mockResponse)
+
+      const result = await getPage('/carts/', next, { params: { status: 'ACTIVO' } })
+
+      expect(api.get).toHaveBeenCalledTimes(1)
+      expect(api.get).toHaveBeenCalledWith(next)
+      expect(result).toEqual(mockResponse.data)
+    })
+  })
+
+  describe('nextPageCursor', () => {
+    it('should return the next link, or null on the last page', () => {
+      const next = 'http://localhost:8000/products/?cursor=cD0y'
+
+      expect(nextPageCursor({ next })).toBe(next)
+      expect(nextPageCursor({ next: null })).toBeNull()
+    })
+  })
+})
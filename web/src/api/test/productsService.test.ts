@@ -17,44 +17,65 @@ describe('Products Service', () => {
     vi.clearAllMocks()
   })
 
-  describe('getAll', () => {
-    it('should fetch all products', async () => {
+  describe('getPage', () => {
+    it('should fetch the first page of products', async () => {
       const mockResponse = {
-        data: [
-          { id: 1, name: 'Product 1', price: 10.99 },
-          { id: 2, name: 'Product 2', price: 20.5 },
-          { id: 3, name: 'Product 3', price: 15.75 },
-        ],
+        data: {
+          next: null,
+          previous: null,
+          results: [
+            { id: 1, name: 'Product 1', price: 10.99 },
+            { id: 2, name: 'Product 2', price: 20.5 },
+            { id: 3, name: 'Product 3', price: 15.75 },
+          ],
+        },
       }
       ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue(mockResponse)
 
-      const result = await productsService.getAll()
+      const result = await productsService.getPage()
 
       expect(api.get).toHaveBeenCalledWith('/products/')
       expect(result).toEqual(mockResponse.data)
     })
 
-    it('should return empty array when no products exist', async () => {
-      const mockResponse = { data: [] as unknown[] }
+    it('should return an empty page when no products exist', async () => {
+      const mockResponse = { data: { next: null, previous: null, results: [] as unknown[] } }
       ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue(mockResponse)
 
-      const result = await productsService.getAll()
+      const result = await productsService.getPage()
 
       expect(api.get).toHaveBeenCalledWith('/products/')
-      expect(result).toEqual([])
+      expect(result.results).toEqual([])
     })
 
     it('should handle single product response', async () => {
       const mockResponse = {
-        data: [{ id: 1, name: 'Single Product', price: 25.0 }],
+        data: {
+          next: null,
+          previous: null,
+          results: [{ id: 1, name: 'Single Product', price: 25.0 }],
+        },
       }
       ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue(mockResponse)
 
-      const result = await productsService.getAll()
+      const result = await productsService.getPage()
 
       expect(api.get).toHaveBeenCalledWith('/products/')
       expect(result).toEqual(mockResponse.data)
     })
+
+    it('should fetch the next page from its cursor', async () => {
+      const next = 'http://localhost:8000/products/?cursor=cD0y'
+      const mockResponse = {
+        data: { next: null, previous: null, results: [{ id: 1, name: 'Product 1', price: 10.99 }] },
+      }
+      ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue(mockResponse)
+
+      const result = await productsService.getPage(next)
+
+      expect(api.get).toHaveBeenCalledWith(next)
+      expect(result).toEqual(mockResponse.data)
+    })
   })
 
   describe('getById', () => {
@@ -94,4 +115,20 @@ describe('Products Service', () => {
       expect(result).toEqual(mockResponse.data)
     })
   })
+
+  describe('search', () => {
+    it('should send the search and filters as query params', async () => {
+      const mockResponse = {
+        data: { next: null, previous: null, results: [{ id: 2, name: 'Bamboo Brush', price: 12.99 }] },
+      }
+      ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue(mockResponse)
+
+      const result = await productsService.search({ q: 'bamboo', max_price: 20, available: true })
+
+      expect(api.get).toHaveBeenCalledWith('/products/', {
+        params: { q: 'bamboo', max_price: 20, available: true },
+      })
+      expect(result).toEqual(mockResponse.data)
+    })
+  })
 })
@@ -18,12 +18,16 @@ describe('Users Service', () => {
   })
 
   describe('getVipUsers', () => {
-    it('should fetch VIP users', async () => {
+    it('should fetch the first page of VIP users', async () => {
       const mockResponse = {
-        data: [
-          { id: 1, username: 'vip_user1', vip: true },
-          { id: 2, username: 'vip_user2', vip: true },
-        ],
+        data: {
+          next: null,
+          previous: null,
+          results: [
+            { id: 1, username: 'vip_user1', vip: true },
+            { id: 2, username: 'vip_user2', vip: true },
+          ],
+        },
       }
       ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue(mockResponse)
 
@@ -32,14 +36,26 @@ describe('Users Service', () => {
       expect(api.get).toHaveBeenCalledWith('/api/users/?vip=true')
       expect(result).toEqual(mockResponse.data)
     })
-    it('should return empty array when no VIP users exist', async () => {
-      const mockResponse = { data: [] as unknown[] }
+
+    it('should fetch the next page from its cursor', async () => {
+      const next = 'http://localhost:8000/api/users/?cursor=cD0y&vip=true'
+      ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue({
+        data: { next: null, previous: null, results: [{ id: 3, username: 'vip_user3', vip: true }] },
+      })
+
+      await usersService.getVipUsers(next)
+
+      expect(api.get).toHaveBeenCalledWith(next)
+    })
+
+    it('should return an empty page when no VIP users exist', async () => {
+      const mockResponse = { data: { next: null, previous: null, results: [] as unknown[] } }
       ;(api.get as ReturnType<typeof vi.fn>).mockResolvedValue(mockResponse)
 
       const result = await usersService.getVipUsers()
 
       expect(api.get).toHaveBeenCalledWith('/api/users/?vip=true')
-      expect(result).toEqual([])
+      expect(result.results).toEqual([])
     })
   })
 
@@ -1,7 +1,9 @@
 import { api } from './http'
+import { getPage } from './pagination'
 
 export const usersService = {
-  getVipUsers: () => api.get('/api/users/?vip=true').then((res) => res.data),
+  // Get a page of VIP users (cursor: the next link of the previous page)
+  getVipUsers: (cursor?: string | null) => getPage('/api/users/?vip=true', cursor),
   getVipChanges: (month: number, year: number) =>
     api.get(`/users/api/vip_changes/?month=${month}&year=${year}`).then((res) => res.data),
 }
@@ -0,0 +1,25 @@
+import React from 'react'
+
+interface LoadMoreButtonProps {
+  onClick: () => void
+  loading?: boolean
+}
+
+// Fetches the next page of a paginated list
+const LoadMoreButton: React.FC<LoadMoreButtonProps> = ({ onClick, loading = false }) => {
+  return (
+    <div className='mt-6 flex justify-center'>
+      <button
+        type='button'
+        className='bg-sky-blue cursor-pointer rounded px-4 py-2 text-sm font-medium text-white transition-colors hover:opacity-90 disabled:cursor-not-allowed disabled:opacity-50'
+        onClick={onClick}
+        disabled={loading}
+        data-testid='load-more'
+      >
+        {loading ? 'Cargando...' : 'Cargar más'}
+      </button>
+    </div>
+  )
+}
+
+export default LoadMoreButton
@@ -0,0 +1,22 @@
+import { fireEvent, render, screen } from '@testing-library/react'
+import { describe, expect, it, vi } from 'vitest'
+
+import LoadMoreButton from '../LoadMoreButton'
+
+describe('LoadMoreButton Component', () => {
+  it('should call onClick when clicked', () => {
+    const onClick = vi.fn()
+    render(<LoadMoreButton onClick={onClick} />)
+
+    fireEvent.click(screen.getByText('Cargar más'))
+
+    expect(onClick).toHaveBeenCalledTimes(1)
+  })
+
+  it('should be disabled while the next page is loading', () => {
+    render(<LoadMoreButton onClick={vi.fn()} loading />)
+
+    expect(screen.getByTestId('load-more')).toBeDisabled()
+    expect(screen.getByText('Cargando...')).toBeInTheDocument()
+  })
+})
@@ -16,8 +16,10 @@ export function useActiveCart() {
     cartType = 'FECHA_ESPECIAL'
   }
 
-  // Get all active carts for the user (filtered by simulated date)
-  const { data: carts, isLoading, error } = useCarts({ status: 'ACTIVO' })
+  // Get the active carts of the user (filtered by simulated date); there is at
+  // most one per type, so the first page has them all
+  const { data, isLoading, error } = useCarts({ status: 'ACTIVO' })
+  const carts = data?.pages[0]?.results
   // Find the active cart of the determined type
   const activeCart = carts?.find((cart: { cart_type: string }) => cart.cart_type === cartType)
 
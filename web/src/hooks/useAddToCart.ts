@@ -1,6 +1,7 @@
-import { useMutation, useQueryClient } from '@tanstack/react-query'
+import { type InfiniteData, useMutation, useQueryClient } from '@tanstack/react-query'
 
 import { cartsService } from '@/api/cartsService'
+import type { Page } from '@/api/pagination'
 
 export function useAddToCart(cart_type: string = 'COMUN') {
   const queryClient = useQueryClient()
@@ -12,11 +13,11 @@ export function useAddToCart(cart_type: string = 'COMUN') {
       // Refetch carts and cart details
       await queryClient.invalidateQueries({ queryKey: ['carts'] })
       // Get the active cart after mutation
-      const carts: unknown = queryClient.getQueryData([
+      const carts = queryClient.getQueryData<InfiniteData<Page<{ id: string }>>>([
         'carts',
         { status: 'ACTIVO', type: cart_type },
       ])
-      const activeCart = Array.isArray(carts) && carts.length > 0 ? carts[0] : null
+      const activeCart = carts?.pages[0]?.results[0]
       if (activeCart?.id) {
         await queryClient.invalidateQueries({ queryKey: ['cart', activeCart.id] })
       }
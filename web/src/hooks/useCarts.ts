@@ -1,13 +1,16 @@
-import { useQuery } from '@tanstack/react-query'
+import { useInfiniteQuery } from '@tanstack/react-query'
 
 import { cartsService } from '@/api/cartsService'
+import { nextPageCursor } from '@/api/pagination'
 import { useDate } from '@/context/DateContext'
 
 export function useCarts(filters?: Record<string, unknown>) {
   const { simulatedDate } = useDate()
   const params = { ...filters, fecha: simulatedDate }
-  return useQuery({
+  return useInfiniteQuery({
     queryKey: ['carts', params],
-    queryFn: () => cartsService.getAll(params),
+    queryFn: ({ pageParam }) => cartsService.getPage(params, pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: nextPageCursor,
   })
 }
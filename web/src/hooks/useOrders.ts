@@ -1,10 +1,13 @@
-import { useQuery } from '@tanstack/react-query'
+import { useInfiniteQuery } from '@tanstack/react-query'
 
+import { nextPageCursor } from '@/api/pagination'
 import { ordersService } from '@/api/ordersService'
 
 export function useOrders() {
-  return useQuery({
+  return useInfiniteQuery({
     queryKey: ['orders'],
-    queryFn: ordersService.getAll,
+    queryFn: ({ pageParam }) => ordersService.getPage(pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: nextPageCursor,
   })
 }
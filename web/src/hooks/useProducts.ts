@@ -1,10 +1,13 @@
-import { useQuery } from '@tanstack/react-query'
+import { useInfiniteQuery } from '@tanstack/react-query'
 
+import { nextPageCursor } from '@/api/pagination'
 import { productsService } from '@/api/productsService'
 
 export function useProducts() {
-  return useQuery({
+  return useInfiniteQuery({
     queryKey: ['products'],
-    queryFn: productsService.getAll,
+    queryFn: ({ pageParam }) => productsService.getPage(pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: nextPageCursor,
   })
 }
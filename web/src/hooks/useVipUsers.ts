@@ -1,10 +1,13 @@
-import { useQuery } from '@tanstack/react-query'
+import { useInfiniteQuery } from '@tanstack/react-query'
 
+import { nextPageCursor } from '@/api/pagination'
 import { usersService } from '@/api/usersService'
 
 export function useVipUsers() {
-  return useQuery({
+  return useInfiniteQuery({
     queryKey: ['vipUsers'],
-    queryFn: usersService.getVipUsers,
+    queryFn: ({ pageParam }) => usersService.getVipUsers(pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: nextPageCursor,
   })
 }
@@ -2,6 +2,7 @@ import React from 'react'
 import { FaEye, FaShoppingCart, FaTrashAlt } from 'react-icons/fa'
 import { useNavigate } from 'react-router-dom'
 
+import LoadMoreButton from '@/components/LoadMoreButton'
 import { useCarts } from '@/hooks/useCarts'
 import { useDeleteCart } from '@/hooks/useDeleteCart'
 
@@ -54,8 +55,8 @@ const statusBadge = (status: string) => {
 }
 
 const CartsListPage: React.FC = () => {
-  const { data, isLoading, error } = useCarts()
-  const carts = data ?? []
+  const { data, isLoading, error, hasNextPage, fetchNextPage, isFetchingNextPage } = useCarts()
+  const carts = data?.pages.flatMap((page) => page.results) ?? []
   const navigate = useNavigate()
   const deleteCart = useDeleteCart()
 
@@ -142,6 +143,9 @@ const CartsListPage: React.FC = () => {
           )
         })}
       </ul>
+      {hasNextPage && (
+        <LoadMoreButton onClick={() => fetchNextPage()} loading={isFetchingNextPage} />
+      )}
     </div>
   )
 }
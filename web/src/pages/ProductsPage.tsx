@@ -2,6 +2,7 @@ import React from 'react'
 import { FiMinus, FiPlus, FiShoppingCart } from 'react-icons/fi'
 import { FiTrash2 } from 'react-icons/fi'
 
+import LoadMoreButton from '@/components/LoadMoreButton'
 import { useActiveCart } from '@/hooks/useActiveCart'
 import { useAddToCart } from '@/hooks/useAddToCart'
 import { useCurrentUser } from '@/hooks/useCurrentUser'
@@ -155,7 +156,8 @@ const ProductCard: React.FC<{
 }
 
 const ProductsPage: React.FC = () => {
-  const { data: products, isLoading, error } = useProducts()
+  const { data, isLoading, error, hasNextPage, fetchNextPage, isFetchingNextPage } = useProducts()
+  const products = data?.pages.flatMap((page) => page.results)
   const { data: userData } = useCurrentUser()
   const { cart: activeCart, cartType } = useActiveCart()
   const isVip = userData?.user?.profile?.is_vip
@@ -288,6 +290,9 @@ const ProductsPage: React.FC = () => {
           )
         })}
       </div>
+      {hasNextPage && (
+        <LoadMoreButton onClick={() => fetchNextPage()} loading={isFetchingNextPage} />
+      )}
 
       {/* Empty State */}
       {(!products || products.length === 0) && (
@@ -1,6 +1,7 @@
 import React from 'react'
 import { FaCrown, FaRegSmileBeam } from 'react-icons/fa'
 
+import LoadMoreButton from '@/components/LoadMoreButton'
 import { useVipStatus } from '@/hooks/useVipStatus'
 import { useVipUsers } from '@/hooks/useVipUsers'
 import { formatDate } from '@/utils/formatDate'
@@ -12,7 +13,15 @@ interface VipUser {
 
 const VipStatusPage: React.FC = () => {
   const { data: vipStatus, isLoading, error } = useVipStatus()
-  const { data: vipUsers, isLoading: loadingUsers, error: errorUsers } = useVipUsers()
+  const {
+    data: vipUserPages,
+    isLoading: loadingUsers,
+    error: errorUsers,
+    hasNextPage,
+    fetchNextPage,
+    isFetchingNextPage,
+  } = useVipUsers()
+  const vipUsers = vipUserPages?.pages.flatMap((page) => page.results)
 
   if (isLoading)
     return (
@@ -89,6 +98,9 @@ const VipStatusPage: React.FC = () => {
             )}
           </div>
         )}
+        {hasNextPage && (
+          <LoadMoreButton onClick={() => fetchNextPage()} loading={isFetchingNextPage} />
+        )}
       </div>
     </div>
   )